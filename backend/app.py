@@ -1,61 +1,533 @@
-from flask import Flask, request, jsonify
+import json
+import logging
+import os
+from typing import Optional
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
-from app.Solver import Solver
-from app.Board import Board
+from app.Board import Board, mirror_col
+from app import BatchSearch, ParallelSearch
+from app.ChanceModel import ChanceModel
+from app.JobManager import Job, JobManager, QueueFull
+from app.MiniMaxTree import MiniMaxTree
+from app.OpeningBook import OpeningBook
+from app.ResultCache import ResultCache, SQLiteCacheBackend
+from app.SearchStats import SearchMetrics
+from app.SessionStore import Session, SessionStore
+from app import Threats
 from util.SchemaValidator import SchemaValidator
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS
 
-@app.route("/solve", methods=["POST"])
-def solve():
-    data = request.get_json()
+logger = logging.getLogger(__name__)
+
+# Precomputed opening positions (build with `python -m tools.build_book`)
+BOOK = OpeningBook.load(os.environ.get("OPENING_BOOK", os.path.join(os.path.dirname(__file__), "opening_book.bin")))
+
+# Results of recent fixed-depth searches (without full trees). Set RESULT_CACHE_DB
+# to a SQLite file to share them between server processes; RESULT_CACHE_SIZE=0
+# disables caching.
+RESULT_CACHE = None
+if int(os.environ.get("RESULT_CACHE_SIZE", ResultCache.DEFAULT_ENTRIES)) > 0:
+    RESULT_CACHE = ResultCache(
+        max_entries=int(os.environ.get("RESULT_CACHE_SIZE", ResultCache.DEFAULT_ENTRIES)),
+        ttl_seconds=float(os.environ.get("RESULT_CACHE_TTL", ResultCache.DEFAULT_TTL)),
+        backend=SQLiteCacheBackend(os.environ["RESULT_CACHE_DB"]) if os.environ.get("RESULT_CACHE_DB") else None)
+
+# Requests with workers > 1 take that many processes from one shared pool of
+# SEARCH_WORKERS (the number of CPU cores by default); larger counts are capped to it
+if os.environ.get("SEARCH_WORKERS"):
+    ParallelSearch.set_max_workers(int(os.environ["SEARCH_WORKERS"]))
+
+# Totals of every search this process ran, served at /metrics
+METRICS = SearchMetrics()
 
-    # Debug: print received data
-    print("Received data:")
-    print(f"Board: {data.get('board')}")
-    print(f"Algorithm: {data.get('algorithm')}")
+# Background searches (/jobs): JOB_WORKERS threads, at most JOB_QUEUE_SIZE waiting
+JOBS = JobManager(workers=int(os.environ.get("JOB_WORKERS", JobManager.DEFAULT_WORKERS)),
+                  max_queued=int(os.environ.get("JOB_QUEUE_SIZE", JobManager.DEFAULT_QUEUE)))
 
+# Games played through /sessions, dropped after SESSION_TTL idle seconds or,
+# least recently used first, past SESSION_MAX sessions or SESSION_MEMORY_MB
+SESSIONS = SessionStore(max_sessions=int(os.environ.get("SESSION_MAX", SessionStore.DEFAULT_SESSIONS)),
+                        ttl_seconds=float(os.environ.get("SESSION_TTL", SessionStore.DEFAULT_TTL)),
+                        max_bytes=int(os.environ.get("SESSION_MEMORY_MB", SessionStore.DEFAULT_MEGABYTES)) << 20)
+
+def run_search(data: dict, job: Optional[Job] = None):
+    """
+    Validate a /solve request and run the search.
+
+    Args:
+        data (dict): Request body.
+        job (Optional[Job]): Background job running the search (see search_board).
+
+    Returns:
+        Tuple of (response_data, tree root, tree mode), or (error_response, None, None)
+        when the request is invalid. response_data does not include the tree.
+    """
     is_valid, err, validated_data = SchemaValidator.validate(data)
     if not is_valid:
-        return jsonify({"error": err}), 400
-
-    board_data = validated_data["board"]
-    algorithm = validated_data["algorithm"]
-    depth = validated_data["depth"]
-    prune = validated_data["prune"]
-    ai_player = validated_data["ai_player"]
+        return (jsonify({"error": err}), 400), None, None
 
     try:
-        board = Board(matrix=board_data)
+        board = decode_board(validated_data)
     except ValueError as e:
-        print(f"Board validation error: {e}")
-        return jsonify({"error": str(e)}), 400
+        logger.debug("Board validation error: %s", e)
+        return (jsonify({"error": str(e)}), 400), None, None
+
+    if validated_data["algorithm"] not in ("minimax", "expectiminimax", "perfect"):
+        return (jsonify({"error": "Unknown algorithm"}), 400), None, None
+
+    result = lookup_board(board, validated_data)
+    if result is None:
+        result = compute_board(board, validated_data, job=job)
+    if "error" in result:
+        return (jsonify({"error": result["error"]}), 422), None, None
+    return board_response(board, validated_data, result), result["root"], validated_data["tree"]
+
+
+def decode_board(data) -> Board:
+    """
+    Board of a validated request (or /solve/batch "boards" item): a matrix,
+    a move sequence or a {"position", "mask"} pair; the empty board if the
+    request has none (POST /sessions).
+
+    Raises:
+        ValueError: if the position is not valid.
+    """
+    if isinstance(data, str):
+        return Board.from_moves(data)
+    if isinstance(data, list):
+        return Board(matrix=data)
+    if "moves" in data:
+        return Board.from_moves(data["moves"])
+    if "position" in data:
+        return Board.from_position(data["position"], data["mask"])
+    if "board" in data:
+        return Board(matrix=data["board"])
+    return Board()
+
+
+# Deepest tree /solve/stream serves: the tree is built whole before the first
+# line is sent, so its size is bounded like a /solve response's
+STREAM_TREE_PLIES = 6
+
+# Deepest top-k tree kept in the result cache; entries hold their tree, so
+# deeper (and full) trees would leave the cache's memory and disk unbounded
+CACHE_TREE_PLIES = 2
+
+
+def _cache_key(board: Board, params: dict):
+    """Result cache key of a position under validated parameters, or None if it can't be cached."""
+    algorithm = params["algorithm"]
+    # Budgeted searches depend on timing, so only fixed-depth (or exact) results are reused
+    fixed_depth = params.get("time_ms") is None and params.get("max_nodes") is None
+    if RESULT_CACHE is None or not (fixed_depth or algorithm == "perfect"):
+        return None
+    position, _ = board.canonical_key()
+    if algorithm == "perfect":
+        # Exact results come with just the root
+        return f"{position}:{algorithm}:{int(params['ai_player'])}"
+    if params["tree"] == "full" or (params["tree"] == "top-k" and params["tree_plies"] > CACHE_TREE_PLIES):
+        return None
+    return (f"{position}:{algorithm}:{params['depth']}:{int(params['prune'])}:{int(params['ai_player'])}:"
+            f"{params['tree']}:{BatchSearch.tree_plies(params)}:{int(params['forced_moves'])}:"
+            f"{params['chance_chosen']!r}:{int(params['pvs'])}:{params['ordering']}")
+
+
+def lookup_board(board: Board, params: dict) -> Optional[dict]:
+    """
+    Stored result for a position: from the result cache, else the opening book.
 
-    solver = Solver(depth=depth, prune=prune, ai_player=ai_player)
+    Returns:
+        A BatchSearch.solve_position-style result with "source" set to
+        "cache" or "book", or None.
+    """
+    algorithm, ai_player, depth = params["algorithm"], params["ai_player"], params["depth"]
+    cache_key = _cache_key(board, params)
+    cached = RESULT_CACHE.get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        best_col, best_val, nodes, depth_reached, root, cached_mirrored = cached
+        if cached_mirrored != board.canonical_key()[1]:
+            best_col = mirror_col(best_col) if best_col is not None else None
+            root = root.mirrored()
+        return {"best_col": best_col, "value": best_val, "nodes": nodes, "depth_reached": depth_reached,
+                "root": root, "worker_nodes": None, "tt": None, "stats": None, "source": "cache"}
 
-    if algorithm == "minimax":
-        best_col, best_val, nodes, root = solver.run_minimax(board)
-    elif algorithm == "expectiminimax":
-        best_col, best_val, nodes, root = solver.run_expectiminimax(board)
-    else:
-        return jsonify({"error": "Unknown algorithm"}), 400
+    # The book holds fixed-depth results (pruning doesn't change them) under the
+    # default physics, without trees: only requests that want no tree can use it
+    fixed_depth = params.get("time_ms") is None and params.get("max_nodes") is None
+    default_physics = algorithm != "expectiminimax" or params["chance_chosen"] == ChanceModel.DEFAULT_CHOSEN
+    if (BOOK is not None and params["tree"] == "none" and fixed_depth and not params["forced_moves"]
+            and default_physics):
+        book_hit = BOOK.lookup(board, algorithm, ai_player, depth)
+        if book_hit is not None:
+            best_col, best_val = book_hit
+            return {"best_col": best_col, "value": best_val, "nodes": 0, "depth_reached": depth,
+                    "root": MiniMaxTree(move=None, player=None, value=best_val, depth=0),
+                    "worker_nodes": None, "tt": None, "stats": None, "source": "book"}
+    return None
 
-    board = board.apply_action(best_col, ai_player)
-    print(board)
+
+def compute_board(board: Board, params: dict, job: Optional[Job] = None, solver=None) -> dict:
+    """
+    Search a position and cache the result.
+
+    Args:
+        board (Board): Position to search.
+        params (dict): Validated request parameters.
+        job (Optional[Job]): Background job running the search. Searches then
+            deepen iteratively, report every completed depth as progress and
+            stop when the job is cancelled (keeping the deepest result).
+        solver: Solver to reuse (e.g. a session's); a new one by default.
+            Results of a reused solver depend on its earlier searches, so
+            they are not cached.
+
+    Returns:
+        A BatchSearch.solve_position result.
+    """
+    fresh = solver is None
+    if fresh:
+        solver = BatchSearch.make_solver(params)
+    cancel = on_iteration = None
+    if job is not None:
+        cancel = job.cancel_event
+        if params["algorithm"] == "perfect":
+            job.track(lambda: {"nodes": solver.nodes})
+        else:
+            job.track(lambda: {"nodes": solver.stats.nodes, "depth": job.progress.get("depth_reached", 0) + 1})
+            on_iteration = lambda d, col, val, n: job.update(depth_reached=d, best_col=col, value=val)
+
+    result = BatchSearch.solve_position(board, params, solver, cancel=cancel, on_iteration=on_iteration)
+    store_result(board, params, result, cache=fresh and not (job is not None and job.cancelled))
+    return result
+
+
+def store_result(board: Board, params: dict, result: dict, cache: bool = True) -> None:
+    """
+    Record a search result in the metrics and, with cache, in the result
+    cache. Only cache complete results of a fresh solver: /solve serves them
+    as its own.
+    """
+    if "error" in result:
+        return
+    if result["stats"] is not None:
+        METRICS.record(params["algorithm"], result["stats"])
+    cache_key = _cache_key(board, params)
+    if cache_key is not None and cache:
+        RESULT_CACHE.put(cache_key, (result["best_col"], result["value"], result["nodes"], result["depth_reached"],
+                                     result["root"], board.canonical_key()[1]))
+
+
+def board_response(board: Board, params: dict, result: dict) -> dict:
+    """/solve response (without the tree) for a search result."""
+    algorithm, ai_player = params["algorithm"], params["ai_player"]
+    best_col, best_val = result["best_col"], result["value"]
+    threats = Threats.analyze(board, ai_player)
+    if best_col is not None:
+        board = board.apply_action(best_col, ai_player)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Board after the move:\n%s", board)
 
     response_data = {
         "algorithm": algorithm,
         "best_col": best_col,
         "value": best_val,
-        "nodes_expanded": nodes,
-        "tree": root.to_json(),
+        "nodes_expanded": result["nodes"],
+        "depth_reached": result["depth_reached"],
+        "book": result.get("source") == "book",
+        "cached": result.get("source") == "cache",
+        "worker_nodes": result["worker_nodes"],
+        "tt": result["tt"],
+        "stats": result["stats"].to_json() if result["stats"] is not None else None,
+        "threats": threats,
         "AiScore": board.count_connected(True),
         "HumanScore": board.count_connected(False)
     }
+    if algorithm == "perfect":
+        # Exact outcome for the AI: the game always runs until the board is full
+        response_data["result"] = "win" if best_val > 0 else "loss" if best_val < 0 else "draw"
+        response_data["plies_remaining"] = result["depth_reached"]
+    return response_data
+
+
+@app.route("/solve", methods=["POST"])
+def solve():
+    data = request.get_json()
+    logger.debug("Received data: %s", data)
 
-    # print(json.dumps(response_data, indent=4))
+    response_data, root, tree = run_search(data)
+    if root is None:
+        return response_data
+
+    response_data["tree"] = root.to_json() if tree != "none" else None
     return jsonify(response_data)
 
+
+@app.route("/solve/batch", methods=["POST"])
+def solve_batch():
+    """
+    Solve many positions with the same search parameters.
+
+    The body is a /solve body with a "boards" list (of matrices, move
+    strings or {"position", "mask"} objects) instead of the position, and
+    "stream". Positions are answered from the result cache or the opening
+    book when possible. The rest share one transposition table, so their
+    results may differ from a separate /solve and are not cached. With
+    workers > 1 they are spread over worker processes (each keeping one
+    table for the whole batch) rather than splitting each position's root.
+
+    Returns {"results": [...]} with a /solve response (or {"error"}) per
+    board in request order; with stream, NDJSON lines {"index", ...} in the
+    order positions finish.
+    """
+    is_valid, err, params = SchemaValidator.validate(request.get_json(), SchemaValidator.BATCH_SCHEMA)
+    if not is_valid:
+        return jsonify({"error": err}), 400
+
+    boards = []
+    for i, item in enumerate(params["boards"]):
+        try:
+            boards.append(decode_board(item))
+        except ValueError as e:
+            return jsonify({"error": f"boards[{i}]: {e}"}), 400
+
+    def respond(board: Board, result: dict) -> dict:
+        if "error" in result:
+            return {"error": result["error"]}
+        response_data = board_response(board, params, result)
+        response_data["tree"] = result["root"].to_json() if params["tree"] != "none" else None
+        return response_data
+
+    def results():
+        """Yield (index, response) as positions finish, stored results first."""
+        misses = []
+        for i, board in enumerate(boards):
+            result = lookup_board(board, params)
+            if result is None:
+                misses.append(i)
+            else:
+                yield i, respond(board, result)
+        for j, result in BatchSearch.solve_many([boards[i] for i in misses], params, params["workers"]):
+            board = boards[misses[j]]
+            # Not cached: positions of a batch reuse each other's table entries
+            store_result(board, params, result, cache=False)
+            yield misses[j], respond(board, result)
+
+    if params["stream"]:
+        def generate():
+            for i, response_data in results():
+                yield json.dumps({"index": i, **response_data}) + "\n"
+        return Response(generate(), mimetype="application/x-ndjson")
+
+    ordered = [None] * len(boards)
+    for i, response_data in results():
+        ordered[i] = response_data
+    return jsonify({"results": ordered})
+
+
+@app.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    return jsonify(RESULT_CACHE.stats() if RESULT_CACHE is not None else None)
+
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    """Search and cache counters in the Prometheus text format."""
+    extra = {}
+    if RESULT_CACHE is not None:
+        cache = RESULT_CACHE.stats()
+        for name in ("hits", "misses", "evictions", "expirations", "backend_hits"):
+            extra[f"cache_{name}_total"] = cache[name]
+    sessions = SESSIONS.stats()
+    for name in ("evictions", "expirations"):
+        extra[f"session_{name}_total"] = sessions[name]
+    return Response(METRICS.render(extra), mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/jobs", methods=["POST"])
+def create_job():
+    """
+    Queue a search in the background; takes the same body as /solve.
+
+    Returns 202 with the job (poll GET /jobs/<id>), 400 for an invalid
+    request, or 429 when too many jobs are waiting.
+    """
+    data = request.get_json()
+    is_valid, err, _ = SchemaValidator.validate(data)
+    if not is_valid:
+        return jsonify({"error": err}), 400
+
+    def run(job: Job):
+        with app.app_context():
+            response_data, root, tree = run_search(data, job)
+            if root is None:
+                error, _ = response_data
+                raise RuntimeError(error.get_json()["error"])
+            response_data["tree"] = root.to_json() if tree != "none" else None
+            return response_data
+
+    try:
+        job = JOBS.submit(run)
+    except QueueFull as e:
+        return jsonify({"error": f"Too many queued jobs: {e}"}), 429, {"Retry-After": "1"}
+    return jsonify(job.to_json()), 202, {"Location": f"/jobs/{job.id}"}
+
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def get_job(job_id: str):
+    """
+    Status of a job. While it runs, progress holds the depth being searched,
+    the nodes so far, and the best move and value of the deepest completed
+    depth; once done, result holds the /solve response.
+    """
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.to_json())
+
+
+@app.route("/jobs/<job_id>", methods=["DELETE"])
+def cancel_job(job_id: str):
+    """Cancel a job; a running search stops soon after and keeps its deepest result."""
+    job = JOBS.cancel(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job"}), 404
+    return jsonify(job.to_json()), 202
+
+
+@app.route("/sessions", methods=["POST"])
+def create_session():
+    """
+    Start a game against the AI. Takes the /solve parameters, with the
+    position optional (the empty board by default); every search of the game
+    uses them.
+
+    The session keeps its solver between turns, so each search reuses the
+    transposition table and move ordering tables of the previous ones.
+    Returns 201 with the session, or 413 if its table alone exceeds the
+    session memory limit.
+    """
+    is_valid, err, params = SchemaValidator.validate(request.get_json(), SchemaValidator.SESSION_SCHEMA)
+    if not is_valid:
+        return jsonify({"error": err}), 400
+    try:
+        board = decode_board(params)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if Session.table_bytes(params["tt_size"]) > SESSIONS.max_bytes:
+        # Refuse before allocating the table
+        return jsonify({"error": f"tt_size {params['tt_size']} does not fit in the session memory limit"}), 413
+
+    session = Session(params, board, BatchSearch.make_solver(params))
+    try:
+        SESSIONS.add(session)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 413
+    return jsonify(session.to_json()), 201, {"Location": f"/sessions/{session.id}"}
+
+
+@app.route("/sessions/<session_id>", methods=["GET"])
+def get_session(session_id: str):
+    """The game so far, with the previous search's tree below the current position (if kept)."""
+    session = SESSIONS.get(session_id)
+    if session is None:
+        return jsonify({"error": "Unknown session"}), 404
+    return jsonify({**session.to_json(), "tree": session.tree.to_json() if session.tree is not None else None})
+
+
+@app.route("/sessions/<session_id>", methods=["DELETE"])
+def delete_session(session_id: str):
+    if SESSIONS.remove(session_id) is None:
+        return jsonify({"error": "Unknown session"}), 404
+    return "", 204
+
+
+@app.route("/sessions/<session_id>/move", methods=["POST"])
+def session_move(session_id: str):
+    """
+    Play the opponent's move {"col": 0-6}, then the AI's reply. When the AI
+    moves first, send {} for its first move.
+
+    Returns the /solve response for the AI's move with the session state
+    under "session"; 400 for a move out of turn; 409 while another move of
+    the session is in progress.
+    """
+    session = SESSIONS.get(session_id)
+    if session is None:
+        return jsonify({"error": "Unknown session"}), 404
+    is_valid, err, data = SchemaValidator.validate(request.get_json(), SchemaValidator.MOVE_SCHEMA)
+    if not is_valid:
+        return jsonify({"error": err}), 400
+    if not session.lock.acquire(blocking=False):
+        return jsonify({"error": "A move of this session is in progress"}), 409
+
+    try:
+        params, ai_player = session.params, session.params["ai_player"]
+        if (data.get("col") is None) != session.ai_to_move():
+            error = ("It is the AI's turn: send {} to let it move" if session.ai_to_move()
+                     else "It is the opponent's turn: send its col")
+            return jsonify({"error": error}), 400
+        if data.get("col") is not None:
+            try:
+                session.play(data["col"], not ai_player)
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+
+        board = session.board
+        result = lookup_board(board, params)
+        if result is None:
+            session.start_search()
+            result = compute_board(board, params, solver=session.solver)
+        if "error" in result:
+            return jsonify({"error": result["error"]}), 422
+
+        response_data = board_response(board, params, result)
+        response_data["tree"] = result["root"].to_json() if params["tree"] != "none" else None
+        session.searched(result["root"])
+        if result["best_col"] is not None:
+            session.play(result["best_col"], ai_player)
+        SESSIONS.resized(session)
+        response_data["session"] = session.to_json()
+        return jsonify(response_data)
+    finally:
+        session.lock.release()
+
+
+@app.route("/solve/stream", methods=["POST"])
+def solve_stream():
+    """
+    Same search as /solve, streamed as NDJSON.
+
+    The first line is the /solve response without the tree; then, unless
+    tree is "none", one line per tree node in depth-first order as
+    {"id", "parent_id", "name", "attributes"} (see MiniMaxTree.iter_flat).
+
+    Only the encoding is streamed: the search runs, and builds its whole
+    tree in memory, before the first line is sent. Returns 400 when the
+    tree would keep more than STREAM_TREE_PLIES plies (a "full" tree keeps
+    depth plies; use "top-k" with a smaller tree_plies).
+    """
+    data = request.get_json()
+    is_valid, _, params = SchemaValidator.validate(data)
+    if is_valid and params["algorithm"] != "perfect":
+        plies = BatchSearch.tree_plies(params)
+        kept = params["depth"] if plies is None else min(plies, params["depth"])
+        if kept > STREAM_TREE_PLIES:
+            return jsonify({"error": f"Streamed trees keep at most {STREAM_TREE_PLIES} plies, "
+                                     f"this one would keep {kept}"}), 400
+
+    response_data, root, tree = run_search(data)
+    if root is None:
+        return response_data
+
+    def generate():
+        yield json.dumps(response_data) + "\n"
+        if tree != "none":
+            for node in root.iter_flat():
+                yield json.dumps(node) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
 if __name__ == "__main__":
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper())
     app.run(debug=True, port=5050)
\ No newline at end of file
@@ -0,0 +1,129 @@
+import os
+import threading
+import uuid
+from concurrent.futures import as_completed
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from app import ParallelSearch
+from app.Board import Board, ROWS, COLS
+from app.MiniMaxTree import MiniMaxTree
+from app.PerfectSolver import PerfectSolver
+from app.Solver import Solver, SearchAborted
+
+# Solver (or PerfectSolver) a worker process reuses for every position of one
+# batch, so that they all share its transposition table.
+_worker_solver: Optional[Tuple[str, Any]] = None
+
+
+def tree_plies(params: Dict[str, Any]) -> Optional[int]:
+    """Plies of the search tree to keep: none, the top tree_plies, or everything."""
+    return {"none": 0, "top-k": params["tree_plies"], "full": None}[params["tree"]]
+
+
+def make_solver(params: Dict[str, Any], workers: Optional[int] = None) -> Union[Solver, PerfectSolver]:
+    """
+    Solver for validated /solve parameters (a PerfectSolver for "perfect").
+    The requested workers are capped at the shared pool's size.
+    """
+    if params["algorithm"] == "perfect":
+        return PerfectSolver(tt_size=params["tt_size"])
+    return Solver(depth=params["depth"], prune=params["prune"], ai_player=params["ai_player"],
+                  tt_size=params["tt_size"], ordering=params["ordering"],
+                  workers=min(params["workers"] if workers is None else workers, ParallelSearch.max_workers()),
+                  tree_plies=tree_plies(params),
+                  forced_moves=params["forced_moves"], chance_chosen=params["chance_chosen"],
+                  pvs=params["pvs"], aspiration=params.get("aspiration"))
+
+
+def solve_position(board: Board, params: Dict[str, Any], solver: Union[Solver, PerfectSolver],
+                   cancel: Optional[threading.Event] = None,
+                   on_iteration: Optional[Callable[[int, Optional[int], float, int], None]] = None) -> Dict[str, Any]:
+    """
+    Search one position with validated /solve parameters.
+
+    The solver is reused as is, so consecutive positions share its
+    transposition table.
+
+    Args:
+        board (Board): Position to search.
+        params (Dict[str, Any]): Validated request parameters.
+        solver (Union[Solver, PerfectSolver]): From make_solver(params).
+        cancel (Optional[threading.Event]): Stops the search once set.
+        on_iteration (Optional[Callable]): Progress callback; when given, the
+            search deepens iteratively (see Solver.run_iterative).
+
+    Returns:
+        Dict with best_col, value, nodes, depth_reached, root, worker_nodes,
+        tt and stats (SearchStats); or with just "error" when a perfect solve
+        runs out of budget.
+    """
+    algorithm = params["algorithm"]
+    time_ms, max_nodes = params.get("time_ms"), params.get("max_nodes")
+    if algorithm == "perfect":
+        try:
+            best_col, best_val = solver.solve(board, params["ai_player"], time_ms=time_ms, max_nodes=max_nodes,
+                                              cancel=cancel)
+        except SearchAborted as e:
+            return {"error": f"Position not solved within the budget ({e.nodes} nodes)"}
+        return {"best_col": best_col, "value": best_val, "nodes": solver.nodes,
+                "depth_reached": ROWS * COLS - board.mask.bit_count(),
+                "root": MiniMaxTree(move=None, player=None, value=best_val, depth=0), "worker_nodes": None,
+                "tt": solver.tt.stats() if solver.tt is not None else None, "stats": None}
+
+    if on_iteration is not None or cancel is not None or time_ms is not None or max_nodes is not None:
+        best_col, best_val, nodes, root, depth_reached = solver.run_iterative(
+            board, algorithm, time_ms=time_ms, max_nodes=max_nodes, cancel=cancel, on_iteration=on_iteration)
+    elif algorithm == "minimax":
+        best_col, best_val, nodes, root = solver.run_minimax(board)
+        depth_reached = params["depth"]
+    else:
+        best_col, best_val, nodes, root = solver.run_expectiminimax(board)
+        depth_reached = params["depth"]
+    return {"best_col": best_col, "value": best_val, "nodes": nodes, "depth_reached": depth_reached, "root": root,
+            "worker_nodes": solver.worker_nodes or None, "tt": solver.tt.stats() if solver.tt is not None else None,
+            "stats": solver.stats}
+
+
+def solve_many(boards: List[Board], params: Dict[str, Any], workers: int = 1) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Search many positions with the same parameters, sharing search state.
+
+    Positions with more stones are searched first: the table entries they
+    leave are deep enough to settle the same positions when they come up
+    inside the search of an earlier position of the game (the other way
+    round, they would be too shallow to reuse). Such entries can come from
+    deeper searches than asked for, so a value may differ slightly from
+    what a separate search of the position gives.
+
+    With one worker the positions are searched here by a single solver.
+    With more, each position goes to a process of the shared pool (at most
+    ParallelSearch.max_workers() run at once), and each process keeps one
+    solver for the whole batch; results then arrive as they finish.
+
+    Yields:
+        (index in `boards`, solve_position result)
+    """
+    order = sorted(range(len(boards)), key=lambda i: -boards[i].mask.bit_count())
+    if min(workers, ParallelSearch.max_workers()) <= 1:
+        solver = make_solver(params)
+        for i in order:
+            yield i, solve_position(boards[i], params, solver)
+        return
+
+    executor = ParallelSearch.get_executor()
+    batch_id = uuid.uuid4().hex
+    futures = {executor.submit(_solve_in_worker, batch_id, params, boards[i].p1_bits, boards[i].p2_bits): i
+               for i in order}
+    for future in as_completed(futures):
+        yield futures[future], future.result()
+
+
+def _solve_in_worker(batch_id: str, params: Dict[str, Any], p1: int, p2: int) -> Dict[str, Any]:
+    """Worker entry point: search one position of a batch."""
+    global _worker_solver
+    if _worker_solver is None or _worker_solver[0] != batch_id:
+        # Root splitting inside a worker process would start pools of its own
+        _worker_solver = (batch_id, make_solver(params, workers=1))
+    result = solve_position(Board(p1=p1, p2=p2), params, _worker_solver[1])
+    result["worker"] = os.getpid()
+    return result
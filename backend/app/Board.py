@@ -1,79 +1,316 @@
-from typing import List
+from typing import List, Tuple
 
 ROWS = 6
 COLS = 7
 
+# Bitboard layout: column-major, one bit per cell plus a sentinel row on top of
+# every column so that shifts never carry a line from one column into the next.
+#
+#   6 13 20 27 34 41 48   <- sentinel row (always 0)
+#   5 12 19 26 33 40 47
+#   4 11 18 25 32 39 46
+#   3 10 17 24 31 38 45
+#   2  9 16 23 30 37 44
+#   1  8 15 22 29 36 43
+#   0  7 14 21 28 35 42   <- row 0 (bottom)
+H1 = ROWS + 1
+
+BOTTOM_MASK = sum(1 << (c * H1) for c in range(COLS))
+BOARD_MASK = BOTTOM_MASK * ((1 << ROWS) - 1)
+COLUMN_MASKS = tuple(((1 << ROWS) - 1) << (c * H1) for c in range(COLS))
+BOTTOM_BITS = tuple(1 << (c * H1) for c in range(COLS))
+TOP_BITS = tuple(1 << (ROWS - 1 + c * H1) for c in range(COLS))
+# Whole columns including the sentinel bit
+_KEY_COLUMN_MASKS = tuple(((1 << H1) - 1) << (c * H1) for c in range(COLS))
+
+# Shift for each line direction: vertical, horizontal, diagonal "\" and "/"
+DIRECTIONS = (1, H1, H1 - 1, H1 + 1)
+
+
+def cell_bit(row: int, col: int) -> int:
+    """Return the bitboard bit for the cell at (row, col)."""
+    return 1 << (col * H1 + row)
+
+
+def count_fours(bits: int) -> int:
+    """
+    Count all 4-in-a-row windows fully covered by `bits`.
+
+    Overlapping windows are counted separately.
+    """
+    count = 0
+    for shift in DIRECTIONS:
+        m = bits & (bits >> shift)
+        count += (m & (m >> (2 * shift))).bit_count()
+    return count
+
+
+def winning_cells(bits: int, mask: int) -> int:
+    """
+    Return the empty cells that would complete a 4-in-a-row for `bits`.
+
+    Args:
+        bits (int): Bitboard of the player's pieces.
+        mask (int): Bitboard of all occupied cells.
+
+    Returns:
+        int: Bitboard of empty cells (playable or not) that finish a line.
+    """
+    # Vertical: only the cell on top of three stacked pieces
+    r = (bits << 1) & (bits << 2) & (bits << 3)
+
+    for shift in (H1, H1 - 1, H1 + 1):
+        # Two pieces on one side of the cell...
+        p = (bits << shift) & (bits << (2 * shift))
+        r |= p & (bits << (3 * shift))     # ...and a third further on that side
+        r |= p & (bits >> shift)           # ...and one on the other side
+        p = (bits >> shift) & (bits >> (2 * shift))
+        r |= p & (bits << shift)
+        r |= p & (bits >> (3 * shift))
+
+    return r & (BOARD_MASK ^ mask)
+
+
+def playable_cells(mask: int) -> int:
+    """Return the cells a piece would land in, one per non-full column."""
+    return (mask + BOTTOM_MASK) & BOARD_MASK
+
+
+def mirror_col(col: int) -> int:
+    """Column `col` reflected left to right."""
+    return COLS - 1 - col
+
+
+def mirror_bits(bits: int) -> int:
+    """Reflect a bitboard (or position key) left to right by swapping whole columns."""
+    # Column c moves by (COLS-1-2c) columns; the masks include the sentinel
+    # bit, which position keys use.
+    m = _KEY_COLUMN_MASKS
+    return (((bits & m[0]) << 6 * H1) | ((bits & m[1]) << 4 * H1) | ((bits & m[2]) << 2 * H1) | (bits & m[3])
+            | ((bits & m[4]) >> 2 * H1) | ((bits & m[5]) >> 4 * H1) | ((bits & m[6]) >> 6 * H1))
+
+
+def _build_windows() -> tuple:
+    windows = []
+    # Horizontal
+    for r in range(ROWS):
+        for c in range(COLS - 3):
+            windows.append(sum(cell_bit(r, c + i) for i in range(4)))
+    # Vertical
+    for r in range(ROWS - 3):
+        for c in range(COLS):
+            windows.append(sum(cell_bit(r + i, c) for i in range(4)))
+    # Diagonal down-right
+    for r in range(ROWS - 3):
+        for c in range(COLS - 3):
+            windows.append(sum(cell_bit(r + i, c + i) for i in range(4)))
+    # Diagonal down-left
+    for r in range(ROWS - 3):
+        for c in range(3, COLS):
+            windows.append(sum(cell_bit(r + i, c - i) for i in range(4)))
+    return tuple(windows)
+
+
+# Every 4-cell window on the board (69 in total)
+WINDOW_MASKS = _build_windows()
+
+
 class Board:
-    __slots__ = ("__p1", "__p2", "__free")
+    __slots__ = ("__p1", "__p2", "__mask", "__moves")
 
     def __init__(self,
                  matrix: List[List[int]] | None = None,
-                 p1: bytearray | None = None,
-                 p2: bytearray | None = None,
-                 free_positions: bytearray | None = None):
+                 p1: int | None = None,
+                 p2: int | None = None,
+                 moves: List[int] | None = None):
         """
         Initialize a Connect4 board.
 
         Parameters:
         - matrix: Optional ROWS x COLS matrix (0=empty, 1=player1, 2=player2)
-        - p1, p2, free_positions: Optional internal representation (bitboards)
+        - p1, p2: Optional internal representation (bitboards)
+        - moves: Optional move stack (bits of the moves made with play)
         """
         if matrix is not None:
             self.load_from_matrix(matrix)
             return
 
-        self.__p1 = p1.copy() if p1 is not None else bytearray(ROWS)
-        self.__p2 = p2.copy() if p2 is not None else bytearray(ROWS)
-        self.__free = free_positions.copy() if free_positions is not None else bytearray(COLS)
+        self.__p1 = p1 if p1 is not None else 0
+        self.__p2 = p2 if p2 is not None else 0
+        self.__mask = self.__p1 | self.__p2
+        self.__moves = moves.copy() if moves is not None else []
 
     def load_from_matrix(self, matrix: List[List[int]]):
         """
         Load board state from a ROWS x COLS integer matrix.
 
-        Updates internal bitboards (__p1, __p2) and free positions (__free).
+        Updates internal bitboards (__p1, __p2, __mask) and clears the move stack.
 
         Raises:
             ValueError: if matrix values are incorrect.
         """
-        self.__p1 = bytearray(ROWS)
-        self.__p2 = bytearray(ROWS)
-        self.__free = bytearray(COLS)
-
-        for r in range(ROWS):
-            for c in range(COLS):
-                val = matrix[r][c]
-                if r < ROWS - 1 and val == 0 and matrix[r + 1][c] != 0:
-                    raise ValueError(f"Invalid Board: There is an empty slot between to two tiles at board[{r}][{c}] = {matrix[r][c]}")
+        if len(matrix) != ROWS or any(len(row) != COLS for row in matrix):
+            raise ValueError(f"Invalid Board: expected {ROWS} rows of {COLS} cells")
+        p1 = p2 = 0
+        for r, row in enumerate(matrix):
+            for c, val in enumerate(row):
+                if type(val) is not int:
+                    # true and 1.0 compare equal to 1, but aren't cell values
+                    raise ValueError(f"Invalid Board: board[{r}][{c}] = {val!r} is not 0, 1 or 2")
+                if val == 0:
+                    continue
                 if val == 1:
-                    self.play(c, True)
+                    p1 |= 1 << (c * H1 + r)
                 elif val == 2:
-                    self.play(c, False)
+                    p2 |= 1 << (c * H1 + r)
+                else:
+                    raise ValueError(f"Invalid Board: board[{r}][{c}] = {val} is not 0, 1 or 2")
+
+        if not Board.__stacked(p1 | p2):
+            # Slow path only to name the offending cell
+            for r in range(ROWS - 1):
+                for c in range(COLS):
+                    if matrix[r][c] == 0 and matrix[r + 1][c] != 0:
+                        raise ValueError(f"Invalid Board: There is an empty slot between to two tiles at board[{r}][{c}] = {matrix[r][c]}")
+
+        self.__p1 = p1
+        self.__p2 = p2
+        self.__mask = p1 | p2
+        self.__moves = []
+
+    @staticmethod
+    def from_moves(moves: str) -> "Board":
+        """
+        Board reached by a move sequence, player1 moving first. As with a
+        matrix, the move stack starts empty.
+
+        Parameters:
+        - moves: Columns played, as 1-based digits (e.g. "4453")
+
+        Raises:
+            ValueError: if a character is not a column or a column is full.
+        """
+        board = Board()
+        player = True
+        for i, ch in enumerate(moves):
+            if not "1" <= ch <= str(COLS):
+                raise ValueError(f"Invalid move {ch!r} at index {i}: columns are 1 to {COLS}")
+            board.play(ord(ch) - ord("1"), player)
+            player = not player
+        board.__moves = []
+        return board
+
+    @staticmethod
+    def from_position(position: int, mask: int) -> "Board":
+        """
+        Board from a packed (position, mask) pair, as in key().
+
+        Parameters:
+        - position: Bitboard of player1 pieces
+        - mask: Bitboard of all occupied cells
+
+        Raises:
+            ValueError: if the bitboards are not a position of the layout above.
+        """
+        if mask & ~BOARD_MASK or position & ~mask:
+            raise ValueError("Invalid Board: position must be a subset of mask, and mask of the board cells")
+        if not Board.__stacked(mask):
+            raise ValueError("Invalid Board: mask has an empty slot below a tile")
+        return Board(p1=position, p2=position ^ mask)
+
+    @staticmethod
+    def __stacked(mask: int) -> bool:
+        """True if every column of `mask` is filled from the bottom without gaps."""
+        # Adding a bottom bit carries up to the first empty cell of the column;
+        # the carry only lands on a tile if there is a gap below it
+        return (mask + BOTTOM_MASK) & mask == 0
+
+    def __reduce__(self):
+        # Pickle as the two bitboards (plus the move stack) rather than slot by slot
+        return Board, (None, self.__p1, self.__p2, self.__moves)
 
     def copy(self) -> "Board":
-        return Board(p1=self.__p1, p2=self.__p2, free_positions=self.__free)
+        return Board(p1=self.__p1, p2=self.__p2, moves=self.__moves)
+
+    @property
+    def p1_bits(self) -> int:
+        """Bitboard of player1 pieces."""
+        return self.__p1
+
+    @property
+    def p2_bits(self) -> int:
+        """Bitboard of player2 pieces."""
+        return self.__p2
+
+    @property
+    def mask(self) -> int:
+        """Bitboard of all occupied cells."""
+        return self.__mask
+
+    def key(self) -> int:
+        """
+        Unique 49-bit key of the position.
+
+        Adding the mask to player1's bits sets the bit just above every column's
+        top piece, which makes the sum unique for every (p1, p2) pair.
+        """
+        return self.__p1 + self.__mask
+
+    def mirrored_key(self) -> int:
+        """Key of the position reflected left to right."""
+        return mirror_bits(self.__p1 + self.__mask)
+
+    def canonical_key(self) -> Tuple[int, bool]:
+        """
+        Key shared by the position and its mirror image.
+
+        Returns:
+            Tuple of (min of key and mirrored key, True if the mirrored key was
+            taken). Moves stored under a mirrored key must be passed through
+            mirror_col on the way in and out.
+        """
+        key = self.__p1 + self.__mask
+        mirrored = mirror_bits(key)
+        if mirrored < key:
+            return mirrored, True
+        return key, False
+
+    def bits(self, player: bool) -> int:
+        """Bitboard of the given player's pieces."""
+        return self.__p1 if player else self.__p2
 
     @property
     def p1(self) -> bytearray:
-        return self.__p1.copy()
+        """Row-major view of player1 pieces (bit c of row r = cell (r, c))."""
+        return Board.__to_rows(self.__p1)
 
     @property
     def p2(self) -> bytearray:
-        return self.__p2.copy()
+        """Row-major view of player2 pieces (bit c of row r = cell (r, c))."""
+        return Board.__to_rows(self.__p2)
 
     @property
     def free_positions(self) -> bytearray:
-        return self.__free.copy()
+        return bytearray(self.free_position(c) for c in range(COLS))
 
     def free_position(self, i: int) -> int:
-        return self.__free[i]
+        return ((self.__mask >> (i * H1)) & 0x7F).bit_length()
+
+    @property
+    def move_count(self) -> int:
+        """Number of moves on the move stack (moves that can be undone)."""
+        return len(self.__moves)
 
     def legal_moves(self) -> List[int]:
-        return [c for c in range(COLS) if self.__free[c] < ROWS]
+        mask = self.__mask
+        return [c for c in range(COLS) if not mask & TOP_BITS[c]]
 
     def play(self, col: int, player: bool) -> None:
         """
         Make a move for the given player in the specified column.
 
+        The move is pushed on the move stack so it can be taken back with undo.
+
         Parameters:
         - col: Column to play (0-based)
         - player: True for player1, False for player2
@@ -84,16 +321,37 @@ class Board:
         if not (0 <= col < COLS):
             raise ValueError(f"Column out of range: {col}")
 
-        row = self.__free[col]
-        if row >= ROWS:
+        if self.__mask & TOP_BITS[col]:
             raise ValueError(f"Column {col} is full")
 
+        move = (self.__mask + BOTTOM_BITS[col]) & COLUMN_MASKS[col]
         if player:
-            self.__p1[row] |= (1 << col)
+            self.__p1 |= move
         else:
-            self.__p2[row] |= (1 << col)
+            self.__p2 |= move
+        self.__mask |= move
+        self.__moves.append(move)
+
+    def undo(self) -> int:
+        """
+        Take back the last move made with play.
+
+        Returns:
+            int: Column of the move that was taken back.
 
-        self.__free[col] = row + 1
+        Raises:
+            ValueError: if there is no move to undo.
+        """
+        if not self.__moves:
+            raise ValueError("No move to undo")
+
+        move = self.__moves.pop()
+        if self.__p1 & move:
+            self.__p1 ^= move
+        else:
+            self.__p2 ^= move
+        self.__mask ^= move
+        return (move.bit_length() - 1) // H1
 
     def apply_action(self, col: int, player: bool) -> "Board":
         """
@@ -105,18 +363,18 @@ class Board:
 
     def neighbours(self, player: bool) -> List["Board"]:
         """Return all possible next boards for the given player (non-mutating)."""
-        return [self.apply_action(c, player) for c in range(COLS) if self.__free[c] < ROWS]
+        return [self.apply_action(c, player) for c in self.legal_moves()]
 
     def is_terminal(self) -> bool:
         """Return True if the board is full (no legal moves left)."""
-        return all(f >= ROWS for f in self.__free)
+        return self.__mask == BOARD_MASK
 
     def utility(self) -> int:
         """
         Compute utility value: number of 4-in-a-rows for player1 minus player2.
         Useful for evaluating immediate wins/losses.
         """
-        return self.count_connected(True) - self.count_connected(False)
+        return count_fours(self.__p1) - count_fours(self.__p2)
 
     def count_connected(self, player: bool) -> int:
         """
@@ -125,34 +383,7 @@ class Board:
         Includes horizontal, vertical, and diagonal connections.
         Overlapping connections are counted separately.
         """
-        bit_rows = self.__p1 if player else self.__p2
-        count = 0
-
-        # Horizontal
-        for r in range(ROWS):
-            for c in range(COLS - 3):
-                if all(((bit_rows[r] >> (c + i)) & 1) for i in range(4)):
-                    count += 1
-
-        # Vertical
-        for r in range(ROWS - 3):
-            for c in range(COLS):
-                if all(((bit_rows[r + i] >> c) & 1) for i in range(4)):
-                    count += 1
-
-        # Diagonal down-right
-        for r in range(ROWS - 3):
-            for c in range(COLS - 3):
-                if all(((bit_rows[r + i] >> (c + i)) & 1) for i in range(4)):
-                    count += 1
-
-        # Diagonal down-left
-        for r in range(ROWS - 3):
-            for c in range(3, COLS):
-                if all(((bit_rows[r + i] >> (c - i)) & 1) for i in range(4)):
-                    count += 1
-
-        return count
+        return count_fours(self.__p1 if player else self.__p2)
 
     def to_matrix(self) -> List[List[int]]:
         """
@@ -167,12 +398,22 @@ class Board:
         mat = [[0] * COLS for _ in range(ROWS)]
         for r in range(ROWS):
             for c in range(COLS):
-                if (self.__p1[r] >> c) & 1:
+                bit = cell_bit(r, c)
+                if self.__p1 & bit:
                     mat[r][c] = 1
-                elif (self.__p2[r] >> c) & 1:
+                elif self.__p2 & bit:
                     mat[r][c] = 2
         return mat
 
+    @staticmethod
+    def __to_rows(bits: int) -> bytearray:
+        rows = bytearray(ROWS)
+        for r in range(ROWS):
+            for c in range(COLS):
+                if bits & cell_bit(r, c):
+                    rows[r] |= (1 << c)
+        return rows
+
     def __repr__(self) -> str:
         """
         Human-readable string representation.
@@ -185,9 +426,10 @@ class Board:
         for r in reversed(range(ROWS)):
             row_chars = []
             for c in range(COLS):
-                if (self.__p1[r] >> c) & 1:
+                bit = cell_bit(r, c)
+                if self.__p1 & bit:
                     row_chars.append("X")
-                elif (self.__p2[r] >> c) & 1:
+                elif self.__p2 & bit:
                     row_chars.append("O")
                 else:
                     row_chars.append(".")
@@ -1,5 +1,35 @@
-from typing import List
-from app.Board import Board, ROWS, COLS
+from typing import Dict, Sequence, List
+import numpy as np
+from app.Board import Board, BOARD_MASK, BOTTOM_MASK, ROWS, COLS, COLUMN_MASKS, H1, WINDOW_MASKS, TOP_BITS
+from app.Threats import split_threats
+
+CENTER_MASK = COLUMN_MASKS[COLS // 2]
+TOP_MASK = sum(TOP_BITS)
+
+# Window masks as a NumPy row for batch evaluation
+_WINDOWS = np.array(WINDOW_MASKS, dtype=np.uint64)
+_POPCOUNT8 = np.array([bin(i).count("1") for i in range(256)], dtype=np.int64)
+
+
+def _popcount(x: np.ndarray) -> np.ndarray:
+    """Per-element popcount of a uint64 array."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(x).astype(np.int64)
+    return _POPCOUNT8[np.ascontiguousarray(x).view(np.uint8).reshape(x.shape + (8,))].sum(axis=-1)
+
+
+def _winning_cells(bits: np.ndarray, empty: np.ndarray) -> np.ndarray:
+    """Board.winning_cells for a uint64 array (`empty` = BOARD_MASK ^ mask)."""
+    s = [np.uint64(k) for k in range(4 * (H1 + 1))]
+    r = (bits << s[1]) & (bits << s[2]) & (bits << s[3])
+    for d in (H1, H1 - 1, H1 + 1):
+        p = (bits << s[d]) & (bits << s[2 * d])
+        r |= p & (bits << s[3 * d])
+        r |= p & (bits >> s[d])
+        p = (bits >> s[d]) & (bits >> s[2 * d])
+        r |= p & (bits << s[d])
+        r |= p & (bits >> s[3 * d])
+    return r & empty
 
 class BoardEvaluator:
     """
@@ -14,6 +44,7 @@ class BoardEvaluator:
       - Open 2-in-a-row opportunities
       - Mobility (number of legal moves)
       - Center column control (strategic advantage)
+      - Threat cells (see app/Threats.py), playable now or deferred
     """
 
     WIN_4_WEIGHT = 10_000.0      # Winning 4-in-a-row is critical
@@ -21,6 +52,46 @@ class BoardEvaluator:
     OPEN_2_WEIGHT = 8.0          # Open 2-in-a-row: small advantage
     MOBILITY_WEIGHT = 1.0        # Extra score for having more moves
     CENTER_WEIGHT = 3.0          # Control of the center column is advantageous
+    PLAYABLE_THREAT_WEIGHT = 10.0   # Threat on a playable cell: likely blocked next move
+    DEFERRED_THREAT_WEIGHT = 25.0   # Threat above an empty cell: can't be blocked directly
+
+    # Every score lies in [-SCORE_BOUND, SCORE_BOUND]. Each window counts in at
+    # most one of the 4/3/2 features, so those add up to at most WIN_4_WEIGHT
+    # per window; the other features are bounded by the board size.
+    SCORE_BOUND = (WIN_4_WEIGHT * len(WINDOW_MASKS) + MOBILITY_WEIGHT * COLS + CENTER_WEIGHT * ROWS
+                   + PLAYABLE_THREAT_WEIGHT * COLS + DEFERRED_THREAT_WEIGHT * ROWS * COLS)
+
+    WEIGHT_NAMES = ("WIN_4_WEIGHT", "OPEN_3_WEIGHT", "OPEN_2_WEIGHT", "MOBILITY_WEIGHT", "CENTER_WEIGHT",
+                    "PLAYABLE_THREAT_WEIGHT", "DEFERRED_THREAT_WEIGHT")
+
+    # -----------------------
+    # Weights
+    # -----------------------
+    @staticmethod
+    def weights() -> Dict[str, float]:
+        """Current feature weights by name (see WEIGHT_NAMES)."""
+        return {name: getattr(BoardEvaluator, name) for name in BoardEvaluator.WEIGHT_NAMES}
+
+    @staticmethod
+    def set_weights(**weights: float) -> None:
+        """
+        Change feature weights for every evaluator in this process (e.g. to
+        compare weight sets) and recompute SCORE_BOUND to match.
+
+        Raises:
+            ValueError: for an unknown weight name.
+        """
+        unknown = set(weights) - set(BoardEvaluator.WEIGHT_NAMES)
+        if unknown:
+            raise ValueError(f"Unknown weights: {', '.join(sorted(unknown))}")
+        for name, value in weights.items():
+            setattr(BoardEvaluator, name, float(value))
+        w = BoardEvaluator.weights()
+        # Same bound as above, without assuming a four outweighs the open 3s and 2s
+        window = max(abs(w["WIN_4_WEIGHT"]), abs(w["OPEN_3_WEIGHT"]), abs(w["OPEN_2_WEIGHT"]))
+        BoardEvaluator.SCORE_BOUND = (window * len(WINDOW_MASKS) + abs(w["MOBILITY_WEIGHT"]) * COLS
+                                      + abs(w["CENTER_WEIGHT"]) * ROWS + abs(w["PLAYABLE_THREAT_WEIGHT"]) * COLS
+                                      + abs(w["DEFERRED_THREAT_WEIGHT"]) * ROWS * COLS)
 
     # -----------------------
     # Public evaluation method
@@ -56,13 +127,93 @@ class BoardEvaluator:
         # Center column control: strategic advantage
         center_control = BoardEvaluator._center_control(board, ai_player) - BoardEvaluator._center_control(board, not ai_player)
 
+        # Threat cells, playable right now or waiting for the column to fill
+        ai_playable, ai_deferred = split_threats(board.bits(ai_player), board.mask)
+        hum_playable, hum_deferred = split_threats(board.bits(not ai_player), board.mask)
+        playable_threats = ai_playable.bit_count() - hum_playable.bit_count()
+        deferred_threats = ai_deferred.bit_count() - hum_deferred.bit_count()
+
         # Final heuristic score (weighted sum)
+        return BoardEvaluator.combine(ai4, hum4, ai3, hum3, ai2, hum2, mobility, center_control,
+                                      playable_threats, deferred_threats)
+
+    @staticmethod
+    def evaluate_many(boards: Sequence[Board], ai_player: bool) -> List[float]:
+        """
+        Evaluate a batch of boards in one vectorized pass.
+
+        All boards are packed into NumPy arrays and every feature is computed
+        for the whole batch against the precomputed window masks; the scores
+        are identical to calling evaluate on each board.
+
+        Args:
+            boards (Sequence[Board]): Boards to evaluate.
+            ai_player (bool): True if evaluating for AI, False for opponent.
+
+        Returns:
+            List[float]: Heuristic score of each board, in order.
+        """
+        n = len(boards)
+        if n == 0:
+            return []
+
+        ai = np.fromiter((b.bits(ai_player) for b in boards), dtype=np.uint64, count=n)
+        hum = np.fromiter((b.bits(not ai_player) for b in boards), dtype=np.uint64, count=n)
+
+        # Pieces of each side in every window: shape (n, 69)
+        ai_cnt = _popcount(ai[:, None] & _WINDOWS[None, :])
+        hum_cnt = _popcount(hum[:, None] & _WINDOWS[None, :])
+        ai_only = hum_cnt == 0
+        hum_only = ai_cnt == 0
+
+        ai4 = (ai_cnt == 4).sum(axis=1)
+        hum4 = (hum_cnt == 4).sum(axis=1)
+        ai3 = ((ai_cnt == 3) & ai_only).sum(axis=1)
+        hum3 = ((hum_cnt == 3) & hum_only).sum(axis=1)
+        ai2 = ((ai_cnt == 2) & ai_only).sum(axis=1)
+        hum2 = ((hum_cnt == 2) & hum_only).sum(axis=1)
+
+        full_tops = _popcount((ai | hum) & np.uint64(TOP_MASK))
+        mobility = COLS - full_tops
+        center = np.uint64(CENTER_MASK)
+        center_control = _popcount(ai & center) - _popcount(hum & center)
+
+        mask = ai | hum
+        empty = np.uint64(BOARD_MASK) ^ mask
+        playable = (mask + np.uint64(BOTTOM_MASK)) & np.uint64(BOARD_MASK)
+        ai_threats = _winning_cells(ai, empty)
+        hum_threats = _winning_cells(hum, empty)
+        playable_threats = _popcount(ai_threats & playable) - _popcount(hum_threats & playable)
+        deferred_threats = _popcount(ai_threats & ~playable) - _popcount(hum_threats & ~playable)
+
+        # Same operation order as combine so the floats match exactly
         score = (
             BoardEvaluator.WIN_4_WEIGHT * (ai4 - hum4) +
             BoardEvaluator.OPEN_3_WEIGHT * (ai3 - hum3) +
             BoardEvaluator.OPEN_2_WEIGHT * (ai2 - hum2) +
             BoardEvaluator.MOBILITY_WEIGHT * mobility +
-            BoardEvaluator.CENTER_WEIGHT * center_control
+            BoardEvaluator.CENTER_WEIGHT * center_control +
+            BoardEvaluator.PLAYABLE_THREAT_WEIGHT * playable_threats +
+            BoardEvaluator.DEFERRED_THREAT_WEIGHT * deferred_threats
+        )
+        return score.astype(np.float64).tolist()
+
+    @staticmethod
+    def combine(ai4: int, hum4: int, ai3: int, hum3: int, ai2: int, hum2: int,
+                mobility: int, center_control: int, playable_threats: int, deferred_threats: int) -> float:
+        """
+        Weighted sum of the heuristic features.
+
+        Shared by every evaluator so they all produce bit-identical scores.
+        """
+        score = (
+            BoardEvaluator.WIN_4_WEIGHT * (ai4 - hum4) +
+            BoardEvaluator.OPEN_3_WEIGHT * (ai3 - hum3) +
+            BoardEvaluator.OPEN_2_WEIGHT * (ai2 - hum2) +
+            BoardEvaluator.MOBILITY_WEIGHT * mobility +
+            BoardEvaluator.CENTER_WEIGHT * center_control +
+            BoardEvaluator.PLAYABLE_THREAT_WEIGHT * playable_threats +
+            BoardEvaluator.DEFERRED_THREAT_WEIGHT * deferred_threats
         )
 
         return float(score)
@@ -85,59 +236,16 @@ class BoardEvaluator:
         """
 
         # Bitboards for fast computation
-        bit_player = board.p1 if player else board.p2
-        bit_oppo = board.p2 if player else board.p1
-
-        # Matrix representation of the board for player and opponent
-        pmat = [[(bit_player[r] >> c) & 1 for c in range(COLS)] for r in range(ROWS)]
-        omat = [[(bit_oppo[r] >> c) & 1 for c in range(COLS)] for r in range(ROWS)]
+        bit_player = board.bits(player)
+        bit_oppo = board.bits(not player)
 
         count = 0
-
-        # Check all possible 4-cell windows horizontally
-        for r in range(ROWS):
-            for c in range(COLS - 3):
-                if BoardEvaluator._window_matches(pmat, omat, [(r, c + i) for i in range(4)], k):
-                    count += 1
-
-        # Check vertically
-        for r in range(ROWS - 3):
-            for c in range(COLS):
-                if BoardEvaluator._window_matches(pmat, omat, [(r + i, c) for i in range(4)], k):
-                    count += 1
-
-        # Check diagonal down-right
-        for r in range(ROWS - 3):
-            for c in range(COLS - 3):
-                if BoardEvaluator._window_matches(pmat, omat, [(r + i, c + i) for i in range(4)], k):
-                    count += 1
-
-        # Check diagonal down-left
-        for r in range(ROWS - 3):
-            for c in range(3, COLS):
-                if BoardEvaluator._window_matches(pmat, omat, [(r + i, c - i) for i in range(4)], k):
-                    count += 1
+        for window in WINDOW_MASKS:
+            if not window & bit_oppo and (window & bit_player).bit_count() == k:
+                count += 1
 
         return count
 
-    @staticmethod
-    def _window_matches(pmat: List[List[int]], omat: List[List[int]], positions: List[tuple], k: int) -> bool:
-        """
-        Check if a window has exactly `k` player pieces and zero opponent pieces.
-
-        Args:
-            pmat (List[List[int]]): Player board matrix.
-            omat (List[List[int]]): Opponent board matrix.
-            positions (List[tuple]): List of cell positions [(r, c), ...].
-            k (int): Exact number of player pieces required.
-
-        Returns:
-            bool: True if window matches, False otherwise.
-        """
-        pc = sum(pmat[r][c] for r, c in positions)
-        oc = sum(omat[r][c] for r, c in positions)
-        return pc == k and oc == 0
-
     @staticmethod
     def _center_control(board: Board, player: bool) -> int:
         """
@@ -150,6 +258,4 @@ class BoardEvaluator:
         Returns:
             int: Number of pieces in center column.
         """
-        center_col = COLS // 2
-        bit_player = board.p1 if player else board.p2
-        return sum((bit_player[r] >> center_col) & 1 for r in range(ROWS))
+        return (board.bits(player) & CENTER_MASK).bit_count()
@@ -0,0 +1,83 @@
+import functools
+from typing import List, Tuple
+
+from app.Board import COLS, H1, ROWS, TOP_BITS
+
+TOP_ROW = sum(TOP_BITS)
+# Multiplying the top row (shifted down to bit c*H1 for column c) by this
+# moves column c's bit to (COLS-1)*H1 + c. No two partial products share a
+# bit, so nothing carries and the shift below leaves the 7 flags alone.
+_GATHER = sum(1 << ((COLS - 1) * H1 - c * (H1 - 1)) for c in range(COLS))
+_GATHER_SHIFT = (COLS - 1) * H1
+
+
+def full_columns(mask: int) -> int:
+    """Bit c set for every full column c of the occupancy `mask`."""
+    return ((((mask & TOP_ROW) >> (ROWS - 1)) * _GATHER) >> _GATHER_SHIFT) & ((1 << COLS) - 1)
+
+
+class ChanceModel:
+    """
+    Where a piece aimed at a column actually lands.
+
+    It lands in the chosen column with probability `chosen` and otherwise
+    slips to a neighbour, each side equally likely. The share of a full or
+    off-board neighbour goes to the other one; when both are unavailable the
+    piece always lands where it was aimed.
+
+    Every outcome list is computed once, for each column and each set of
+    full columns, so looking one up is a single index operation. Outcomes are
+    sorted by decreasing probability (the order chance nodes search them in).
+
+    Attributes:
+        chosen (float): Probability of landing in the chosen column.
+        DEFAULT_CHOSEN (float): The game's physics (0.6, neighbours 0.2 each).
+    """
+
+    DEFAULT_CHOSEN = 0.6
+
+    # Models are immutable, so every solver with the same probability shares
+    # one. chosen comes from requests, so only the most recent few are kept.
+    MAX_MODELS = 16
+
+    def __init__(self, chosen: float = DEFAULT_CHOSEN):
+        if not 0 < chosen <= 1:
+            raise ValueError(f"Probability of the chosen column must be in (0, 1]: {chosen}")
+        self.chosen = float(chosen)
+        self._table: List[List[Tuple[Tuple[int, float], ...]]] = [
+            [self._build(col, full) for full in range(1 << COLS)] for col in range(COLS)]
+
+    @staticmethod
+    def create(chosen: float = DEFAULT_CHOSEN) -> "ChanceModel":
+        """Shared model for `chosen` (one of the MAX_MODELS most recently used)."""
+        return _shared_model(float(chosen))
+
+    def outcomes(self, col: int, mask: int) -> Tuple[Tuple[int, float], ...]:
+        """
+        Possible landing columns of a piece aimed at `col`.
+
+        Args:
+            col (int): Column aimed at.
+            mask (int): Occupancy bitboard of the position.
+
+        Returns:
+            Tuple of (column, probability), most likely first; empty when
+            `col` is full.
+        """
+        return self._table[col][full_columns(mask)]
+
+    def _build(self, col: int, full: int) -> Tuple[Tuple[int, float], ...]:
+        if full >> col & 1:
+            return ()
+        slip = (1 - self.chosen) / 2
+        neighbours = [c for c in (col - 1, col + 1) if 0 <= c < COLS and not full >> c & 1]
+        if not neighbours or slip == 0:
+            return ((col, 1.0),)
+        outcomes = [(col, self.chosen)] + [(c, 2 * slip / len(neighbours)) for c in neighbours]
+        # Stable sort: neighbours keep their left-to-right order
+        return tuple(sorted(outcomes, key=lambda outcome: -outcome[1]))
+
+
+@functools.lru_cache(maxsize=ChanceModel.MAX_MODELS)
+def _shared_model(chosen: float) -> ChanceModel:
+    return ChanceModel(chosen)
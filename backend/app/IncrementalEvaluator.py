@@ -0,0 +1,130 @@
+from typing import List
+from app.Board import Board, ROWS, COLS, H1, WINDOW_MASKS
+from app.BoardEvaluator import BoardEvaluator
+from app.Threats import split_threats
+
+CENTER_COL = COLS // 2
+
+# Indices of the windows that contain each cell, by bit index (col * H1 + row)
+CELL_WINDOWS = tuple(
+    tuple(w for w, window in enumerate(WINDOW_MASKS) if window >> i & 1)
+    for i in range(COLS * H1)
+)
+
+
+class IncrementalEvaluator:
+    """
+    BoardEvaluator.evaluate kept up to date one move at a time.
+
+    Keeps the number of AI and human pieces in every 4-cell window, plus how
+    many windows hold exactly k pieces of one side and none of the other.
+    Playing a piece only touches the (at most 16) windows through its cell,
+    and threat cells come from the two bitboards kept alongside, so
+    evaluate() is O(1) and returns exactly what BoardEvaluator.evaluate would
+    return for the same position.
+
+    The evaluator mirrors the board it was created from; every play/undo on
+    that board must be repeated here.
+    """
+
+    __slots__ = ("ai_player", "_ai", "_hum", "_ai_open", "_hum_open",
+                 "_heights", "_mobility", "_center", "_stack", "_ai_bits", "_hum_bits")
+
+    def __init__(self, board: Board, ai_player: bool):
+        self.ai_player = ai_player
+        ai_bits = board.bits(ai_player)
+        hum_bits = board.bits(not ai_player)
+
+        self._ai: List[int] = [(w & ai_bits).bit_count() for w in WINDOW_MASKS]
+        self._hum: List[int] = [(w & hum_bits).bit_count() for w in WINDOW_MASKS]
+
+        # _ai_open[k]: windows with k AI pieces and no human piece (and vice versa)
+        self._ai_open = [0] * 5
+        self._hum_open = [0] * 5
+        for a, h in zip(self._ai, self._hum):
+            if h == 0:
+                self._ai_open[a] += 1
+            if a == 0:
+                self._hum_open[h] += 1
+
+        self._heights = [board.free_position(c) for c in range(COLS)]
+        self._mobility = sum(1 for h in self._heights if h < ROWS)
+        self._center = (BoardEvaluator._center_control(board, ai_player)
+                        - BoardEvaluator._center_control(board, not ai_player))
+        self._stack: List[int] = []
+        self._ai_bits = ai_bits
+        self._hum_bits = hum_bits
+
+    def play(self, col: int, player: bool) -> None:
+        """Record a piece of `player` dropped in `col`."""
+        row = self._heights[col]
+        self._heights[col] = row + 1
+        if row + 1 == ROWS:
+            self._mobility -= 1
+
+        cell = col * H1 + row
+        is_ai = player == self.ai_player
+        self._stack.append((cell << 1) | is_ai)
+
+        if is_ai:
+            own, other, own_open, other_open = self._ai, self._hum, self._ai_open, self._hum_open
+            self._ai_bits |= 1 << cell
+            if col == CENTER_COL:
+                self._center += 1
+        else:
+            own, other, own_open, other_open = self._hum, self._ai, self._hum_open, self._ai_open
+            self._hum_bits |= 1 << cell
+            if col == CENTER_COL:
+                self._center -= 1
+
+        for w in CELL_WINDOWS[cell]:
+            a = own[w]
+            h = other[w]
+            if h == 0:
+                own_open[a] -= 1
+                own_open[a + 1] += 1
+            elif a == 0:
+                other_open[h] -= 1
+            own[w] = a + 1
+
+    def undo(self) -> None:
+        """Take back the last recorded piece."""
+        entry = self._stack.pop()
+        cell = entry >> 1
+        col, row = divmod(cell, H1)
+        self._heights[col] = row
+        if row + 1 == ROWS:
+            self._mobility += 1
+
+        if entry & 1:
+            own, other, own_open, other_open = self._ai, self._hum, self._ai_open, self._hum_open
+            self._ai_bits ^= 1 << cell
+            if col == CENTER_COL:
+                self._center -= 1
+        else:
+            own, other, own_open, other_open = self._hum, self._ai, self._hum_open, self._ai_open
+            self._hum_bits ^= 1 << cell
+            if col == CENTER_COL:
+                self._center += 1
+
+        for w in CELL_WINDOWS[cell]:
+            a = own[w] - 1
+            h = other[w]
+            own[w] = a
+            if h == 0:
+                own_open[a + 1] -= 1
+                own_open[a] += 1
+            elif a == 0:
+                other_open[h] += 1
+
+    def evaluate(self) -> float:
+        """Score of the current position, identical to BoardEvaluator.evaluate."""
+        ai_open = self._ai_open
+        hum_open = self._hum_open
+        mask = self._ai_bits | self._hum_bits
+        ai_playable, ai_deferred = split_threats(self._ai_bits, mask)
+        hum_playable, hum_deferred = split_threats(self._hum_bits, mask)
+        return BoardEvaluator.combine(ai_open[4], hum_open[4], ai_open[3], hum_open[3],
+                                      ai_open[2], hum_open[2], self._mobility, self._center,
+                                      ai_playable.bit_count() - hum_playable.bit_count(),
+                                      ai_deferred.bit_count() - hum_deferred.bit_count())
@@ -0,0 +1,198 @@
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class QueueFull(Exception):
+    """Raised by JobManager.submit when max_queued jobs are already waiting."""
+
+
+class Job:
+    """
+    A search running in the background.
+
+    The job function reports progress with update() and polls `cancelled`
+    (or hands `cancel_event` to the search) to stop early.
+
+    Attributes:
+        id (str): Identifier returned to the client.
+        status (str): "queued", "running", "done", "failed" or "cancelled".
+        progress (Dict[str, Any]): Latest progress reported by the job.
+        result (Any): Value returned by the job function, once finished. A
+            cancelled job keeps whatever partial result it returned.
+        error (Optional[str]): Message of the exception that failed the job.
+        cancel_event (threading.Event): Set when the job is cancelled.
+    """
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = QUEUED
+        self.progress: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.cancel_event = threading.Event()
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._live: Optional[Callable[[], Dict[str, Any]]] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self.cancel_event.is_set()
+
+    def update(self, **progress: Any) -> None:
+        """Record progress (e.g. depth=5, best_col=3)."""
+        self.progress = {**self.progress, **progress}
+
+    def track(self, live: Callable[[], Dict[str, Any]]) -> None:
+        """Read extra progress from `live()` whenever the job is reported (e.g. a running node count)."""
+        self._live = live
+
+    def to_json(self) -> Dict[str, Any]:
+        progress = self.progress
+        if self._live is not None and self.status == RUNNING:
+            progress = {**progress, **self._live()}
+        return {
+            "id": self.id,
+            "status": self.status,
+            "progress": progress,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobManager:
+    """
+    Runs job functions on a fixed pool of daemon threads fed by a bounded queue.
+
+    At most `max_queued` jobs wait for a thread; submit() refuses more so the
+    caller can push back on clients. Finished jobs are kept for polling until
+    `keep_finished` newer ones have finished.
+
+    Searches hold the GIL while they run, so the threads share one core with
+    the web server. Use few workers and set Solver workers to spread a search
+    over processes. The threads are daemons: a running job never keeps the
+    server from exiting.
+    """
+
+    DEFAULT_WORKERS = 2
+    DEFAULT_QUEUE = 16
+    DEFAULT_KEEP = 256
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_queued: int = DEFAULT_QUEUE,
+                 keep_finished: int = DEFAULT_KEEP):
+        if workers < 1:
+            raise ValueError(f"workers must be positive: {workers}")
+        self.workers = workers
+        self.max_queued = max_queued
+        self.keep_finished = keep_finished
+        self._queue: "queue.Queue[Optional[Tuple[Job, Callable[[Job], Any]]]]" = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._threads = [threading.Thread(target=self._worker, name=f"job-{i}", daemon=True) for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable[[Job], Any]) -> Job:
+        """
+        Queue `fn(job)` to run on a worker thread.
+
+        Raises:
+            QueueFull: if max_queued jobs are already waiting.
+        """
+        job = Job()
+        with self._lock:
+            try:
+                self._queue.put_nowait((job, fn))
+            except queue.Full:
+                raise QueueFull(f"{self.max_queued} jobs are already queued") from None
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """
+        Ask a job to stop. A queued job is cancelled at once (and skipped
+        when its turn comes); a running one stops at its next cancellation check.
+
+        Returns:
+            The job, or None if there is no such job.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status in FINISHED:
+                return job
+            job.cancel_event.set()
+            if job.status == QUEUED:
+                self._finish(job, CANCELLED)
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            counts = {status: 0 for status in (QUEUED, RUNNING) + FINISHED}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+            return counts
+
+    def shutdown(self) -> None:
+        """Cancel every job and stop the threads once their current job ends."""
+        with self._lock:
+            for job in list(self._jobs.values()):
+                if job.status not in FINISHED:
+                    job.cancel_event.set()
+                    if job.status == QUEUED:
+                        self._finish(job, CANCELLED)
+        for _ in self._threads:
+            self._queue.put(None)
+
+    def _worker(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._run(*item)
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]) -> None:
+        with self._lock:
+            if job.status != QUEUED:
+                return  # cancelled while queued
+            job.status = RUNNING
+            job.started_at = time.time()
+        try:
+            result = fn(job)
+        except Exception as e:
+            with self._lock:
+                job.error = str(e)
+                self._finish(job, CANCELLED if job.cancelled else FAILED)
+            return
+        with self._lock:
+            job.result = result
+            self._finish(job, CANCELLED if job.cancelled else DONE)
+
+    def _finish(self, job: Job, status: str) -> None:
+        # Caller holds the lock
+        job.status = status
+        job.finished_at = time.time()
+        job._live = None
+        # Move to the end so the oldest finished jobs are dropped first
+        self._jobs.move_to_end(job.id)
+        finished = [key for key, other in self._jobs.items() if other.status in FINISHED]
+        for key in finished[:max(0, len(finished) - self.keep_finished)]:
+            del self._jobs[key]
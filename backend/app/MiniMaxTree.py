@@ -1,8 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+from app.Board import mirror_col
 
-@dataclass
+@dataclass(slots=True)
 class MiniMaxTree:
     move: Optional[int] = None              # column that led to this node (None at root)
     player: Optional[bool] = None           # True=AI, False=Human, None=Chance
@@ -16,9 +17,30 @@ class MiniMaxTree:
     def add_child(self, child: 'MiniMaxTree'):
         self.children.append(child)
 
-    def to_json(self) -> Dict[str, Any]:
+    def mirrored(self) -> MiniMaxTree:
+        """
+        Copy of the tree for the mirror-image position.
+
+        Every move (including chance outcomes) is reflected left to right.
+        """
+        def copy(node: MiniMaxTree) -> MiniMaxTree:
+            return MiniMaxTree(move=mirror_col(node.move) if node.move is not None else None,
+                               player=node.player, value=node.value, alpha=node.alpha, beta=node.beta,
+                               prob=node.prob, depth=node.depth)
+
+        root = copy(self)
+        stack = [(self, root)]
+        while stack:
+            node, clone = stack.pop()
+            for child in node.children:
+                child_clone = copy(child)
+                clone.children.append(child_clone)
+                stack.append((child, child_clone))
+        return root
+
+    def label(self) -> Tuple[str, Dict[str, Any]]:
         """
-        Convert TreeNode to a JSON-friendly structure for react-d3-tree.
+        Node type and display attributes for react-d3-tree.
         - Root is always MAX
         - Leaf nodes are VALUE nodes
         - Internal nodes show MAX/MIN/CHANCE
@@ -51,8 +73,33 @@ class MiniMaxTree:
         if self.prob != 1.0:
             attributes["prob"] = f"{self.prob:.2f}"
 
+        return name, attributes
+
+    def to_json(self) -> Dict[str, Any]:
+        """Convert TreeNode to a nested JSON-friendly structure for react-d3-tree."""
+        name, attributes = self.label()
         return {
             "name": name,
             "attributes": attributes,
             "children": [child.to_json() for child in self.children]
         }
+
+    def iter_flat(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the tree one node at a time in depth-first order.
+
+        Each node is a flat record {"id", "parent_id", "name", "attributes"}
+        with ids numbered in yield order (the root is 0 with parent_id None),
+        so a consumer can rebuild the tree without the whole thing being
+        materialized. Walks with an explicit stack, so deep trees don't hit
+        the recursion limit.
+        """
+        next_id = 0
+        stack = [(self, None)]
+        while stack:
+            node, parent_id = stack.pop()
+            name, attributes = node.label()
+            node_id = next_id
+            next_id += 1
+            yield {"id": node_id, "parent_id": parent_id, "name": name, "attributes": attributes}
+            stack.extend((child, node_id) for child in reversed(node.children))
@@ -0,0 +1,130 @@
+from typing import Dict, List, Optional
+from app.Board import Board, COLS, COLUMN_MASKS, winning_cells, playable_cells
+
+# Static order: center column first, then outwards
+CENTER_ORDER = (3, 2, 4, 1, 5, 0, 6)
+_CENTER_RANK = tuple(CENTER_ORDER.index(c) for c in range(COLS))
+
+# Priority bands; a higher band always sorts before a lower one
+_TT_MOVE = 1 << 40
+_WIN = 1 << 39
+_BLOCK = 1 << 38
+_KILLER_1 = 1 << 37
+_KILLER_2 = 1 << 36
+_HISTORY_CAP = (1 << 36) - 1
+
+
+class MoveOrderer:
+    """
+    Move ordering for alpha-beta search.
+
+    Moves are tried in this order, each heuristic can be switched off:
+      - tt_move: the transposition table's best move for the node
+      - tactical: moves that complete a 4-in-a-row, then moves that stop the
+        opponent from completing one
+      - killers: the two latest moves that caused a cutoff at the same ply
+      - history: moves that caused cutoffs, weighted by depth^2
+      - center: static center-out order (left to right otherwise)
+
+    Attributes:
+        killer_moves (List[List[Optional[int]]]): Two killer slots per ply.
+        history (Dict[bool, List[int]]): Cutoff score per player and column.
+    """
+
+    PRESETS: Dict[str, Dict[str, bool]] = {
+        "none": dict(center=False, tactical=False, killers=False, history=False, tt_move=False),
+        "center": dict(center=True, tactical=False, killers=False, history=False, tt_move=False),
+        "full": dict(center=True, tactical=True, killers=True, history=True, tt_move=True),
+    }
+
+    MAX_PLY = 64
+
+    def __init__(self, center: bool = True, tactical: bool = True, killers: bool = True,
+                 history: bool = True, tt_move: bool = True):
+        self.center = center
+        self.tactical = tactical
+        self.killers = killers
+        self.use_history = history
+        self.tt_move = tt_move
+        self.killer_moves: List[List[Optional[int]]] = [[None, None] for _ in range(self.MAX_PLY)]
+        self.history: Dict[bool, List[int]] = {True: [0] * COLS, False: [0] * COLS}
+
+    @classmethod
+    def create(cls, name: str) -> "MoveOrderer":
+        """Create an orderer from a preset name ("none", "center" or "full")."""
+        if name not in cls.PRESETS:
+            raise ValueError(f"Unknown move ordering: {name}")
+        return cls(**cls.PRESETS[name])
+
+    def new_search(self, plies_played: int = 0) -> None:
+        """
+        Age the history table and forget killers, which are tied to the old root.
+
+        Args:
+            plies_played (int): When the new root is this many moves further
+                down the same game, killers are moved up to the plies they now
+                stand at instead of being forgotten.
+        """
+        killers = self.killer_moves
+        if plies_played > 0:
+            killers[:] = killers[plies_played:] + [[None, None] for _ in range(min(plies_played, self.MAX_PLY))]
+        else:
+            for slots in killers:
+                slots[0] = slots[1] = None
+        for scores in self.history.values():
+            for c in range(COLS):
+                scores[c] >>= 1
+
+    def order(self, board: Board, player: bool, ply: int, tt_move: Optional[int] = None) -> List[int]:
+        """
+        Return the legal moves of `player` in the order they should be searched.
+
+        Args:
+            board (Board): Position to move in.
+            player (bool): Player to move.
+            ply (int): Distance from the search root.
+            tt_move (Optional[int]): Best move stored in the transposition table.
+        """
+        moves = board.legal_moves()
+        if len(moves) < 2:
+            return moves
+
+        scores = [0] * COLS
+        if self.tactical:
+            mask = board.mask
+            playable = playable_cells(mask)
+            wins = winning_cells(board.bits(player), mask) & playable
+            blocks = winning_cells(board.bits(not player), mask) & playable
+            if wins or blocks:
+                for c in moves:
+                    if wins & COLUMN_MASKS[c]:
+                        scores[c] += _WIN
+                    if blocks & COLUMN_MASKS[c]:
+                        scores[c] += _BLOCK
+        if self.killers and ply < self.MAX_PLY:
+            k1, k2 = self.killer_moves[ply]
+            if k1 is not None:
+                scores[k1] += _KILLER_1
+            if k2 is not None:
+                scores[k2] += _KILLER_2
+        if self.use_history:
+            history = self.history[player]
+            for c in moves:
+                scores[c] += history[c]
+        if self.tt_move and tt_move is not None:
+            scores[tt_move] += _TT_MOVE
+
+        if self.center:
+            return sorted(moves, key=lambda c: (-scores[c], _CENTER_RANK[c]))
+        return sorted(moves, key=lambda c: -scores[c])
+
+    def record_cutoff(self, col: int, player: bool, ply: int, depth: int) -> None:
+        """Reward a move that caused a beta (or alpha) cutoff."""
+        if self.killers and ply < self.MAX_PLY:
+            slots = self.killer_moves[ply]
+            if slots[0] != col:
+                slots[1] = slots[0]
+                slots[0] = col
+        if self.use_history:
+            history = self.history[player]
+            history[col] = min(_HISTORY_CAP, history[col] + depth * depth)
@@ -0,0 +1,138 @@
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Optional, Tuple
+
+from app.Board import Board, mirror_col
+
+# Algorithms in key order (bit 1 of the entry key)
+ALGORITHMS = ("minimax", "expectiminimax")
+MAX_DEPTH = 63
+
+
+def entry_key(position_key: int, algorithm: str, ai_player: bool, depth: int) -> int:
+    """
+    Key of a book entry.
+
+    The 49-bit canonical position key (see Board.canonical_key) is followed
+    by 6 bits of search depth, the algorithm and the AI player, so one book
+    can hold several settings.
+    """
+    if not 0 < depth <= MAX_DEPTH:
+        raise ValueError(f"Depth out of range for the opening book: {depth}")
+    return (position_key << 8) | (depth << 2) | (ALGORITHMS.index(algorithm) << 1) | int(ai_player)
+
+
+class OpeningBook:
+    """
+    Read-only opening book backed by a memory-mapped file.
+
+    The file is a small header followed by fixed-size records sorted by key,
+    so lookups are a binary search straight over the mapping. The pages live
+    in the OS page cache and are shared by every process that opens the book.
+
+    File layout (little endian):
+        header: magic b"C4BK", version (u16), reserved (u16), record count (u32)
+        record: entry key (u64), value (f64), best column (u8)
+    """
+
+    MAGIC = b"C4BK"
+    VERSION = 3     # bump whenever search results change: stored values go stale
+    HEADER = struct.Struct("<4sHHI")
+    RECORD = struct.Struct("<QdB")
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): Book file written by OpeningBook.write.
+
+        Raises:
+            ValueError: if the file is not an opening book of this version.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < OpeningBook.HEADER.size:
+            self._map.close()
+            raise ValueError(f"Invalid opening book: {path}")
+        magic, version, _, count = OpeningBook.HEADER.unpack_from(self._map, 0)
+        if magic != OpeningBook.MAGIC or version != OpeningBook.VERSION \
+                or len(self._map) != OpeningBook.HEADER.size + count * OpeningBook.RECORD.size:
+            self._map.close()
+            raise ValueError(f"Invalid opening book: {path}")
+        self._count = count
+
+    @staticmethod
+    def load(path: str) -> Optional["OpeningBook"]:
+        """Open the book at `path`, or return None if there is no such file."""
+        if not os.path.isfile(path):
+            return None
+        return OpeningBook(path)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def close(self) -> None:
+        self._map.close()
+
+    def lookup(self, board: Board, algorithm: str, ai_player: bool, depth: int) -> Optional[Tuple[int, float]]:
+        """
+        Look up the stored search result for a position.
+
+        Args:
+            board (Board): Position to look up.
+            algorithm (str): "minimax" or "expectiminimax".
+            ai_player (bool): Player the search was run for.
+            depth (int): Search depth.
+
+        Returns:
+            Tuple of (best_col, value), or None if the book has no entry.
+        """
+        if algorithm not in ALGORITHMS or not 0 < depth <= MAX_DEPTH:
+            return None
+        key, mirrored = board.canonical_key()
+        hit = self._find(entry_key(key, algorithm, ai_player, depth))
+        if hit is not None and mirrored:
+            return mirror_col(hit[0]), hit[1]
+        return hit
+
+    def _find(self, key: int) -> Optional[Tuple[int, float]]:
+        record = OpeningBook.RECORD
+        base = OpeningBook.HEADER.size
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            mid_key, value, col = record.unpack_from(self._map, base + mid * record.size)
+            if mid_key == key:
+                return col, value
+            if mid_key < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return None
+
+    @staticmethod
+    def write(path: str, entries: Dict[int, Tuple[int, float]]) -> None:
+        """
+        Write a book file.
+
+        Args:
+            path (str): Destination file (replaced atomically).
+            entries (Dict[int, Tuple[int, float]]): (best_col, value) by entry_key,
+                with best_col in the canonical orientation.
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(OpeningBook.HEADER.pack(OpeningBook.MAGIC, OpeningBook.VERSION, 0, len(entries)))
+            for key in sorted(entries):
+                col, value = entries[key]
+                f.write(OpeningBook.RECORD.pack(key, value, col))
+        os.replace(tmp_path, path)
+
+    def items(self) -> Iterable[Tuple[int, int, float]]:
+        """Yield (entry key, best_col, value) for every record in key order."""
+        record = OpeningBook.RECORD
+        for i in range(self._count):
+            key, value, col = record.unpack_from(self._map, OpeningBook.HEADER.size + i * record.size)
+            yield key, col, value
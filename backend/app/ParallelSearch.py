@@ -0,0 +1,120 @@
+import atexit
+import math
+import multiprocessing
+import os
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.Board import Board
+from app.SearchStats import SearchStats
+
+# One pool, created on first use and shared by every parallel search, of
+# _max_workers processes (see set_max_workers)
+_max_workers = os.cpu_count() or 1
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+# Per-process solver reused by consecutive root moves of the same search so
+# that sibling subtrees share one transposition table.
+_worker_solver: Optional[Tuple[str, Any]] = None
+
+
+def set_max_workers(workers: int) -> None:
+    """
+    Set the size of the shared pool (the number of CPU cores by default).
+
+    Raises:
+        ValueError: if workers is not positive or the pool already started.
+    """
+    global _max_workers
+    if workers < 1:
+        raise ValueError(f"workers must be positive: {workers}")
+    with _executor_lock:
+        if _executor is not None:
+            raise ValueError("The process pool has already started")
+        _max_workers = workers
+
+
+def max_workers() -> int:
+    """Size of the shared pool; more workers than this can't run at once."""
+    return _max_workers
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """Return the shared process pool."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: forking a threaded Flask server is not safe
+            _executor = ProcessPoolExecutor(max_workers=_max_workers, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def shutdown() -> None:
+    """Stop the pool (registered to run at interpreter exit)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+atexit.register(shutdown)
+
+
+def search_root_moves(config: Dict[str, Any], board: Board, moves: List[int], depth: int, prune: bool,
+                      algorithm: str, workers: int, alpha: float = -math.inf) -> List[Tuple[float, int, Any, int, Any]]:
+    """
+    Search each root move in a worker process with the window (alpha, inf).
+
+    At most `workers` moves (and never more than the pool's size) are in the
+    shared pool at once, so one search gets that many processes however many
+    the pool has. Boards cross the process boundary as their two bitboard
+    integers.
+
+    Args:
+        config (Dict[str, Any]): Solver constructor arguments for the workers.
+        board (Board): Root position.
+        moves (List[int]): Root moves, in the order results are returned.
+        depth (int): Search depth of the root.
+        prune (bool): Whether to use alpha-beta pruning.
+        algorithm (str): "minimax" or "expectiminimax".
+        workers (int): Moves searched at the same time.
+        alpha (float): Value the moves have to beat (from the first root move).
+
+    Returns:
+        List of (value, nodes_expanded, subtree, worker_pid, SearchStats), one per move.
+    """
+    executor = get_executor()
+    search_id = uuid.uuid4().hex
+    results: List[Any] = [None] * len(moves)
+    pending: Dict[Future, int] = {}
+    in_flight = max(1, min(workers, _max_workers))
+    for i, col in enumerate(moves):
+        if len(pending) == in_flight:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                results[pending.pop(future)] = future.result()
+        future = executor.submit(_search_move, search_id, config, board.p1_bits, board.p2_bits, col, depth, prune,
+                                 algorithm, alpha)
+        pending[future] = i
+    for future, i in pending.items():
+        results[i] = future.result()
+    return results
+
+
+def _search_move(search_id: str, config: Dict[str, Any], p1: int, p2: int, col: int, depth: int,
+                 prune: bool, algorithm: str, alpha: float) -> Tuple[float, int, Any, int, Any]:
+    """Worker entry point: search one root move."""
+    global _worker_solver
+    from app.Solver import Solver
+
+    if _worker_solver is None or _worker_solver[0] != search_id:
+        _worker_solver = (search_id, Solver(**config))
+    solver = _worker_solver[1]
+
+    solver.stats = SearchStats()
+    val, nodes, tree = solver.search_root_move(Board(p1=p1, p2=p2), col, depth, prune, algorithm, alpha)
+    return val, nodes, tree, os.getpid(), solver.stats
@@ -0,0 +1,205 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from app.Board import Board, BOARD_MASK, COLS, COLUMN_MASKS, TOP_BITS, count_fours, mirror_col, playable_cells, \
+    winning_cells
+from app.MoveOrdering import CENTER_ORDER
+from app.Solver import SearchAborted
+from app.TranspositionTable import TranspositionTable, EXACT, LOWER, UPPER
+
+
+class PerfectSolver:
+    """
+    Exact solver: searches to the end of the game instead of a depth limit.
+
+    The game ends when the board is full, and the score is the final number of
+    4-in-a-rows of the player to move minus the opponent's. Negamax with
+    alpha-beta finds the exact score by bisecting the score range with
+    null-window searches (as in Pons' Connect Four solver). It prunes nodes with
+    bounds taken from the lines each player can still complete, and reuses a
+    transposition table shared by mirror images.
+
+    Attributes:
+        tt (TranspositionTable): Bounds of searched positions (depth is unused).
+        nodes (int): Nodes expanded by the last solve.
+        DEFAULT_MAX_NODES (int): Node budget when none is given.
+    """
+
+    DEFAULT_MAX_NODES = 100_000
+    CHECK_INTERVAL = 256
+
+    def __init__(self, tt_size: int = TranspositionTable.DEFAULT_ENTRIES):
+        self.tt = TranspositionTable(tt_size) if tt_size > 0 else None
+        self.nodes = 0
+        self._deadline: Optional[float] = None
+        self._cancel: Optional[threading.Event] = None
+        self._node_limit = PerfectSolver.DEFAULT_MAX_NODES
+        self._next_check = 0
+
+    # -----------------------
+    # Public Methods
+    # -----------------------
+    def solve(self, board: Board, player: bool, time_ms: Optional[int] = None,
+              max_nodes: Optional[int] = None, cancel: Optional[threading.Event] = None) -> Tuple[Optional[int], int]:
+        """
+        Solve a position exactly.
+
+        Args:
+            board (Board): Position to solve (left unchanged).
+            player (bool): Player to move.
+            time_ms (Optional[int]): Wall-clock budget in milliseconds.
+            max_nodes (Optional[int]): Node budget (DEFAULT_MAX_NODES if neither budget is given).
+            cancel (Optional[threading.Event]): Stops the search once set.
+
+        Returns:
+            Tuple of (best_col, score) where score is the final fours difference
+            for `player` under perfect play, and best_col is None on a full board.
+
+        Raises:
+            SearchAborted: if the budget runs out (or the search is cancelled)
+                before the position is solved.
+        """
+        if time_ms is None and max_nodes is None:
+            max_nodes = PerfectSolver.DEFAULT_MAX_NODES
+        self._deadline = time.perf_counter() + time_ms / 1000 if time_ms is not None else None
+        self._node_limit = max_nodes if max_nodes is not None else float("inf")
+        self._next_check = min(self._node_limit, PerfectSolver.CHECK_INTERVAL)
+        self._cancel = cancel
+        self.nodes = 0
+
+        board = Board(p1=board.p1_bits, p2=board.p2_bits)
+        if board.is_terminal():
+            return None, PerfectSolver.score(board, player)
+
+        # Bisect the score range with null-window searches
+        low, high = self._bounds(board, player)
+        while low < high:
+            med = low + (high - low) // 2
+            if med <= 0 and low // 2 < med:
+                med = low // 2
+            elif med >= 0 and high // 2 > med:
+                med = high // 2
+            r = self._negamax(board, player, med, med + 1)
+            if r <= med:
+                high = r
+            else:
+                low = r
+        score = low
+
+        # A move that keeps the score: its child is worth at most -score to the opponent
+        for col in self._ordered_moves(board, player, None):
+            board.play(col, player)
+            r = self._negamax(board, not player, -score, -score + 1)
+            board.undo()
+            if r <= -score:
+                return col, score
+        raise AssertionError("No move reaches the solved score")
+
+    @staticmethod
+    def score(board: Board, player: bool) -> int:
+        """Current fours difference for `player` (the final score on a full board)."""
+        return count_fours(board.bits(player)) - count_fours(board.bits(not player))
+
+    # -----------------------
+    # Internal Methods
+    # -----------------------
+    @staticmethod
+    def _bounds(board: Board, player: bool) -> Tuple[int, int]:
+        """
+        Lowest and highest final score still possible for `player`.
+
+        A player can only finish windows that hold none of the opponent's
+        pieces, and keeps every four already made.
+        """
+        me, opp = board.bits(player), board.bits(not player)
+        return count_fours(me) - count_fours(BOARD_MASK ^ me), count_fours(BOARD_MASK ^ opp) - count_fours(opp)
+
+    def _ordered_moves(self, board: Board, player: bool, tt_move: Optional[int]) -> list:
+        """Stored best move, then moves completing a four, then blocks, then the rest centre-first."""
+        mask = board.mask
+        playable = playable_cells(mask)
+        wins = winning_cells(board.bits(player), mask) & playable
+        blocks = winning_cells(board.bits(not player), mask) & playable
+        first, second, rest = [], [], []
+        for col in CENTER_ORDER:
+            if mask & TOP_BITS[col] or col == tt_move:
+                continue
+            cell = playable & COLUMN_MASKS[col]
+            if wins & cell:
+                first.append(col)
+            elif blocks & cell:
+                second.append(col)
+            else:
+                rest.append(col)
+        moves = first + second + rest
+        if tt_move is not None:
+            moves.insert(0, tt_move)
+        return moves
+
+    def _negamax(self, board: Board, player: bool, alpha: int, beta: int) -> int:
+        """Fail-soft alpha-beta score of `board` for the player to move."""
+        self.nodes += 1
+        if self.nodes >= self._next_check:
+            self._check_budget()
+
+        if board.is_terminal():
+            return PerfectSolver.score(board, player)
+
+        low, high = self._bounds(board, player)
+        if high <= alpha or low == high:
+            return high
+        if low >= beta:
+            return low
+
+        tt_move = None
+        key = mirrored = None
+        if self.tt is not None:
+            key, mirrored = board.canonical_key()
+            key = (key << 1) | player
+            entry = self.tt.probe(key)
+            if entry is not None:
+                value, _, flag, tt_move = entry
+                if mirrored and tt_move is not None:
+                    tt_move = mirror_col(tt_move)
+                if flag == EXACT:
+                    return value
+                if flag == LOWER:
+                    low = max(low, value)
+                else:
+                    high = min(high, value)
+                if low >= beta or high <= alpha or low == high:
+                    return low if low >= beta else high
+        alpha_orig, beta_orig = alpha, beta
+        alpha, beta = max(alpha, low), min(beta, high)
+
+        best, best_col = -COLS * 100, None
+        for col in self._ordered_moves(board, player, tt_move):
+            board.play(col, player)
+            val = -self._negamax(board, not player, -beta, -alpha)
+            board.undo()
+            if val > best:
+                best, best_col = val, col
+                if val > alpha:
+                    alpha = val
+                    if alpha >= beta:
+                        break
+
+        if key is not None:
+            flag = UPPER if best <= alpha_orig else LOWER if best >= beta_orig else EXACT
+            if mirrored and best_col is not None:
+                best_col = mirror_col(best_col)
+            self.tt.store(key, best, 0, flag, best_col)
+        return best
+
+    def _check_budget(self) -> None:
+        if self.nodes >= self._node_limit:
+            raise SearchAborted(self.nodes)
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchAborted(self.nodes)
+        if self._cancel is not None and self._cancel.is_set():
+            raise SearchAborted(self.nodes)
+        self._next_check = min(self._node_limit, self.nodes + PerfectSolver.CHECK_INTERVAL)
+
+    def stats(self) -> Dict[str, int]:
+        return {"nodes": self.nodes, **(self.tt.stats() if self.tt is not None else {})}
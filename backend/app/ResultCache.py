@@ -0,0 +1,150 @@
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+
+class SQLiteCacheBackend:
+    """
+    Result store in a local SQLite file, shared by every process that opens it.
+
+    Values are pickled, so the file must only ever be written by this server.
+    Expired rows are skipped on read and deleted every CLEANUP_INTERVAL writes.
+    """
+
+    CLEANUP_INTERVAL = 256
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS results ("
+                           "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)")
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None or row[1] <= time.time():
+            return None
+        return pickle.loads(row[0])
+
+    def put(self, key: str, value: Any, ttl_seconds: float) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO results (key, value, expires_at) VALUES (?, ?, ?)",
+                               (key, blob, time.time() + ttl_seconds))
+            self._writes += 1
+            if self._writes % SQLiteCacheBackend.CLEANUP_INTERVAL == 0:
+                self._conn.execute("DELETE FROM results WHERE expires_at <= ?", (time.time(),))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache with a time-to-live, safe to share between threads.
+
+    Misses fall through to an optional shared backend (e.g. SQLiteCacheBackend)
+    so that several server processes can reuse each other's results; backend
+    hits are copied into the local LRU.
+
+    Attributes:
+        max_entries (int): Entries kept in process before the least recently used is evicted.
+        ttl_seconds (float): Lifetime of an entry.
+        hits, misses, evictions, expirations, backend_hits (int): Counters since creation or clear.
+    """
+
+    DEFAULT_ENTRIES = 1024
+    DEFAULT_TTL = 300.0
+
+    def __init__(self, max_entries: int = DEFAULT_ENTRIES, ttl_seconds: float = DEFAULT_TTL,
+                 backend: Optional[SQLiteCacheBackend] = None, clock: Callable[[], float] = time.monotonic):
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be positive: {max_entries}")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.backend = backend
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.backend_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for `key`, or None."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+                self.expirations += 1
+
+        value = self.backend.get(key) if self.backend is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.backend_hits += 1
+            self._insert(key, value, now)
+        return value
+
+    def put(self, key: str, value: Any) -> None:
+        """Cache `value` under `key` (and in the shared backend, if any)."""
+        with self._lock:
+            self._insert(key, value, self._clock())
+        if self.backend is not None:
+            self.backend.put(key, value, self.ttl_seconds)
+
+    def clear(self) -> None:
+        """Drop every entry (local and shared) and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.expirations = self.backend_hits = 0
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "backend": self.backend.path if self.backend is not None else None,
+                "backend_hits": self.backend_hits,
+            }
+
+    def _insert(self, key: str, value: Any, now: float) -> None:
+        # Caller holds the lock
+        self._entries[key] = (now + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
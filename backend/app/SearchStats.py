@@ -0,0 +1,169 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.Board import ROWS, COLS
+
+
+class SearchStats:
+    """
+    Counters a Solver fills in while it searches.
+
+    Attributes:
+        nodes_per_ply (List[int]): Positions visited at each distance from the
+            root (in stones played), the root itself at index 0. With
+            batch_leaves, every child scored in a batch counts.
+        leaf_evals (int): Positions scored by the evaluator.
+        cutoffs (int): Beta (or alpha) cutoffs at MIN/MAX nodes.
+        first_move_cutoffs (int): Cutoffs caused by the first move searched.
+        tt_probes, tt_hits (int): Transposition table lookups and how many found an entry.
+        researches (int): Moves searched again with the full window after
+            their null-window search failed high (principal variation search).
+        aspiration_researches (int): Root searches repeated because the value
+            fell outside the aspiration window.
+        probe_nodes (int): Positions visited by the Star2 probes of
+            expectiminimax chance nodes; not included in nodes_per_ply.
+        eval_time (float): Seconds spent scoring leaves.
+        movegen_time (float): Seconds spent generating and ordering moves.
+        wall_time (float): Seconds the whole search took.
+    """
+
+    __slots__ = ("nodes_per_ply", "leaf_evals", "cutoffs", "first_move_cutoffs", "tt_probes", "tt_hits",
+                 "researches", "aspiration_researches", "probe_nodes", "eval_time", "movegen_time", "wall_time")
+
+    def __init__(self):
+        self.nodes_per_ply: List[int] = [0] * (ROWS * COLS + 1)
+        self.leaf_evals = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.tt_probes = 0
+        self.tt_hits = 0
+        self.researches = 0
+        self.aspiration_researches = 0
+        self.probe_nodes = 0
+        self.eval_time = 0.0
+        self.movegen_time = 0.0
+        self.wall_time = 0.0
+
+    @property
+    def nodes(self) -> int:
+        return sum(self.nodes_per_ply)
+
+    @property
+    def max_ply(self) -> int:
+        """Deepest ply visited."""
+        return max((ply for ply, count in enumerate(self.nodes_per_ply) if count), default=0)
+
+    @property
+    def first_move_cutoff_rate(self) -> Optional[float]:
+        """Share of cutoffs found by the first move; near 1 means good move ordering."""
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else None
+
+    @property
+    def branching_factor(self) -> Optional[float]:
+        """
+        Effective branching factor: b such that b + b^2 + ... + b^d equals the
+        positions visited below the root, d being the deepest ply.
+        """
+        depth, total = self.max_ply, self.nodes - self.nodes_per_ply[0]
+        if depth == 0 or total == 0:
+            return None
+        low, high = 0.0, float(total)
+        for _ in range(60):
+            b = (low + high) / 2
+            if sum(b ** i for i in range(1, depth + 1)) < total:
+                low = b
+            else:
+                high = b
+        return round(low, 3)
+
+    def merge(self, other: "SearchStats") -> None:
+        """Add the counters of `other` (e.g. a worker's share of the search), except wall time."""
+        for ply, count in enumerate(other.nodes_per_ply):
+            self.nodes_per_ply[ply] += count
+        self.leaf_evals += other.leaf_evals
+        self.cutoffs += other.cutoffs
+        self.first_move_cutoffs += other.first_move_cutoffs
+        self.tt_probes += other.tt_probes
+        self.tt_hits += other.tt_hits
+        self.researches += other.researches
+        self.aspiration_researches += other.aspiration_researches
+        self.probe_nodes += other.probe_nodes
+        self.eval_time += other.eval_time
+        self.movegen_time += other.movegen_time
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "nodes_per_ply": self.nodes_per_ply[:self.max_ply + 1],
+            "leaf_evals": self.leaf_evals,
+            "cutoffs": self.cutoffs,
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoff_rate,
+            "tt_probes": self.tt_probes,
+            "tt_hits": self.tt_hits,
+            "researches": self.researches,
+            "aspiration_researches": self.aspiration_researches,
+            "probe_nodes": self.probe_nodes,
+            "branching_factor": self.branching_factor,
+            "eval_ms": self.eval_time * 1000,
+            "movegen_ms": self.movegen_time * 1000,
+            "wall_ms": self.wall_time * 1000,
+        }
+
+
+class SearchMetrics:
+    """
+    Totals of every search a server ran, exported in the Prometheus text format.
+
+    Safe to share between request threads.
+    """
+
+    PREFIX = "connect4_"
+
+    # name, help text, and how to read it from SearchStats
+    COUNTERS = (
+        ("nodes_total", "Positions visited by searches.", lambda s: s.nodes),
+        ("leaf_evaluations_total", "Positions scored by the evaluator.", lambda s: s.leaf_evals),
+        ("cutoffs_total", "Alpha-beta cutoffs.", lambda s: s.cutoffs),
+        ("first_move_cutoffs_total", "Cutoffs caused by the first move searched.", lambda s: s.first_move_cutoffs),
+        ("tt_probes_total", "Transposition table lookups.", lambda s: s.tt_probes),
+        ("tt_hits_total", "Transposition table lookups that found an entry.", lambda s: s.tt_hits),
+        ("researches_total", "Null-window searches that failed high and were searched again.",
+         lambda s: s.researches),
+        ("aspiration_researches_total", "Root searches repeated outside the aspiration window.",
+         lambda s: s.aspiration_researches),
+        ("probe_nodes_total", "Positions visited by Star2 probes at chance nodes.", lambda s: s.probe_nodes),
+        ("eval_seconds_total", "Time spent scoring leaves.", lambda s: s.eval_time),
+        ("movegen_seconds_total", "Time spent generating and ordering moves.", lambda s: s.movegen_time),
+        ("search_seconds_total", "Wall time of searches.", lambda s: s.wall_time),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._searches: Dict[str, int] = {}
+        self._totals = {name: 0 for name, _, _ in SearchMetrics.COUNTERS}
+
+    def record(self, algorithm: str, stats: SearchStats) -> None:
+        with self._lock:
+            self._searches[algorithm] = self._searches.get(algorithm, 0) + 1
+            for name, _, read in SearchMetrics.COUNTERS:
+                self._totals[name] += read(stats)
+
+    def render(self, extra: Optional[Dict[str, float]] = None) -> str:
+        """
+        Exposition text for a /metrics endpoint.
+
+        Args:
+            extra (Optional[Dict[str, float]]): More counters to export as
+                name -> value (named without the prefix, e.g. "cache_hits_total").
+        """
+        prefix = SearchMetrics.PREFIX
+        lines = [f"# HELP {prefix}searches_total Searches run.", f"# TYPE {prefix}searches_total counter"]
+        with self._lock:
+            for algorithm, count in sorted(self._searches.items()):
+                lines.append(f'{prefix}searches_total{{algorithm="{algorithm}"}} {count}')
+            for name, help_text, _ in SearchMetrics.COUNTERS:
+                lines += [f"# HELP {prefix}{name} {help_text}", f"# TYPE {prefix}{name} counter",
+                          f"{prefix}{name} {self._totals[name]}"]
+        for name, value in (extra or {}).items():
+            lines += [f"# TYPE {prefix}{name} counter", f"{prefix}{name} {value}"]
+        return "\n".join(lines) + "\n"
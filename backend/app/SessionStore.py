@@ -0,0 +1,207 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from app.Board import Board
+from app.MiniMaxTree import MiniMaxTree
+from app.PerfectSolver import PerfectSolver
+from app.Solver import Solver
+from app.TranspositionTable import TranspositionTable
+
+
+class Session:
+    """
+    A game against the AI that keeps its search state between turns.
+
+    The solver (with its transposition table and move ordering tables) stays
+    with the game, so each search starts with what the previous ones learned
+    about the positions ahead.
+
+    Attributes:
+        id (str): Identifier returned to the client.
+        params (Dict[str, Any]): Validated /solve parameters of every search.
+        board (Board): Current position.
+        moves (List[int]): Columns played since the session was created.
+        solver (Union[Solver, PerfectSolver]): Solver reused for every search.
+        tree (Optional[MiniMaxTree]): Part of the last search tree below the
+            current position (the previous search's view of it), if captured.
+        lock (threading.Lock): Held while a move is being made.
+    """
+
+    NODE_BYTES = 200             # approximate CPython footprint of one MiniMaxTree node
+
+    def __init__(self, params: Dict[str, Any], board: Board, solver: Union[Solver, PerfectSolver]):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.board = board
+        self.moves: List[int] = []
+        self.solver = solver
+        self.tree: Optional[MiniMaxTree] = None
+        self.lock = threading.Lock()
+        self.created_at = time.time()
+        self.nbytes = 0
+        self._plies_since_search: Optional[int] = None     # None until the first search
+
+    def play(self, col: int, player: bool) -> None:
+        """
+        Play a move and follow it down the kept tree.
+
+        Raises:
+            ValueError: if the column is invalid or full.
+        """
+        self.board.play(col, player)
+        self.moves.append(col)
+        if self._plies_since_search is not None:
+            self._plies_since_search += 1
+        node = self.tree
+        if node is not None:
+            node = next((child for child in node.children if child.move == col), None)
+            if node is not None and node.player is None:
+                # Chance node of the AI aiming at col: follow the outcome where it landed there
+                node = next((child for child in node.children if child.move == col), None)
+        self.tree = node
+
+    def ai_to_move(self) -> bool:
+        """Whether the AI plays next (player1 moves whenever the stone count is even)."""
+        return (self.board.mask.bit_count() % 2 == 0) == self.params["ai_player"]
+
+    def start_search(self) -> None:
+        """Call right before the session's solver searches the current position."""
+        if isinstance(self.solver, Solver) and self._plies_since_search:
+            self.solver.follow(self._plies_since_search)
+        self._plies_since_search = 0
+
+    def searched(self, root: MiniMaxTree) -> None:
+        """Keep the tree of a search (or stored result) for the current position."""
+        self.tree = root
+        self.nbytes = self.estimate_bytes()
+
+    @staticmethod
+    def table_bytes(entries: int) -> int:
+        """Approximate memory of a transposition table of `entries` entries once it fills up."""
+        return entries * TranspositionTable.ENTRY_BYTES
+
+    def estimate_bytes(self) -> int:
+        """Approximate memory held by the session: its transposition table and kept tree."""
+        tt = self.solver.tt
+        total = Session.table_bytes(tt.max_entries) if tt is not None else 0
+        if self.tree is not None:
+            total += sum(1 for _ in self.tree.iter_flat()) * Session.NODE_BYTES
+        return total
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "board": self.board.to_matrix(),
+            "moves": self.moves,
+            "ai_player": self.params["ai_player"],
+            "algorithm": self.params["algorithm"],
+            "created_at": self.created_at,
+        }
+
+
+class SessionStore:
+    """
+    Game sessions by id, evicted when idle for `ttl_seconds` or, least
+    recently used first, to stay within `max_sessions` and `max_bytes`.
+
+    Safe to share between request threads. Sizes are Session.nbytes, as of
+    the session's last search.
+
+    Attributes:
+        evictions, expirations (int): Sessions dropped to make room and for being idle.
+    """
+
+    DEFAULT_SESSIONS = 64
+    DEFAULT_TTL = 1800.0
+    DEFAULT_MEGABYTES = 512
+
+    def __init__(self, max_sessions: int = DEFAULT_SESSIONS, ttl_seconds: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MEGABYTES << 20, clock: Callable[[], float] = time.monotonic):
+        if max_sessions < 1:
+            raise ValueError(f"max_sessions must be positive: {max_sessions}")
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def add(self, session: Session) -> None:
+        """
+        Store a new session, evicting others to make room.
+
+        Raises:
+            ValueError: if the session alone is larger than max_bytes.
+        """
+        session.nbytes = session.estimate_bytes()
+        if session.nbytes > self.max_bytes:
+            raise ValueError(f"Session needs about {session.nbytes >> 20} MB, more than the "
+                             f"{self.max_bytes >> 20} MB allowed (lower tt_size)")
+        with self._lock:
+            self._sessions[session.id] = session
+            self._last_used[session.id] = self._clock()
+            self._evict(keep=session.id)
+
+    def get(self, session_id: str) -> Optional[Session]:
+        """Return the session and mark it as used, or None if it is unknown or expired."""
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                self._last_used[session_id] = now
+            return session
+
+    def resized(self, session: Session) -> None:
+        """Evict other sessions if `session` grew (call after its searches)."""
+        with self._lock:
+            if session.id in self._sessions:
+                self._evict(keep=session.id)
+
+    def remove(self, session_id: str) -> Optional[Session]:
+        with self._lock:
+            self._last_used.pop(session_id, None)
+            return self._sessions.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "bytes": sum(session.nbytes for session in self._sessions.values()),
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+    def _expire(self, now: float) -> None:
+        # Caller holds the lock. Least recently used first, so stop at the first live one
+        for session_id in list(self._sessions):
+            if now - self._last_used[session_id] < self.ttl_seconds:
+                break
+            del self._sessions[session_id], self._last_used[session_id]
+            self.expirations += 1
+
+    def _evict(self, keep: str) -> None:
+        # Caller holds the lock
+        self._expire(self._clock())
+        total = sum(session.nbytes for session in self._sessions.values())
+        for session_id in list(self._sessions):
+            if len(self._sessions) <= self.max_sessions and total <= self.max_bytes:
+                break
+            if session_id == keep:
+                continue
+            total -= self._sessions[session_id].nbytes
+            del self._sessions[session_id], self._last_used[session_id]
+            self.evictions += 1
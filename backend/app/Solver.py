@@ -1,10 +1,40 @@
 from __future__ import annotations  # MUST be first line
 
-from typing import List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
 import math
-from app.Board import Board, ROWS, COLS
+import threading
+import time
+from app.Board import Board, ROWS, COLS, mirror_col
 from app.BoardEvaluator import BoardEvaluator
+from app.ChanceModel import ChanceModel
+from app.IncrementalEvaluator import IncrementalEvaluator
 from app.MiniMaxTree import MiniMaxTree
+from app.SearchStats import SearchStats
+from app import ParallelSearch, Threats
+from app.MoveOrdering import MoveOrderer
+from app.TranspositionTable import TranspositionTable, EXACT, LOWER, UPPER
+
+logger = logging.getLogger(__name__)
+
+# Stand-in for tree nodes past the captured plies: the search writes its
+# values here instead of allocating nodes nobody will read.
+_DISCARDED = MiniMaxTree(depth=-1)
+
+# Node kinds mixed into transposition keys so that values from different
+# layers (and different algorithms) never collide.
+MINIMAX_MAX = 0
+MINIMAX_MIN = 1
+EXPECTI_MAX = 2
+EXPECTI_MIN = 3
+
+
+class SearchAborted(Exception):
+    """Raised inside a search when its time or node budget runs out."""
+
+    def __init__(self, nodes: int):
+        super().__init__(f"Search budget exhausted after {nodes} nodes")
+        self.nodes = nodes
 
 class Solver:
     """
@@ -14,12 +44,78 @@ class Solver:
         depth (int): Max search depth.
         prune (bool): Whether to use alpha-beta pruning.
         ai_player (bool): True if AI is maximizing player.
+        in_place (bool): Walk one mutable board with play/undo instead of
+            allocating a new Board for every expanded node, and score leaves
+            with an IncrementalEvaluator that follows the same moves.
+        tt (Optional[TranspositionTable]): Table shared by every search this
+            solver runs; None when tt_size is 0 or without pruning.
+            Unpruned searches (also with use_prune=False) never use it, so
+            they expand, and return, the whole tree.
+        orderer (MoveOrderer): Move ordering used at every node ("none",
+            "center" or "full" preset).
+        batch_leaves (bool): Score all children of a node just above the
+            leaves with one BoardEvaluator.evaluate_many call. Pays off when
+            not searching in place; node counts and results are unchanged.
+        workers (int): Worker processes that split the root moves of
+            run_minimax/run_expectiminimax, taken from the shared pool (see
+            ParallelSearch.set_max_workers) and capped at its size; 1 = serial
+            search. run_iterative always searches serially.
+        worker_nodes (Dict[str, int]): Nodes expanded per worker process
+            (by pid) in the last parallel search.
+        tree_plies (Optional[int]): Plies of the search tree to capture in the
+            returned MiniMaxTree (None = full tree, 0 = root only).
+        forced_moves (bool): Only search the forced moves when a side can
+            complete a four or must block one (see Threats.forced_moves).
+            A four doesn't end this game, so this is a heuristic shortcut.
+        chance (ChanceModel): Where the AI's pieces land in expectiminimax
+            (see chance_chosen).
+        stats (SearchStats): Counters of the last run_* call (nodes per ply,
+            cutoffs, evaluation and move generation time, ...).
+        pvs (bool): Principal variation search in minimax: with pruning, only
+            the first move of a node gets the full window; the others are
+            searched with a null window that just tests whether they beat the
+            best move so far, and re-searched when they do.
+        aspiration (Optional[float]): Half-width of the window run_iterative
+            opens around the previous iteration's minimax value (None = full
+            window). The root is searched again with a wider window when the
+            value falls outside.
     """
 
-    def __init__(self, depth: int = 4, prune: bool = True, ai_player: bool = True):
+    CHECK_INTERVAL = 256         # nodes between two clock reads under a time budget
+
+    def __init__(self, depth: int = 4, prune: bool = True, ai_player: bool = True, in_place: bool = True,
+                 tt_size: int = TranspositionTable.DEFAULT_ENTRIES, ordering: str = "full",
+                 batch_leaves: bool = False, workers: int = 1, tree_plies: Optional[int] = None,
+                 forced_moves: bool = False, chance_chosen: float = ChanceModel.DEFAULT_CHOSEN,
+                 pvs: bool = False, aspiration: Optional[float] = None):
+        if aspiration is not None and aspiration <= 0:
+            raise ValueError(f"aspiration must be positive: {aspiration}")
         self.depth = int(depth)
         self.prune = bool(prune)
         self.ai_player = bool(ai_player)
+        self.in_place = bool(in_place)
+        self.tt_size = int(tt_size)
+        self.tt = TranspositionTable(tt_size) if tt_size > 0 and self.prune else None
+        self.ordering = ordering
+        self.orderer = MoveOrderer.create(ordering)
+        self.batch_leaves = bool(batch_leaves)
+        self.workers = max(1, int(workers))
+        self.worker_nodes: Dict[str, int] = {}
+        self.tree_plies = tree_plies
+        self._tree_limit = math.inf if tree_plies is None else tree_plies
+        self.forced_moves = bool(forced_moves)
+        self.chance_chosen = float(chance_chosen)
+        self.chance = ChanceModel.create(self.chance_chosen)
+        self.pvs = bool(pvs)
+        self.aspiration = aspiration
+        self.stats = SearchStats()
+        self._root_stones = 0
+        self._incremental: Optional[IncrementalEvaluator] = None
+        self._deadline: Optional[float] = None
+        self._cancel: Optional[threading.Event] = None
+        self._node_limit: float = math.inf
+        self._next_check: float = math.inf
+        self._plies_played = 0
 
     # -----------------------
     # Public Methods
@@ -40,7 +136,15 @@ class Solver:
             - root: Root MiniMaxTree of the search tree
         """
         prune = self.prune if use_prune is None else bool(use_prune)
-        return self._choose_minimax(board, self.depth, prune, self.ai_player)
+        self._new_search()
+        self.stats = SearchStats()
+        start = time.perf_counter()
+        if self.workers > 1:
+            result = self._choose_parallel(board, self.depth, prune, self.ai_player, "minimax")
+        else:
+            result = self._choose_minimax(self._search_board(board), self.depth, prune, self.ai_player)
+        self.stats.wall_time = time.perf_counter() - start
+        return result
 
     def run_expectiminimax(self, board: Board, use_prune: Optional[bool] = None) -> Tuple[Optional[int], float, int, MiniMaxTree]:
         """
@@ -54,51 +158,393 @@ class Solver:
             Same tuple as run_minimax.
         """
         prune = self.prune if use_prune is None else bool(use_prune)
-        return self._choose_expectiminimax(board, self.depth, prune, self.ai_player)
+        self._new_search()
+        self.stats = SearchStats()
+        start = time.perf_counter()
+        if self.workers > 1:
+            result = self._choose_parallel(board, self.depth, prune, self.ai_player, "expectiminimax")
+        else:
+            result = self._choose_expectiminimax(self._search_board(board), self.depth, prune, self.ai_player)
+        self.stats.wall_time = time.perf_counter() - start
+        return result
+
+    def run_iterative(self, board: Board, algorithm: str = "minimax", time_ms: Optional[int] = None,
+                      max_nodes: Optional[int] = None, use_prune: Optional[bool] = None,
+                      cancel: Optional[threading.Event] = None,
+                      on_iteration: Optional[Callable[[int, Optional[int], float, int], None]] = None
+                      ) -> Tuple[Optional[int], float, int, MiniMaxTree, int]:
+        """
+        Iterative deepening up to self.depth within a wall-clock and/or node budget.
 
-    def chance_outcomes_for(column: int, board: Board):
-        """Return [(column, probability)] for possible physics outcomes."""
-        outcomes = []
+        Searches depth 1, 2, ... sharing the transposition table, so every
+        iteration tries the previous iteration's best moves first. The first
+        iteration always completes; a later one that runs out of budget (or is
+        cancelled) is discarded. With `aspiration` set, minimax iterations
+        from the third on search a window around the value of the iteration
+        two plies shallower.
 
-        # Chosen column
-        chosen_valid = 0 <= column < COLS and board.free_positions[column] < ROWS
-        if chosen_valid:
-            outcomes.append((column, 0.6))
+        Args:
+            board (Board): Current game board.
+            algorithm (str): "minimax" or "expectiminimax".
+            time_ms (Optional[int]): Wall-clock budget in milliseconds.
+            max_nodes (Optional[int]): Budget of expanded nodes over all iterations.
+            use_prune (Optional[bool]): If specified, overrides self.prune.
+            cancel (Optional[threading.Event]): Stops the search once set (checked
+                every CHECK_INTERVAL nodes), e.g. from another thread.
+            on_iteration (Optional[Callable]): Called after every completed
+                iteration with (depth, best_col, best_val, nodes so far).
 
-        # Neighbors
-        left_valid = 0 <= column - 1 < COLS and board.free_positions[column - 1] < ROWS
-        right_valid = 0 <= column + 1 < COLS and board.free_positions[column + 1] < ROWS
+        Returns:
+            Tuple containing:
+            - best_col, best_val, root: Result of the deepest completed iteration
+            - nodes_expanded: Nodes expanded over all iterations
+            - depth_reached: Depth of the deepest completed iteration
+        """
+        if algorithm == "minimax":
+            choose = self._choose_minimax
+        elif algorithm == "expectiminimax":
+            choose = self._choose_expectiminimax
+        else:
+            raise ValueError(f"Unknown algorithm: {algorithm}")
 
-        if left_valid and right_valid:
-            outcomes.append((column - 1, 0.2))
-            outcomes.append((column + 1, 0.2))
-        elif left_valid:
-            outcomes.append((column - 1, 0.4))
-        elif right_valid:
-            outcomes.append((column + 1, 0.4))
-        elif chosen_valid:
-            outcomes = [(column, 1.0)]
+        prune = self.prune if use_prune is None else bool(use_prune)
+        self._new_search()
+        self.stats = SearchStats()
+        start = time.perf_counter()
+        deadline = start + time_ms / 1000.0 if time_ms is not None else None
+
+        # Depth at which the whole rest of the game is searched; going deeper changes nothing
+        empty_cells = ROWS * COLS - board.mask.bit_count()
+        horizon = empty_cells if algorithm == "minimax" else 2 * empty_cells
+
+        total_nodes = 0
+        best_col, best_val, root, depth_reached = None, -math.inf, MiniMaxTree(depth=0), 0
+        aspire = algorithm == "minimax" and prune and self.aspiration is not None
+        values: List[float] = []     # value of each completed iteration
+        self._cancel = cancel
+        try:
+            for depth in range(1, self.depth + 1):
+                if depth_reached:
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        break
+                    if max_nodes is not None and total_nodes >= max_nodes:
+                        break
+                    if cancel is not None and cancel.is_set():
+                        break
+                    self._set_budget(deadline, max_nodes - total_nodes if max_nodes is not None else math.inf)
+
+                try:
+                    if aspire and depth_reached >= 2 and math.isfinite(values[-2]):
+                        # Values swing between odd and even depths (the side that moves
+                        # last gains), so the guess comes from two iterations back
+                        col, val, nodes, tree = self._aspiration_search(board, depth, values[-2])
+                    else:
+                        col, val, nodes, tree = choose(self._search_board(board), depth, prune, self.ai_player)
+                except SearchAborted as e:
+                    total_nodes += e.nodes
+                    break
+
+                total_nodes += nodes
+                best_col, best_val, root, depth_reached = col, val, tree, depth
+                values.append(val)
+                if on_iteration is not None:
+                    on_iteration(depth, col, val, total_nodes)
+                if depth >= horizon:
+                    break
+        finally:
+            self._cancel = None
+            self._set_budget(None, math.inf)
+            self.stats.wall_time = time.perf_counter() - start
+
+        return best_col, best_val, total_nodes, root, depth_reached
+
+    def follow(self, plies: int) -> None:
+        """
+        Tell the solver that its next search starts `plies` moves further down
+        the game than the last one (e.g. in a game session), so that killer
+        moves carry over to the plies they now stand at.
+        """
+        self._plies_played = plies
+
+    def _aspiration_search(self, board: Board, depth: int, guess: float) -> Tuple[Optional[int], float, int, MiniMaxTree]:
+        """
+        Minimax root search in the window guess +- aspiration.
+
+        When the value falls outside, the failing side of the window is opened
+        to infinity and the root searched again (at most twice), within what
+        is left of the node budget.
+
+        Returns:
+            Same tuple as _choose_minimax, with the nodes of every attempt.
+        """
+        alpha, beta = guess - self.aspiration, guess + self.aspiration
+        used = 0
+        while True:
+            try:
+                col, val, nodes, tree = self._choose_minimax(self._search_board(board), depth, True, self.ai_player,
+                                                             alpha, beta)
+            except SearchAborted as e:
+                raise SearchAborted(used + e.nodes) from None
+            used += nodes
+            if alpha < val < beta:
+                return col, val, used, tree
+            self.stats.aspiration_researches += 1
+            if val <= alpha:
+                alpha = -math.inf
+            else:
+                beta = math.inf
+            self._set_budget(self._deadline, self._node_limit - nodes)
+
+    @staticmethod
+    def chance_outcomes_for(column: int, board: Board) -> List[Tuple[int, float]]:
+        """Return [(column, probability)] for possible physics outcomes (default ChanceModel)."""
+        return list(ChanceModel.create().outcomes(column, board.mask))
+
+    def config(self) -> Dict[str, Any]:
+        """Constructor arguments of a serial solver with the same settings."""
+        return dict(depth=self.depth, prune=self.prune, ai_player=self.ai_player, in_place=self.in_place,
+                    tt_size=self.tt_size, ordering=self.ordering, batch_leaves=self.batch_leaves,
+                    tree_plies=self.tree_plies, forced_moves=self.forced_moves, chance_chosen=self.chance_chosen,
+                    pvs=self.pvs, aspiration=self.aspiration)
+
+    def search_root_move(self, board: Board, col: int, depth: int, prune: bool, algorithm: str,
+                         alpha: float = -math.inf) -> Tuple[float, int, MiniMaxTree]:
+        """
+        Search a single root move with the window (alpha, inf).
 
-        return outcomes
+        Used by the parallel root split: the value is exact when it beats
+        alpha and an upper bound (<= alpha) otherwise, just like the value the
+        serial search compares for that move.
+
+        Returns:
+            Tuple of (value, nodes_expanded, subtree rooted at the move or
+            None when no plies are captured).
+        """
+        board = self._search_board(board)
+        self._start_search(board, self.ai_player)
+        nodes = [1]
+        root = MiniMaxTree(depth=0)
+        if algorithm == "minimax":
+            node = self._tree_child(root, col, self.ai_player)
+            child_board = self._child(board, col, self.ai_player)
+            val = self._minimax_ab(child_board, depth - 1, alpha, math.inf, False, prune, self.ai_player, nodes, node)
+            self._restore(board)
+        else:
+            node = self._tree_child(root, col, None)
+            val = self._chance_value(board, col, depth, alpha, math.inf, prune, self.ai_player, nodes, node)
+        return val, nodes[0], node if node is not _DISCARDED else None
+
+    # -----------------------
+    # Move application
+    # -----------------------
+    def _search_board(self, board: Board) -> Board:
+        """Board the search walks; a private copy so the caller's board is never mutated."""
+        return board.copy() if self.in_place else board
+
+    def _child(self, board: Board, col: int, player: bool) -> Board:
+        """Apply a move in place (undone by _restore) or on a fresh copy."""
+        if self.in_place:
+            board.play(col, player)
+            self._incremental.play(col, player)
+            return board
+        return board.apply_action(col, player)
+
+    def _restore(self, board: Board) -> None:
+        """Take back the move applied by _child when searching in place."""
+        if self.in_place:
+            board.undo()
+            self._incremental.undo()
+
+    def _tree_child(self, parent: MiniMaxTree, move: int, player: Optional[bool], prob: float = 1.0) -> MiniMaxTree:
+        """New child of `parent` in the captured tree, or _DISCARDED past tree_plies."""
+        if parent is _DISCARDED or parent.depth >= self._tree_limit:
+            return _DISCARDED
+        child = MiniMaxTree(move=move, player=player, prob=prob, depth=parent.depth + 1)
+        parent.children.append(child)
+        return child
+
+    def _new_search(self) -> None:
+        self.orderer.new_search(self._plies_played)
+        self._plies_played = 0
+
+    def _start_search(self, board: Board, ai_player: bool) -> None:
+        """Reset per-search state for a new root position."""
+        self._root_stones = board.mask.bit_count()
+        if self.in_place:
+            self._incremental = IncrementalEvaluator(board, ai_player)
+
+    def _frontier_values(self, board: Board, moves: List[int], player: bool, ai_player: bool) -> Optional[List[float]]:
+        """Leaf values of every child of `board` in one batch, or None when batching is off."""
+        if not self.batch_leaves:
+            return None
+        stats = self.stats
+        start = time.perf_counter()
+        values = BoardEvaluator.evaluate_many([board.apply_action(c, player) for c in moves], ai_player)
+        stats.eval_time += time.perf_counter() - start
+        stats.leaf_evals += len(moves)
+        stats.nodes_per_ply[board.mask.bit_count() - self._root_stones + 1] += len(moves)
+        return values
+
+    def _evaluate(self, board: Board, ai_player: bool) -> float:
+        """Heuristic value of a leaf."""
+        stats = self.stats
+        start = time.perf_counter()
+        if self.in_place:
+            val = self._incremental.evaluate()
+        else:
+            val = BoardEvaluator.evaluate(board, ai_player)
+        stats.eval_time += time.perf_counter() - start
+        stats.leaf_evals += 1
+        return val
+
+    def _visit(self, board: Board) -> None:
+        """Count a position in the per-ply statistics."""
+        self.stats.nodes_per_ply[board.mask.bit_count() - self._root_stones] += 1
+
+    # -----------------------
+    # Search budget
+    # -----------------------
+    def _set_budget(self, deadline: Optional[float], node_limit: float) -> None:
+        self._deadline = deadline
+        self._node_limit = node_limit
+        self._next_check = min(node_limit, self.CHECK_INTERVAL) if self._periodic() else node_limit
+
+    def _periodic(self) -> bool:
+        """Whether the budget has to be checked every CHECK_INTERVAL nodes (not just at the node limit)."""
+        return self._deadline is not None or self._cancel is not None
+
+    def _check_budget(self, nodes: int) -> None:
+        """Abort the running search once it has used up its budget or was cancelled."""
+        if nodes >= self._node_limit:
+            raise SearchAborted(nodes)
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchAborted(nodes)
+        if self._cancel is not None and self._cancel.is_set():
+            raise SearchAborted(nodes)
+        self._next_check = min(self._node_limit, nodes + self.CHECK_INTERVAL) if self._periodic() else self._node_limit
+
+    # -----------------------
+    # Move ordering
+    # -----------------------
+    def _ordered_moves(self, board: Board, player: bool, tt_move: Optional[int]) -> List[int]:
+        start = time.perf_counter()
+        moves = self.orderer.order(board, player, board.mask.bit_count() - self._root_stones, tt_move)
+        if self.forced_moves:
+            forced = Threats.forced_moves(board, player)
+            if forced is not None:
+                moves = [c for c in moves if c in forced]
+        self.stats.movegen_time += time.perf_counter() - start
+        return moves
+
+    def _record_cutoff(self, board: Board, col: int, player: bool, depth: int, first: bool) -> None:
+        """Remember a cutoff move for ordering; `first` if it was the first move searched."""
+        self.stats.cutoffs += 1
+        self.stats.first_move_cutoffs += first
+        self.orderer.record_cutoff(col, player, board.mask.bit_count() - self._root_stones, depth)
+
+    # -----------------------
+    # Transposition table
+    # -----------------------
+    @staticmethod
+    def _tt_key(board: Board, kind: int, ai_player: bool) -> Tuple[int, bool]:
+        """
+        Table key of a node and whether it is the mirrored position's key.
+
+        A position and its mirror image share one entry; the stored move is
+        kept in the canonical orientation (see Board.canonical_key).
+        """
+        key, mirrored = board.canonical_key()
+        return (key << 3) | (ai_player << 2) | kind, mirrored
+
+    def _tt_move(self, board: Board, kind: int, ai_player: bool, prune: bool) -> Optional[int]:
+        """Best move stored for a node (e.g. by a shallower iteration), if any."""
+        if not prune or self.tt is None:
+            return None
+        key, mirrored = self._tt_key(board, kind, ai_player)
+        entry = self.tt.probe(key)
+        if entry is None or entry[3] is None:
+            return None
+        return mirror_col(entry[3]) if mirrored else entry[3]
+
+    def _tt_probe(self, key: Tuple[int, bool], depth: int, alpha: float, beta: float,
+                  prune: bool) -> Tuple[Optional[float], float, float, Optional[int]]:
+        """
+        Look up a node in the transposition table.
+
+        Returns:
+            (value, alpha, beta, best_move) where value is not None when the
+            stored entry settles the node, and alpha/beta are narrowed by any
+            stored bound.
+        """
+        key, mirrored = key
+        entry = self.tt.probe(key)
+        self.stats.tt_probes += 1
+        if entry is None:
+            return None, alpha, beta, None
+        self.stats.tt_hits += 1
+
+        value, entry_depth, flag, move = entry
+        if mirrored and move is not None:
+            move = mirror_col(move)
+        if entry_depth >= depth:
+            if flag == EXACT:
+                return value, alpha, beta, move
+            if prune:
+                if flag == LOWER:
+                    alpha = max(alpha, value)
+                else:
+                    beta = min(beta, value)
+                if alpha >= beta:
+                    return value, alpha, beta, move
+        return None, alpha, beta, move
+
+    def _tt_store(self, key: Tuple[int, bool], value: float, depth: int, alpha: float, beta: float,
+                  prune: bool, move: Optional[int]) -> None:
+        """Store a node's value with its bound type relative to the window it was searched with."""
+        if not prune or alpha < value < beta:
+            flag = EXACT
+        elif value <= alpha:
+            flag = UPPER
+        else:
+            flag = LOWER
+        key, mirrored = key
+        if mirrored and move is not None:
+            move = mirror_col(move)
+        self.tt.store(key, value, depth, flag, move)
 
     # -----------------------
     # Internal Minimax Methods
     # -----------------------
-    def _choose_minimax(self, board: Board, depth: int, prune: bool, ai_player: bool) -> Tuple[Optional[int], float, int, MiniMaxTree]:
-        """Evaluate all moves at root and pick the best one for Minimax."""
+    def _choose_minimax(self, board: Board, depth: int, prune: bool, ai_player: bool,
+                        alpha: float = -math.inf, beta: float = math.inf) -> Tuple[Optional[int], float, int, MiniMaxTree]:
+        """
+        Evaluate all moves at root and pick the best one for Minimax.
+
+        With a window narrower than (-inf, inf) (aspiration), a value outside
+        it is only a bound and the move is not reliable.
+        """
         root = MiniMaxTree(move=None, player=None, depth=0)
         nodes = [0]  # Count of nodes expanded
         best_val = -math.inf
         best_col = None
-        alpha, beta = -math.inf, math.inf
+        alpha_orig = alpha
+        pvs = prune and self.pvs
 
-        for col in board.legal_moves():
+        self._start_search(board, ai_player)
+        self._visit(board)
+        tt_move = self._tt_move(board, MINIMAX_MAX, ai_player, prune)
+        for i, col in enumerate(self._ordered_moves(board, ai_player, tt_move)):
             nodes[0] += 1
-            child_board = board.apply_action(col, ai_player)
-            child_node = MiniMaxTree(move=col, player=ai_player, depth=1)
-            root.add_child(child_node)
-
-            val = self._minimax_ab(child_board, depth - 1, alpha, beta, False, prune, ai_player, nodes, child_node)
+            if nodes[0] >= self._next_check:
+                self._check_budget(nodes[0])
+            child_board = self._child(board, col, ai_player)
+            child_node = self._tree_child(root, col, ai_player)
+
+            if pvs and i > 0:
+                val = self._minimax_pvs(child_board, depth - 1, alpha, beta, False, ai_player, nodes, child_node)
+            else:
+                val = self._minimax_ab(child_board, depth - 1, alpha, beta, False, prune, ai_player, nodes, child_node)
+            self._restore(board)
 
             if val > best_val:
                 best_val = val
@@ -110,8 +556,33 @@ class Solver:
             alpha = max(alpha, best_val)
             root.value = best_val
 
+        # A value outside an aspiration window comes with an unreliable move; the re-search stores the root
+        if prune and self.tt is not None and best_col is not None and alpha_orig < best_val < beta:
+            self._tt_store(self._tt_key(board, MINIMAX_MAX, ai_player), best_val, depth, alpha_orig, beta, True, best_col)
+
         return best_col, best_val, nodes[0], root
 
+    def _minimax_pvs(self, board: Board, depth: int, alpha: float, beta: float, maximizing: bool,
+                     ai_player: bool, nodes: List[int], node: MiniMaxTree) -> float:
+        """
+        Search a move after the first one of a node (the parent being the
+        other side): a null window first, the full window only if the move
+        turns out to improve on the parent's best.
+        """
+        if maximizing:
+            # Parent minimizes: test whether the move stays at or above beta
+            val = self._minimax_ab(board, depth, math.nextafter(beta, -math.inf), beta, True, True, ai_player,
+                                   nodes, node)
+        else:
+            # Parent maximizes: test whether the move stays at or below alpha
+            val = self._minimax_ab(board, depth, alpha, math.nextafter(alpha, math.inf), False, True, ai_player,
+                                   nodes, node)
+        if alpha < val < beta:
+            self.stats.researches += 1
+            node.children.clear()
+            val = self._minimax_ab(board, depth, alpha, beta, maximizing, True, ai_player, nodes, node)
+        return val
+
     def _minimax_ab(
         self,
         board: Board,
@@ -125,47 +596,139 @@ class Solver:
         node: MiniMaxTree
     ) -> float:
         """Recursive Minimax with alpha-beta pruning and tree building."""
+        self._visit(board)
         # Terminal node or depth limit
         if depth == 0 or board.is_terminal():
-            val = BoardEvaluator.evaluate(board, ai_player)
+            val = self._evaluate(board, ai_player)
             node.value = val
             return val
 
+        alpha_orig, beta_orig = alpha, beta
+        key = None
+        tt_move = None
+        if prune and self.tt is not None:
+            key = self._tt_key(board, MINIMAX_MAX if maximizing else MINIMAX_MIN, ai_player)
+            val, alpha, beta, tt_move = self._tt_probe(key, depth, alpha, beta, prune)
+            if val is not None:
+                node.value = val
+                return val
+
+        best_col = None
+        pvs = prune and self.pvs
         if maximizing:
             best = -math.inf
             node.player = ai_player
-            for col in board.legal_moves():
+            moves = self._ordered_moves(board, ai_player, tt_move)
+            leaf_values = self._frontier_values(board, moves, ai_player, ai_player) if depth == 1 else None
+            for i, col in enumerate(moves):
                 nodes[0] += 1
-                child_board = board.apply_action(col, ai_player)
-                child_node = MiniMaxTree(move=col, player=ai_player, depth=node.depth + 1)
-                node.add_child(child_node)
-
-                val = self._minimax_ab(child_board, depth - 1, alpha, beta, False, prune, ai_player, nodes, child_node)
-                best = max(best, val)
+                if nodes[0] >= self._next_check:
+                    self._check_budget(nodes[0])
+                child_node = self._tree_child(node, col, ai_player)
+
+                if leaf_values is not None:
+                    val = child_node.value = leaf_values[i]
+                else:
+                    child_board = self._child(board, col, ai_player)
+                    if pvs and i > 0:
+                        val = self._minimax_pvs(child_board, depth - 1, alpha, beta, False, ai_player, nodes, child_node)
+                    else:
+                        val = self._minimax_ab(child_board, depth - 1, alpha, beta, False, prune, ai_player, nodes,
+                                               child_node)
+                    self._restore(board)
+                if val > best:
+                    best = val
+                    best_col = col
                 node.value = best
 
                 if prune and best >= beta:
-                    return best
+                    self._record_cutoff(board, col, ai_player, depth, i == 0)
+                    break
                 alpha = max(alpha, best)
-            return best
 
         else:  # Minimizing player
             best = math.inf
             node.player = not ai_player
-            for col in board.legal_moves():
+            moves = self._ordered_moves(board, not ai_player, tt_move)
+            leaf_values = self._frontier_values(board, moves, not ai_player, ai_player) if depth == 1 else None
+            for i, col in enumerate(moves):
                 nodes[0] += 1
-                child_board = board.apply_action(col, not ai_player)
-                child_node = MiniMaxTree(move=col, player=not ai_player, depth=node.depth + 1)
-                node.add_child(child_node)
-
-                val = self._minimax_ab(child_board, depth - 1, alpha, beta, True, prune, ai_player, nodes, child_node)
-                best = min(best, val)
+                if nodes[0] >= self._next_check:
+                    self._check_budget(nodes[0])
+                child_node = self._tree_child(node, col, not ai_player)
+
+                if leaf_values is not None:
+                    val = child_node.value = leaf_values[i]
+                else:
+                    child_board = self._child(board, col, not ai_player)
+                    if pvs and i > 0:
+                        val = self._minimax_pvs(child_board, depth - 1, alpha, beta, True, ai_player, nodes, child_node)
+                    else:
+                        val = self._minimax_ab(child_board, depth - 1, alpha, beta, True, prune, ai_player, nodes,
+                                               child_node)
+                    self._restore(board)
+                if val < best:
+                    best = val
+                    best_col = col
                 node.value = best
 
                 if prune and best <= alpha:
-                    return best
+                    self._record_cutoff(board, col, not ai_player, depth, i == 0)
+                    break
                 beta = min(beta, best)
-            return best
+
+        if key is not None:
+            self._tt_store(key, best, depth, alpha_orig, beta_orig, prune, best_col)
+        return best
+
+    # -----------------------
+    # Parallel root search
+    # -----------------------
+    def _choose_parallel(self, board: Board, depth: int, prune: bool, ai_player: bool,
+                         algorithm: str) -> Tuple[Optional[int], float, int, MiniMaxTree]:
+        """
+        Split the root moves across worker processes and pick the best one.
+
+        The first (best-ordered) move is searched here to get an alpha bound;
+        the others are then searched in parallel against that bound. Moves are
+        combined in the same order as the serial search, so ties resolve to
+        the same column.
+        """
+        kind = MINIMAX_MAX if algorithm == "minimax" else EXPECTI_MAX
+        self._start_search(board, ai_player)
+        self._visit(board)
+        moves = self._ordered_moves(board, ai_player, self._tt_move(board, kind, ai_player, prune))
+        if not moves:
+            return None, -math.inf, 0, MiniMaxTree(move=None, player=None, depth=0)
+
+        first_val, first_nodes, first_tree = self.search_root_move(board, moves[0], depth, prune, algorithm)
+        results = [(first_val, first_nodes, first_tree, "main", None)]
+        alpha = first_val if prune else -math.inf
+        results += ParallelSearch.search_root_moves(self.config(), board, moves[1:], depth, prune, algorithm,
+                                                    self.workers, alpha)
+
+        root = MiniMaxTree(move=None, player=None, depth=0)
+        nodes = 0
+        best_val = -math.inf
+        best_col = None
+        self.worker_nodes = {}
+        for col, (val, move_nodes, subtree, pid, stats) in zip(moves, results):
+            if subtree is not None:
+                root.add_child(subtree)
+            if stats is not None:
+                self.stats.merge(stats)
+            nodes += move_nodes
+            worker = str(pid)
+            self.worker_nodes[worker] = self.worker_nodes.get(worker, 0) + move_nodes
+            if val > best_val:
+                best_val = val
+                best_col = col
+            root.value = best_val
+
+        if prune and self.tt is not None and best_col is not None:
+            self._tt_store(self._tt_key(board, kind, ai_player), best_val, depth, -math.inf, math.inf, True, best_col)
+
+        return best_col, best_val, nodes, root
 
     # -----------------------
     # Internal Expectiminimax Methods
@@ -178,28 +741,17 @@ class Solver:
         best_val = -math.inf
         best_col = None
         alpha, beta = -math.inf, math.inf
-        print(f"original depth: {depth}")
+        logger.debug("Expectiminimax search to depth %d", depth)
 
-        for col in board.legal_moves():
+        self._start_search(board, ai_player)
+        self._visit(board)
+        for col in self._ordered_moves(board, ai_player, self._tt_move(board, EXPECTI_MAX, ai_player, prune)):
             nodes[0] += 1
-            chance_node = MiniMaxTree(move=col, player=None, depth=1)
-            root.add_child(chance_node)
-
-            outcomes = Solver.chance_outcomes_for(col, board)
-            if not outcomes:
-                continue
-
-            exp_value = 0.0
-            for actual_col, prob in outcomes:
-                nodes[0] += 1
-                child_board = board.apply_action(actual_col, ai_player)
-                child_node = MiniMaxTree(move=actual_col, player=ai_player, prob=prob, depth=2)
-                chance_node.add_child(child_node)
+            if nodes[0] >= self._next_check:
+                self._check_budget(nodes[0])
+            chance_node = self._tree_child(root, col, None)
 
-                val = self._expectiminimax_min(child_board, depth - 2, alpha, beta, prune, ai_player, nodes, child_node)
-                exp_value += prob * val
-
-            chance_node.value = exp_value
+            exp_value = self._chance_value(board, col, depth, alpha, beta, prune, ai_player, nodes, chance_node)
 
             if exp_value > best_val:
                 best_val = exp_value
@@ -211,70 +763,242 @@ class Solver:
             alpha = max(alpha, best_val)
             root.value = best_val
 
+        if prune and self.tt is not None and best_col is not None:
+            self._tt_store(self._tt_key(board, EXPECTI_MAX, ai_player), best_val, depth, -math.inf, math.inf, True, best_col)
+
         return best_col, best_val, nodes[0], root
 
     def _expectiminimax_min(self, board: Board, depth: int, alpha: float, beta: float,
                             prune: bool, ai_player: bool, nodes: List[int], node: MiniMaxTree) -> float:
         """Opponent (min) layer for expectiminimax with pruning."""
-        print(depth)
+        self._visit(board)
         if depth <= 0 or board.is_terminal():
-            val = BoardEvaluator.evaluate(board, ai_player)
+            val = self._evaluate(board, ai_player)
             node.value = val
             return val
 
+        alpha_orig, beta_orig = alpha, beta
+        key = None
+        tt_move = None
+        if prune and self.tt is not None:
+            key = self._tt_key(board, EXPECTI_MIN, ai_player)
+            val, alpha, beta, tt_move = self._tt_probe(key, depth, alpha, beta, prune)
+            if val is not None:
+                node.value = val
+                return val
+
         best = math.inf
+        best_col = None
         node.player = not ai_player
-        for col in board.legal_moves():
+        moves = self._ordered_moves(board, not ai_player, tt_move)
+        leaf_values = self._frontier_values(board, moves, not ai_player, ai_player) if depth <= 1 else None
+        for i, col in enumerate(moves):
             nodes[0] += 1
-            child_board = board.apply_action(col, not ai_player)
-            child_node = MiniMaxTree(move=col, player=not ai_player, depth=node.depth + 1)
-            node.add_child(child_node)
-
-            val = self._expectiminimax_max(child_board, depth - 1, alpha, beta, prune, ai_player, nodes, child_node)
-            best = min(best, val)
+            if nodes[0] >= self._next_check:
+                self._check_budget(nodes[0])
+            child_node = self._tree_child(node, col, not ai_player)
+
+            if leaf_values is not None:
+                val = child_node.value = leaf_values[i]
+            else:
+                child_board = self._child(board, col, not ai_player)
+                val = self._expectiminimax_max(child_board, depth - 1, alpha, beta, prune, ai_player, nodes, child_node)
+                self._restore(board)
+            if val < best:
+                best = val
+                best_col = col
             node.value = best
 
             if prune and best <= alpha:
-                return best
+                self._record_cutoff(board, col, not ai_player, depth, i == 0)
+                break
             beta = min(beta, best)
 
+        if key is not None:
+            self._tt_store(key, best, depth, alpha_orig, beta_orig, prune, best_col)
         return best
 
     def _expectiminimax_max(self, board: Board, depth: int, alpha: float, beta: float,
                             prune: bool, ai_player: bool, nodes: List[int], node: MiniMaxTree) -> float:
         """AI (max) layer for expectiminimax with pruning; contains chance nodes."""
+        self._visit(board)
         if depth <= 0 or board.is_terminal():
-            val = BoardEvaluator.evaluate(board, ai_player)
+            val = self._evaluate(board, ai_player)
             node.value = val
             return val
 
+        alpha_orig, beta_orig = alpha, beta
+        key = None
+        tt_move = None
+        if prune and self.tt is not None:
+            key = self._tt_key(board, EXPECTI_MAX, ai_player)
+            val, alpha, beta, tt_move = self._tt_probe(key, depth, alpha, beta, prune)
+            if val is not None:
+                node.value = val
+                return val
+
         best = -math.inf
+        best_col = None
         node.player = ai_player
 
-        for col in board.legal_moves():
+        for i, col in enumerate(self._ordered_moves(board, ai_player, tt_move)):
             nodes[0] += 1
-            chance_node = MiniMaxTree(move=col, player=None, depth=node.depth + 1)
-            node.add_child(chance_node)
-
-            outcomes = Solver.chance_outcomes_for(col, board)
-
-            exp_val = 0.0
-            for actual_col, prob in outcomes:
-                nodes[0] += 1
-                child_board = board.apply_action(actual_col, ai_player)
-                child_node = MiniMaxTree(move=actual_col, player=ai_player, prob=prob, depth=node.depth + 2)
-                chance_node.add_child(child_node)
-
-                val = self._expectiminimax_min(child_board, depth - 2, alpha, beta, prune, ai_player, nodes, child_node)
-                exp_val += prob * val
+            if nodes[0] >= self._next_check:
+                self._check_budget(nodes[0])
+            chance_node = self._tree_child(node, col, None)
 
-            chance_node.value = exp_val
+            exp_val = self._chance_value(board, col, depth, alpha, beta, prune, ai_player, nodes, chance_node)
 
-            best = max(best, exp_val)
+            if exp_val > best:
+                best = exp_val
+                best_col = col
             node.value = best
 
             if prune and best >= beta:
-                return best
+                self._record_cutoff(board, col, ai_player, depth, i == 0)
+                break
             alpha = max(alpha, best)
 
+        if key is not None:
+            self._tt_store(key, best, depth, alpha_orig, beta_orig, prune, best_col)
         return best
+
+    def _chance_value(self, board: Board, col: int, depth: int, alpha: float, beta: float,
+                      prune: bool, ai_player: bool, nodes: List[int], chance_node: MiniMaxTree) -> float:
+        """
+        Chance node: expected value of the AI aiming at `col` over the physics outcomes.
+
+        Outcomes are searched in order of probability. With pruning, each one
+        gets the window that keeps the expectation inside (alpha, beta) given
+        bounds on the other outcomes (Ballard's Star1). The bounds start from
+        BoardEvaluator.SCORE_BOUND and, when the transposition table is on, are
+        first tightened by a null-window probe of one reply in every outcome
+        (Star2), which cuts the node when every probe stays at or below alpha. As at
+        MIN/MAX nodes, the result is exact inside the window and a bound
+        outside it.
+        """
+        outcomes = self.chance.outcomes(col, board.mask)
+        values = [0.0] * len(outcomes)
+
+        if not prune:
+            for i, (actual_col, prob) in enumerate(outcomes):
+                values[i] = self._outcome_value(board, actual_col, prob, depth, -math.inf, math.inf, False,
+                                                ai_player, nodes, chance_node)
+            exp_val = Solver._expectation(outcomes, values)
+            chance_node.value = exp_val
+            return exp_val
+
+        lower = [-BoardEvaluator.SCORE_BOUND] * len(outcomes)
+        upper = [BoardEvaluator.SCORE_BOUND] * len(outcomes)
+
+        # Star2: the first reply in each outcome caps what the opponent can get there.
+        # Each probe tests the value that would still let the node fail low if
+        # the outcomes not yet probed came in at alpha.
+        if self.tt is not None and depth > 2 and alpha > -math.inf:
+            slack = 0.0
+            for i, (actual_col, prob) in enumerate(outcomes):
+                target = alpha + slack / prob
+                val = self._probe_outcome(board, actual_col, depth, target, ai_player, nodes)
+                if val > target:
+                    break
+                upper[i] = val
+                slack += prob * (alpha - val)
+            else:
+                bound = Solver._expectation(outcomes, upper)
+                if bound <= alpha:
+                    chance_node.value = bound
+                    return bound
+
+        # Star1
+        for i, (actual_col, prob) in enumerate(outcomes):
+            rest_low = sum(p * lower[j] for j, (_, p) in enumerate(outcomes) if j != i)
+            rest_high = sum(p * upper[j] for j, (_, p) in enumerate(outcomes) if j != i)
+            child_alpha = (alpha - rest_high) / prob
+            child_beta = (beta - rest_low) / prob
+
+            val = self._outcome_value(board, actual_col, prob, depth, child_alpha, child_beta, True,
+                                      ai_player, nodes, chance_node)
+            if val <= child_alpha:
+                bound = min(rest_high + prob * val, alpha)
+                chance_node.value = bound
+                return bound
+            if val >= child_beta:
+                bound = max(rest_low + prob * val, beta)
+                chance_node.value = bound
+                return bound
+            values[i] = lower[i] = upper[i] = val
+
+        exp_val = Solver._expectation(outcomes, values)
+        chance_node.value = exp_val
+        return exp_val
+
+    def _outcome_value(self, board: Board, actual_col: int, prob: float, depth: int, alpha: float, beta: float,
+                       prune: bool, ai_player: bool, nodes: List[int], chance_node: MiniMaxTree) -> float:
+        """Search the position after the AI's piece lands in `actual_col`."""
+        nodes[0] += 1
+        if nodes[0] >= self._next_check:
+            self._check_budget(nodes[0])
+        child_board = self._child(board, actual_col, ai_player)
+        child_node = self._tree_child(chance_node, actual_col, ai_player, prob)
+
+        val = self._expectiminimax_min(child_board, depth - 2, alpha, beta, prune, ai_player, nodes, child_node)
+        self._restore(board)
+        return val
+
+    def _probe_outcome(self, board: Board, actual_col: int, depth: int, alpha: float, ai_player: bool,
+                       nodes: List[int]) -> float:
+        """
+        Upper bound on an outcome's value, if it is at most `alpha`: a bound
+        already in the table, or a null-window search at `alpha` of the
+        opponent's first ordered reply. A value above `alpha` only means the
+        probe failed.
+
+        Positions the probe visits are counted in SearchStats.probe_nodes,
+        not per ply.
+        """
+        nodes[0] += 1
+        if nodes[0] >= self._next_check:
+            self._check_budget(nodes[0])
+        child_board = self._child(board, actual_col, ai_player)
+
+        if child_board.is_terminal():
+            val = self._evaluate(child_board, ai_player)
+            self._restore(board)
+            return val
+
+        key = self._tt_key(child_board, EXPECTI_MIN, ai_player)
+        val, _, beta, tt_move = self._tt_probe(key, depth - 2, -math.inf, math.inf, True)
+        if val is not None or beta <= alpha:
+            self._restore(board)
+            return val if val is not None else beta
+
+        reply = self._ordered_moves(child_board, not ai_player, tt_move)[0]
+        nodes[0] += 1
+        grandchild = self._child(child_board, reply, not ai_player)
+        stats = self.stats
+        per_ply, stats.nodes_per_ply = stats.nodes_per_ply, [0] * len(stats.nodes_per_ply)
+        try:
+            val = self._expectiminimax_max(grandchild, depth - 3, alpha, math.nextafter(alpha, math.inf), True,
+                                           ai_player, nodes, _DISCARDED)
+        finally:
+            stats.probe_nodes += sum(stats.nodes_per_ply)
+            stats.nodes_per_ply = per_ply
+        self._restore(child_board)
+        self._restore(board)
+        return val
+
+    @staticmethod
+    def _expectation(outcomes: Tuple[Tuple[int, float], ...], values: List[float]) -> float:
+        """
+        Probability-weighted sum of outcome values.
+
+        The two neighbour outcomes (the equally likely pair, first or last
+        depending on the model) are added together first, so a position and
+        its mirror image (where they swap places) get bit-identical results.
+        """
+        if len(outcomes) == 3:
+            (_, p0), (_, p1), (_, p2) = outcomes
+            if p1 == p2:
+                return p0 * values[0] + (p1 * values[1] + p2 * values[2])
+            return (p0 * values[0] + p1 * values[1]) + p2 * values[2]
+        return sum(prob * val for (_, prob), val in zip(outcomes, values))
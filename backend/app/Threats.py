@@ -0,0 +1,88 @@
+from typing import Any, Dict, List, Optional
+
+from app.Board import Board, BOTTOM_MASK, COLS, COLUMN_MASKS, playable_cells, winning_cells
+
+# Rows counted from 1 at the bottom: odd rows are 0, 2, 4 in board coordinates
+ODD_ROWS = BOTTOM_MASK * 0b010101
+EVEN_ROWS = BOTTOM_MASK * 0b101010
+
+
+def split_threats(bits: int, mask: int) -> tuple:
+    """
+    Threat cells split by whether they can be played right now.
+
+    Returns:
+        Tuple of (playable, deferred) bitboards. Deferred threats sit above
+        an empty cell, so the opponent can't simply block them.
+    """
+    threats = winning_cells(bits, mask)
+    playable = threats & playable_cells(mask)
+    return playable, threats ^ playable
+
+
+def columns_of(cells: int) -> List[int]:
+    """Columns that hold at least one of `cells`, left to right."""
+    return [c for c in range(COLS) if cells & COLUMN_MASKS[c]]
+
+
+def forced_moves(board: Board, player: bool) -> Optional[List[int]]:
+    """
+    Moves `player` is forced into, if any.
+
+    Completing a four beats everything else; failing that, every playable
+    threat of the opponent must be blocked.
+
+    Returns:
+        Columns that complete a four, else columns that block one, else None.
+    """
+    mask = board.mask
+    playable = playable_cells(mask)
+    wins = winning_cells(board.bits(player), mask) & playable
+    if wins:
+        return columns_of(wins)
+    blocks = winning_cells(board.bits(not player), mask) & playable
+    if blocks:
+        return columns_of(blocks)
+    return None
+
+
+def first_player(board: Board, to_move: bool) -> bool:
+    """The player who made (or will make) the first move, given who is to move."""
+    return to_move if board.mask.bit_count() % 2 == 0 else not to_move
+
+
+def zugzwang_rows(board: Board, player: bool, to_move: bool) -> int:
+    """
+    Rows that follow-up play hands to `player` once the board fills up.
+
+    When every other column is full, the first player gets the odd rows
+    and the second player the even rows of the remaining columns.
+    """
+    return ODD_ROWS if player == first_player(board, to_move) else EVEN_ROWS
+
+
+def analyze(board: Board, to_move: bool) -> Dict[str, Any]:
+    """
+    Threat summary of a position for both players.
+
+    Args:
+        board (Board): Position to analyze.
+        to_move (bool): Player to move.
+
+    Returns:
+        Per player ("player1"/"player2"): number of playable and deferred
+        threats and of threats on the rows zugzwang favours them with
+        ("good_parity"); plus the forced moves of the player to move.
+    """
+    mask = board.mask
+    summary: Dict[str, Any] = {}
+    for player, name in ((True, "player1"), (False, "player2")):
+        playable, deferred = split_threats(board.bits(player), mask)
+        good = (playable | deferred) & zugzwang_rows(board, player, to_move)
+        summary[name] = {
+            "playable": playable.bit_count(),
+            "deferred": deferred.bit_count(),
+            "good_parity": good.bit_count(),
+        }
+    summary["forced_moves"] = forced_moves(board, to_move)
+    return summary
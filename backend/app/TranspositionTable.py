@@ -0,0 +1,126 @@
+from typing import Dict, Optional, Tuple
+
+# Bound type of a stored value
+EXACT = 0
+LOWER = 1   # value is a lower bound (search failed high)
+UPPER = 2   # value is an upper bound (search failed low)
+
+# Entry stored per position: (value, depth, flag, best_move)
+Entry = Tuple[float, int, int, Optional[int]]
+
+
+def _prime_at_most(n: int) -> int:
+    """Largest prime <= n (n >= 2), so keys spread over every bucket."""
+    def is_prime(k: int) -> bool:
+        if k < 4:
+            return k > 1
+        if k % 2 == 0:
+            return False
+        i = 3
+        while i * i <= k:
+            if k % i == 0:
+                return False
+            i += 2
+        return True
+
+    while not is_prime(n):
+        n -= 1
+    return n
+
+
+class TranspositionTable:
+    """
+    Fixed-size two-tier transposition table.
+
+    Positions are keyed by an integer (e.g. Board.key()) and hashed into
+    buckets of two slots:
+      - a depth-preferred slot, only replaced by an entry searched at least as deep
+      - an always-replace slot, which takes every entry the first slot rejects
+        and the entries it gives up
+
+    The table never grows past `max_entries` entries, so its memory stays
+    bounded (roughly ENTRY_BYTES per entry) however long the search runs.
+
+    Attributes:
+        max_entries (int): Capacity of the table.
+        hits (int): Probes that found the position.
+        misses (int): Probes that did not.
+        stores (int): Entries written.
+    """
+
+    DEFAULT_ENTRIES = 1 << 16
+    ENTRY_BYTES = 160            # approximate CPython footprint of one entry
+
+    __slots__ = ("max_entries", "_buckets", "_keys", "_entries", "hits", "misses", "stores")
+
+    def __init__(self, max_entries: int = DEFAULT_ENTRIES):
+        if max_entries < 2:
+            raise ValueError(f"Transposition table needs at least 2 entries, got {max_entries}")
+        self._buckets = _prime_at_most(max(2, max_entries // 2))
+        self.max_entries = self._buckets * 2
+        self._keys: list = [None] * self.max_entries
+        self._entries: list = [None] * self.max_entries
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    @classmethod
+    def from_megabytes(cls, megabytes: float) -> "TranspositionTable":
+        """Create a table whose entries fit in roughly `megabytes` of memory."""
+        return cls(max(2, int(megabytes * (1 << 20)) // cls.ENTRY_BYTES))
+
+    def probe(self, key: int) -> Optional[Entry]:
+        """
+        Look up a position.
+
+        Returns:
+            The stored (value, depth, flag, best_move) entry, or None.
+        """
+        i = (key % self._buckets) << 1
+        keys = self._keys
+        if keys[i] == key:
+            self.hits += 1
+            return self._entries[i]
+        if keys[i + 1] == key:
+            self.hits += 1
+            return self._entries[i + 1]
+        self.misses += 1
+        return None
+
+    def store(self, key: int, value: float, depth: int, flag: int, move: Optional[int]) -> None:
+        """
+        Store a search result.
+
+        Args:
+            key (int): Position key.
+            value (float): Searched value.
+            depth (int): Remaining depth the value was searched to.
+            flag (int): EXACT, LOWER or UPPER.
+            move (Optional[int]): Best move found, if any.
+        """
+        i = (key % self._buckets) << 1
+        keys, entries = self._keys, self._entries
+        entry = (value, depth, flag, move)
+        kept = entries[i]
+        if keys[i] == key:
+            entries[i] = entry
+        elif kept is None or depth >= kept[1]:
+            if kept is not None:
+                # The replaced entry moves down to the always-replace slot,
+                # over any older copy of this position there
+                keys[i + 1], entries[i + 1] = keys[i], kept
+            keys[i], entries[i] = key, entry
+        else:
+            # Deeper entry keeps the first slot
+            keys[i + 1], entries[i + 1] = key, entry
+        self.stores += 1
+
+    def clear(self) -> None:
+        """Drop every entry and reset the counters."""
+        self._keys = [None] * self.max_entries
+        self._entries = [None] * self.max_entries
+        self.hits = self.misses = self.stores = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss/store counters in a JSON-friendly dict."""
+        return {"hits": self.hits, "misses": self.misses, "stores": self.stores}
@@ -0,0 +1,262 @@
+import importlib.util
+import json
+import os
+import tempfile
+import time
+import unittest
+from app.Board import Board
+from app.OpeningBook import OpeningBook, entry_key
+
+
+def _load_server():
+    # app.py shares its name with the app package, so load it from its path
+    path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+    spec = importlib.util.spec_from_file_location("server", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+server = _load_server()
+
+
+class ServerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.client = server.app.test_client()
+        if server.RESULT_CACHE is not None:
+            server.RESULT_CACHE.clear()
+
+    def solve(self, **body):
+        return self.client.post("/solve", json={"algorithm": "minimax", "depth": 3, "tree": "none", **body})
+
+
+class ResultCacheApiTest(ServerTest):
+
+    def test_repeated_request_is_cached(self):
+        self.assertFalse(self.solve(moves="4").get_json()["cached"])
+        self.assertTrue(self.solve(moves="4").get_json()["cached"])
+
+    def test_ordering_is_part_of_the_key(self):
+        self.solve(moves="", depth=4, ordering="none")
+        response = self.solve(moves="", depth=4, ordering="full").get_json()
+        self.assertFalse(response["cached"])
+
+    def test_full_trees_are_not_cached(self):
+        self.solve(moves="4", tree="full")
+        self.assertFalse(self.solve(moves="4", tree="full").get_json()["cached"])
+
+
+class StreamingApiTest(ServerTest):
+
+    def stream(self, **body):
+        response = self.client.post("/solve/stream", json={"algorithm": "minimax", "depth": 2, **body})
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    def test_first_line_is_the_solve_response(self):
+        first = self.stream(moves="44", tree="none")
+        self.assertEqual(len(first), 1)
+        expected = self.solve(moves="44", depth=2, tree="none").get_json()
+        for key in ("best_col", "value", "depth_reached"):
+            self.assertEqual(first[0][key], expected[key])
+        self.assertNotIn("tree", first[0])
+
+    def test_one_line_per_tree_node(self):
+        header, *nodes = self.stream(moves="44")
+        self.assertEqual(len(nodes), header["nodes_expanded"] + 1)
+        self.assertEqual([node["id"] for node in nodes], list(range(len(nodes))))
+        self.assertIsNone(nodes[0]["parent_id"])
+        for node in nodes[1:]:
+            self.assertLess(node["parent_id"], node["id"])
+
+    def test_invalid_request(self):
+        response = self.client.post("/solve/stream", json={"moves": "4", "algorithm": "alphazero"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_tree_depth_is_capped(self):
+        deep = server.STREAM_TREE_PLIES + 1
+        response = self.client.post("/solve/stream", json={"moves": "44", "algorithm": "minimax", "depth": deep})
+        self.assertEqual(response.status_code, 400)
+        header, *nodes = self.stream(moves="44", depth=deep, tree="top-k", tree_plies=1)
+        self.assertEqual(header["depth_reached"], deep)
+        self.assertEqual({node["parent_id"] for node in nodes[1:]}, {0})
+
+
+class StatsApiTest(ServerTest):
+
+    def test_metrics(self):
+        self.solve(moves="4")
+        response = self.client.get("/metrics")
+        self.assertEqual(response.mimetype, "text/plain")
+        samples = {}
+        for line in response.get_data(as_text=True).splitlines():
+            if not line.startswith("#"):
+                name, value = line.rsplit(" ", 1)
+                samples[name] = float(value)
+        self.assertGreater(samples["connect4_nodes_total"], 0)
+        self.assertGreater(samples['connect4_searches_total{algorithm="minimax"}'], 0)
+        for name in ("connect4_cache_hits_total", "connect4_cache_misses_total", "connect4_session_evictions_total"):
+            self.assertIn(name, samples)
+
+    def test_cache_stats(self):
+        self.solve(moves="4")
+        self.solve(moves="4")
+        stats = self.client.get("/cache/stats").get_json()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["entries"], 1)
+        for key in ("misses", "evictions", "expirations", "hit_rate", "max_entries", "ttl_seconds"):
+            self.assertIn(key, stats)
+
+
+class BatchApiTest(ServerTest):
+
+    def batch(self, boards, **body):
+        return self.client.post("/solve/batch", json={"boards": boards, "algorithm": "minimax", "depth": 3,
+                                                      "tree": "none", **body})
+
+    def test_results_in_request_order(self):
+        empty = [[0] * 7 for _ in range(6)]
+        response = self.batch([empty, "44", {"position": 0, "mask": 0}])
+        self.assertEqual(response.status_code, 200)
+        results = response.get_json()["results"]
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[1]["best_col"], self.solve(moves="44").get_json()["best_col"])
+        for result in results:
+            self.assertIn(result["best_col"], range(7))
+
+    def test_stream(self):
+        response = self.batch(["4", "44"], stream=True)
+        self.assertEqual(response.mimetype, "application/x-ndjson")
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        self.assertEqual(sorted(line["index"] for line in lines), [0, 1])
+
+    def test_batch_results_are_not_cached(self):
+        self.batch(["44"])
+        self.assertFalse(self.solve(moves="44").get_json()["cached"])
+
+    def test_invalid_requests(self):
+        self.assertEqual(self.batch([]).status_code, 400)
+        self.assertEqual(self.batch(["44", [[0] * 7]]).status_code, 400)
+        floating = [[0] * 7 for _ in range(5)] + [[0, 0, 0, 1, 0, 0, 0]]
+        floating[0][0] = 1
+        response = self.batch(["44", floating])
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(response.get_json()["error"].startswith("boards[1]"))
+
+
+class SessionsApiTest(ServerTest):
+
+    def create(self, **body):
+        response = self.client.post("/sessions", json={"algorithm": "minimax", "depth": 2, "tree": "none", **body})
+        self.assertEqual(response.status_code, 201)
+        session = response.get_json()
+        self.assertEqual(response.headers["Location"], f"/sessions/{session['id']}")
+        return session["id"]
+
+    def move(self, session_id, **body):
+        return self.client.post(f"/sessions/{session_id}/move", json=body)
+
+    def test_game(self):
+        session_id = self.create(ai_player=False)
+        response = self.move(session_id, col=3)
+        self.assertEqual(response.status_code, 200)
+        moves = response.get_json()["session"]["moves"]
+        self.assertEqual(moves[0], 3)
+        self.assertEqual(len(moves), 2)
+        self.assertEqual(self.client.get(f"/sessions/{session_id}").get_json()["moves"], moves)
+
+    def test_ai_moves_first_only_when_it_is_its_turn(self):
+        session_id = self.create(ai_player=True)
+        self.assertEqual(self.move(session_id, col=3).status_code, 400)
+        self.assertEqual(self.move(session_id).status_code, 200)
+        self.assertEqual(self.move(session_id).status_code, 400)
+        self.assertEqual(self.move(session_id, col=3).status_code, 200)
+        self.assertEqual(len(self.client.get(f"/sessions/{session_id}").get_json()["moves"]), 3)
+
+    def test_opponent_moves_first(self):
+        session_id = self.create(ai_player=False)
+        self.assertEqual(self.move(session_id).status_code, 400)
+
+    def test_invalid_move(self):
+        session_id = self.create(moves="111111", ai_player=True)
+        self.assertEqual(self.move(session_id).status_code, 200)
+        self.assertEqual(self.move(session_id, col=0).status_code, 400)
+        self.assertEqual(self.move(session_id, col=7).status_code, 400)
+
+    def test_unknown_session(self):
+        self.assertEqual(self.client.get("/sessions/nope").status_code, 404)
+        self.assertEqual(self.move("nope", col=3).status_code, 404)
+        self.assertEqual(self.client.delete("/sessions/nope").status_code, 404)
+
+    def test_delete(self):
+        session_id = self.create()
+        self.assertEqual(self.client.delete(f"/sessions/{session_id}").status_code, 204)
+        self.assertEqual(self.client.get(f"/sessions/{session_id}").status_code, 404)
+
+
+class OpeningBookApiTest(ServerTest):
+
+    def setUp(self):
+        super().setUp()
+        fd, self.path = tempfile.mkstemp(suffix=".bin")
+        os.close(fd)
+        OpeningBook.write(self.path, {entry_key(Board().canonical_key()[0], "minimax", True, 3): (3, 1.5)})
+        self.book, server.BOOK = server.BOOK, OpeningBook(self.path)
+
+    def tearDown(self):
+        server.BOOK.close()
+        server.BOOK = self.book
+        os.remove(self.path)
+
+    def test_book_answers_without_tree(self):
+        response = self.solve(moves="").get_json()
+        self.assertTrue(response["book"])
+        self.assertEqual((response["best_col"], response["value"]), (3, 1.5))
+
+    def test_book_skipped_when_tree_is_wanted(self):
+        response = self.solve(moves="", tree="full").get_json()
+        self.assertFalse(response["book"])
+        self.assertTrue(response["tree"]["children"])
+
+
+class JobsApiTest(ServerTest):
+
+    def wait(self, job_id, timeout=10.0):
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.client.get(f"/jobs/{job_id}").get_json()
+            if job["status"] not in ("queued", "running") or time.monotonic() > deadline:
+                return job
+            time.sleep(0.01)
+
+    def test_job_runs_to_result(self):
+        response = self.client.post("/jobs", json={"moves": "44", "algorithm": "minimax", "depth": 3})
+        self.assertEqual(response.status_code, 202)
+        job = response.get_json()
+        self.assertEqual(response.headers["Location"], f"/jobs/{job['id']}")
+        job = self.wait(job["id"])
+        self.assertEqual(job["status"], "done")
+        self.assertIn(job["result"]["best_col"], range(7))
+        self.assertEqual(job["result"]["depth_reached"], 3)
+        self.assertEqual(job["progress"]["depth_reached"], 3)
+
+    def test_cancel(self):
+        job = self.client.post("/jobs", json={"moves": "", "algorithm": "minimax", "depth": 42,
+                                              "tree": "none"}).get_json()
+        response = self.client.delete(f"/jobs/{job['id']}")
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.wait(job["id"])["status"], "cancelled")
+
+    def test_invalid_request(self):
+        response = self.client.post("/jobs", json={"moves": "48", "algorithm": "minimax"})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.get_json())
+
+    def test_unknown_job(self):
+        self.assertEqual(self.client.get("/jobs/nope").status_code, 404)
+        self.assertEqual(self.client.delete("/jobs/nope").status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
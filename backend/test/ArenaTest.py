@@ -0,0 +1,86 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+from app.BoardEvaluator import BoardEvaluator
+from tools import arena
+
+
+def _task(index=0, a="depth=2", b="depth=1", opening=(3, 3), physics=None):
+    configs = {"a": arena.parse_config(a), "b": arena.parse_config(b)}
+    return arena.make_tasks(index + 1, [list(opening)], configs, physics, seed=7)[index]
+
+
+class ArenaTest(unittest.TestCase):
+
+    def test_parse_config(self):
+        config = arena.parse_config("algorithm=expectiminimax, depth=3,prune=false,pvs=true")
+        self.assertEqual(config["algorithm"], "expectiminimax")
+        self.assertEqual(config["solver"], {"depth": 3, "prune": False, "pvs": True})
+        self.assertEqual(config["weights"], BoardEvaluator.weights())
+        self.assertTrue(arena.parse_config("prune=yes")["solver"]["prune"])
+        for bad in ("depth", "colour=red", "algorithm=perfect", "prune=flase"):
+            with self.assertRaises(ValueError):
+                arena.parse_config(bad)
+
+    def test_parse_config_weights_file(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as f:
+            json.dump({"OPEN_3_WEIGHT": 80}, f)
+        try:
+            config = arena.parse_config(f"weights={f.name}")
+            self.assertEqual(config["weights"]["OPEN_3_WEIGHT"], 80)
+            self.assertEqual(config["weights"]["OPEN_2_WEIGHT"], BoardEvaluator.OPEN_2_WEIGHT)
+        finally:
+            os.remove(f.name)
+
+    def test_game_is_played_to_the_end(self):
+        record = arena.play_game(_task())
+        self.assertEqual(len(record["opening"]) + len(record["moves"]), 42)
+        self.assertEqual(record["a"]["moves"] + record["b"]["moves"], len(record["moves"]))
+        expected = "a" if record["score_a"] > record["score_b"] else "b" if record["score_b"] > record["score_a"] \
+            else "draw"
+        self.assertEqual(record["result"], expected)
+
+    def test_games_are_reproducible(self):
+        task = _task(a="algorithm=expectiminimax,depth=1", physics=0.6)
+        self.assertEqual(arena.play_game(task)["moves"], arena.play_game(task)["moves"])
+
+    def test_physics_uses_the_given_chance(self):
+        aimed = arena.play_game(_task())["moves"]
+        self.assertEqual(arena.play_game(_task(physics=1.0))["moves"], aimed)
+        self.assertNotEqual(arena.play_game(_task(physics=0.2))["moves"], aimed)
+
+    def test_colours_alternate_per_opening(self):
+        configs = {"a": arena.parse_config(""), "b": arena.parse_config("")}
+        tasks = arena.make_tasks(4, [[0], [1]], configs, None, seed=0)
+        self.assertEqual([t["a_first"] for t in tasks], [True, False, True, False])
+        self.assertEqual([t["opening"] for t in tasks], [[0], [0], [1], [1]])
+
+    def test_weights_are_restored_after_a_game(self):
+        defaults = BoardEvaluator.weights()
+        arena.play_game(_task(a="depth=1", opening=[3] * 6 + [2] * 6 + [4] * 6 + [1] * 6 + [5] * 6 + [0] * 5))
+        self.assertEqual(BoardEvaluator.weights(), defaults)
+
+    def test_openings(self):
+        openings = arena.random_openings(5, 4, random.Random(1))
+        self.assertEqual([len(o) for o in openings], [4] * 5)
+        # 7 first moves, 4 of them distinct up to mirroring
+        self.assertEqual(len(arena.book_openings(1)), 4)
+
+    def test_summary(self):
+        records = [{"result": r, "a": {"moves": 10, "nodes": 100, "seconds": 0.1},
+                    "b": {"moves": 10, "nodes": 50, "seconds": 0.1}} for r in ("a", "a", "draw", "b")]
+        summary = arena.summarize(records)
+        self.assertEqual((summary["wins"], summary["draws"], summary["losses"]), (2, 1, 1))
+        self.assertAlmostEqual(summary["score"], 0.625)
+        low, high = summary["score_ci95"]
+        self.assertLess(low, 0.625)
+        self.assertGreater(high, 0.625)
+        self.assertGreater(summary["elo"], 0)
+        self.assertEqual(summary["a"]["nodes_per_move"], 10)
+        self.assertIsNone(arena.elo(1.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
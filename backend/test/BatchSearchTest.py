@@ -0,0 +1,74 @@
+import unittest
+from app import BatchSearch, ParallelSearch
+from app.Board import Board
+from util.SchemaValidator import SchemaValidator
+
+
+def _params(**overrides):
+    ok, err, params = SchemaValidator.validate({"board": [[0] * 7 for _ in range(6)], "algorithm": "minimax",
+                                                "depth": 3, **overrides})
+    assert ok, err
+    return params
+
+
+def _game(moves):
+    boards, board, player = [], Board(), True
+    for col in moves:
+        board = board.apply_action(col, player)
+        player = not player
+        boards.append(board)
+    return boards
+
+
+class BatchSearchTest(unittest.TestCase):
+
+    def test_results_cover_every_board(self):
+        boards = _game([3, 3, 2, 4, 2])
+        results = dict(BatchSearch.solve_many(boards, _params()))
+        self.assertEqual(sorted(results), list(range(len(boards))))
+        for i, board in enumerate(boards):
+            self.assertIn(results[i]["best_col"], board.legal_moves())
+
+    def test_fuller_boards_are_searched_first(self):
+        boards = _game([3, 3, 2, 4, 2])
+        order = [i for i, _ in BatchSearch.solve_many(boards, _params())]
+        self.assertEqual(order, [4, 3, 2, 1, 0])
+
+    def test_matches_separate_search_without_transpositions(self):
+        boards = _game([3, 3, 2])
+        params = _params(tt_size=0)
+        results = dict(BatchSearch.solve_many(boards, params))
+        for i, board in enumerate(boards):
+            separate = BatchSearch.solve_position(board, params, BatchSearch.make_solver(params))
+            # Ties may break differently: move ordering history carries over
+            self.assertEqual(results[i]["value"], separate["value"])
+
+    def test_shared_table_saves_nodes(self):
+        boards = _game([3, 3, 2, 4, 2, 4])
+        params = _params(depth=5)
+        shared = sum(r["nodes"] for _, r in BatchSearch.solve_many(boards, params))
+        separate = sum(BatchSearch.solve_position(b, params, BatchSearch.make_solver(params))["nodes"]
+                       for b in boards)
+        self.assertLess(shared, separate)
+
+    def test_perfect_out_of_budget_reports_error(self):
+        params = _params(algorithm="perfect", max_nodes=10)
+        (_, result), = BatchSearch.solve_many([Board()], params)
+        self.assertIn("error", result)
+
+    def test_workers_capped_at_pool_size(self):
+        solver = BatchSearch.make_solver(_params(workers=64))
+        self.assertEqual(solver.workers, min(64, ParallelSearch.max_workers()))
+
+    def test_batch_schema(self):
+        board = [[0] * 7 for _ in range(6)]
+        ok, _, params = SchemaValidator.validate({"boards": [board], "algorithm": "minimax"},
+                                                 SchemaValidator.BATCH_SCHEMA)
+        self.assertTrue(ok)
+        self.assertFalse(params["stream"])
+        ok, _, _ = SchemaValidator.validate({"boards": [], "algorithm": "minimax"}, SchemaValidator.BATCH_SCHEMA)
+        self.assertFalse(ok)
+
+
+if __name__ == '__main__':
+    unittest.main()
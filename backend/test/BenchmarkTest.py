@@ -0,0 +1,29 @@
+import unittest
+from tools.benchmark import bench_searches, compare
+from tools.positions import POSITIONS, board_from_moves
+
+
+class BenchmarkTest(unittest.TestCase):
+
+    def test_corpus_positions_are_legal(self):
+        self.assertEqual(42 - board_from_moves(POSITIONS["near-full"]).mask.bit_count(), 8)
+        for moves in POSITIONS.values():
+            self.assertEqual(board_from_moves(moves).mask.bit_count(), len(moves))
+
+    def test_compare_flags_slowdowns_past_threshold(self):
+        baseline = {"a": {"seconds": 1.0}, "b": {"seconds": 1.0}, "c": {"seconds": 1.0}}
+        results = {"a": {"seconds": 1.2}, "b": {"seconds": 1.3}, "d": {"seconds": 9.0}}
+        regressions = compare(results, baseline, 0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertTrue(regressions[0].startswith("b:"))
+
+    def test_search_results_carry_nodes(self):
+        results = bench_searches([1], repeat=1)
+        self.assertEqual(len(results), 2 * 2 * len(POSITIONS))
+        for result in results.values():
+            self.assertGreater(result["nodes"], 0)
+            self.assertGreater(result["seconds"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import random
+import unittest
+from app.Board import Board
+from app.BoardEvaluator import BoardEvaluator
+
+
+def _random_boards(count, seed):
+    rng = random.Random(seed)
+    boards = []
+    for _ in range(count):
+        board = Board()
+        for _ in range(rng.randint(0, 42)):
+            moves = board.legal_moves()
+            if not moves:
+                break
+            board.play(rng.choice(moves), rng.random() < 0.5)
+        boards.append(board)
+    return boards
+
+
+class BoardEvaluatorTest(unittest.TestCase):
+
+    def test_empty_board(self):
+        # Only mobility (7 legal moves) contributes
+        self.assertEqual(BoardEvaluator.evaluate(Board(), True), 7.0)
+
+    def test_four_dominates(self):
+        board = Board()
+        for c in range(4):
+            board.play(c, True)
+        self.assertGreater(BoardEvaluator.evaluate(board, True), BoardEvaluator.WIN_4_WEIGHT / 2)
+        self.assertLess(BoardEvaluator.evaluate(board, False), -BoardEvaluator.WIN_4_WEIGHT / 2)
+
+    def test_deferred_threat_outweighs_playable_threat(self):
+        # Same three stones; the threat cell is playable on row 0, deferred on row 1
+        playable = Board()
+        deferred = Board()
+        for c in range(3):
+            playable.play(c, True)
+            deferred.play(c, False)
+            deferred.play(c, True)
+        playable.play(6, False)
+        playable.play(6, False)
+        playable.play(6, False)
+        gap = BoardEvaluator.DEFERRED_THREAT_WEIGHT - BoardEvaluator.PLAYABLE_THREAT_WEIGHT
+        self.assertEqual(BoardEvaluator.evaluate(deferred, True) - BoardEvaluator.evaluate(playable, True), gap)
+
+    def test_evaluate_many_matches_evaluate(self):
+        boards = _random_boards(300, seed=4)
+        for ai_player in (True, False):
+            self.assertEqual(BoardEvaluator.evaluate_many(boards, ai_player),
+                             [BoardEvaluator.evaluate(b, ai_player) for b in boards])
+
+    def test_evaluate_many_empty_batch(self):
+        self.assertEqual(BoardEvaluator.evaluate_many([], True), [])
+
+    def test_set_weights_changes_scores_and_bound(self):
+        defaults, bound = BoardEvaluator.weights(), BoardEvaluator.SCORE_BOUND
+        board = Board.from_moves("41")
+        before = BoardEvaluator.evaluate(board, True)
+        try:
+            BoardEvaluator.set_weights(CENTER_WEIGHT=defaults["CENTER_WEIGHT"] * 10)
+            self.assertNotEqual(BoardEvaluator.evaluate(board, True), before)
+            self.assertGreater(BoardEvaluator.SCORE_BOUND, bound)
+            with self.assertRaises(ValueError):
+                BoardEvaluator.set_weights(NO_SUCH_WEIGHT=1)
+        finally:
+            BoardEvaluator.set_weights(**defaults)
+        self.assertEqual(BoardEvaluator.SCORE_BOUND, bound)
+        self.assertEqual(BoardEvaluator.evaluate(board, True), before)
+
+
+if __name__ == "__main__":
+    unittest.main()
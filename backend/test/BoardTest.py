@@ -1,5 +1,5 @@
 import unittest
-from app.Board import Board, ROWS, COLS
+from app.Board import Board, ROWS, COLS, H1, cell_bit, mirror_col
 
 class BoardTest(unittest.TestCase):
 
@@ -187,5 +187,139 @@ class BoardTest(unittest.TestCase):
         self.assertEqual(b.free_positions[4], ROWS)
         self.assertNotIn(4, b.legal_moves())
 
+    def test_gap_in_matrix_raises(self):
+        mat = [[0] * COLS for _ in range(ROWS)]
+        mat[1][2] = 1
+        with self.assertRaises(ValueError):
+            Board(matrix=mat)
+
+    def test_bad_cell_value_raises(self):
+        mat = [[0] * COLS for _ in range(ROWS)]
+        mat[0][2] = 3
+        with self.assertRaises(ValueError):
+            Board(matrix=mat)
+
+    def test_non_integer_cell_raises(self):
+        for val in (True, 1.0, 0.0, "1", None):
+            mat = [[0] * COLS for _ in range(ROWS)]
+            mat[0][2] = val
+            with self.assertRaises(ValueError, msg=repr(val)):
+                Board(matrix=mat)
+
+    def test_wrong_matrix_shape_raises(self):
+        with self.assertRaises(ValueError):
+            Board(matrix=[[0] * COLS for _ in range(ROWS - 1)])
+
+    def test_from_moves(self):
+        b = Board.from_moves("4453")
+        expected = Board()
+        for col, player in [(3, True), (3, False), (4, True), (2, False)]:
+            expected.play(col, player)
+        self.assertEqual(b.to_matrix(), expected.to_matrix())
+        self.assertEqual(b.move_count, 0)
+        self.assertEqual(Board.from_moves("").mask, 0)
+
+    def test_from_moves_rejects_bad_moves(self):
+        for moves in ("408", "4a", "1111111"):
+            with self.assertRaises(ValueError):
+                Board.from_moves(moves)
+
+    def test_from_position_round_trip(self):
+        b = Board.from_moves("44536")
+        c = Board.from_position(b.p1_bits, b.mask)
+        self.assertEqual(c.to_matrix(), b.to_matrix())
+        self.assertEqual(c.key(), b.key())
+
+    def test_from_position_rejects_invalid(self):
+        with self.assertRaises(ValueError):
+            Board.from_position(cell_bit(1, 0), cell_bit(1, 0))      # floating tile
+        with self.assertRaises(ValueError):
+            Board.from_position(cell_bit(0, 1), cell_bit(0, 0))      # tile outside the mask
+        with self.assertRaises(ValueError):
+            Board.from_position(0, 1 << ROWS)                        # sentinel row
+
+    def test_matrix_round_trip(self):
+        b = Board()
+        for col, player in [(3, True), (3, False), (2, True), (4, False), (3, True)]:
+            b.play(col, player)
+        self.assertEqual(Board(matrix=b.to_matrix()).to_matrix(), b.to_matrix())
+
+    # --------------------------
+    # Bitboard layout tests
+    # --------------------------
+    def test_bitboard_layout(self):
+        b = Board()
+        b.play(0, True)
+        b.play(0, False)
+        b.play(6, True)
+        self.assertEqual(b.p1_bits, cell_bit(0, 0) | cell_bit(0, 6))
+        self.assertEqual(b.p2_bits, 1 << 1)
+        self.assertEqual(b.mask, b.p1_bits | b.p2_bits)
+        self.assertEqual(cell_bit(0, 6), 1 << (6 * H1))
+
+    def test_no_wrap_across_columns(self):
+        """Vertical 3 at the top of one column plus the bottom of the next must not count."""
+        b = Board()
+        for _ in range(3):
+            b.play(0, False)
+        for _ in range(3):
+            b.play(0, True)
+        b.play(1, True)
+        self.assertEqual(b.count_connected(True), 0)
+
+    def test_overlapping_fours_counted_separately(self):
+        b = Board()
+        for c in range(5):
+            b.play(c, True)
+        self.assertEqual(b.count_connected(True), 2)
+
+    # --------------------------
+    # Make / unmake tests
+    # --------------------------
+    def test_undo_restores_board(self):
+        b = Board()
+        b.play(3, True)
+        before = (b.p1_bits, b.p2_bits, b.mask)
+        b.play(3, False)
+        b.play(4, True)
+        self.assertEqual(b.undo(), 4)
+        self.assertEqual(b.undo(), 3)
+        self.assertEqual((b.p1_bits, b.p2_bits, b.mask), before)
+        self.assertEqual(b.move_count, 1)
+
+    def test_undo_empty_stack_raises(self):
+        b = Board(matrix=[[1] + [0] * (COLS - 1)] + [[0] * COLS for _ in range(ROWS - 1)])
+        with self.assertRaises(ValueError):
+            b.undo()
+
+    def test_copy_keeps_move_stack(self):
+        b = Board()
+        b.play(2, True)
+        c = b.copy()
+        c.play(5, False)
+        self.assertEqual(c.undo(), 5)
+        self.assertEqual(c.undo(), 2)
+        self.assertEqual(b.move_count, 1)
+
+    def test_mirrored_key_matches_mirrored_board(self):
+        moves = [0, 0, 0, 0, 0, 0, 1, 2, 2, 6, 5, 3]
+        b, m = Board(), Board()
+        player = True
+        for col in moves:
+            b.play(col, player)
+            m.play(mirror_col(col), player)
+            player = not player
+        self.assertEqual(b.mirrored_key(), m.key())
+        self.assertEqual(m.mirrored_key(), b.key())
+        self.assertEqual(b.canonical_key()[0], m.canonical_key()[0])
+        self.assertNotEqual(b.canonical_key()[1], m.canonical_key()[1])
+
+    def test_symmetric_board_is_its_own_mirror(self):
+        b = Board()
+        b.play(3, True)
+        b.play(3, False)
+        self.assertEqual(b.mirrored_key(), b.key())
+        self.assertEqual(b.canonical_key(), (b.key(), False))
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,87 @@
+import itertools
+import unittest
+from app.Board import Board, COLS, TOP_BITS
+from app.ChanceModel import ChanceModel, _shared_model, full_columns
+from app.Solver import Solver
+
+
+def _mask(full):
+    """Occupancy with exactly the columns in the bit set `full` filled."""
+    board = Board()
+    for col in range(COLS):
+        if full >> col & 1:
+            for _ in range(6):
+                board.play(col, True)
+    return board.mask
+
+
+def _reference(col, full):
+    """The original per-node computation: 0.6 chosen, 0.2 per free neighbour."""
+    free = [0 <= c < COLS and not full >> c & 1 for c in (col - 1, col, col + 1)]
+    left, chosen, right = free
+    if not chosen:
+        return []
+    if left and right:
+        return [(col, 0.6), (col - 1, 0.2), (col + 1, 0.2)]
+    if left or right:
+        return [(col, 0.6), (col - 1 if left else col + 1, 0.4)]
+    return [(col, 1.0)]
+
+
+class ChanceModelTest(unittest.TestCase):
+
+    def test_full_columns_gathers_top_row(self):
+        for full in range(1 << COLS):
+            # Partly filled columns below the top must not show up
+            mask = _mask(full) | (TOP_BITS[0] >> 2 if not full & 1 else 0)
+            self.assertEqual(full_columns(mask), full)
+
+    def test_default_model_matches_reference(self):
+        model = ChanceModel.create()
+        for col, full in itertools.product(range(COLS), range(1 << COLS)):
+            self.assertEqual(list(model._table[col][full]), _reference(col, full))
+
+    def test_outcomes_sum_to_one_and_are_sorted(self):
+        for chosen in (0.2, 1 / 3, 0.5, 0.8, 1.0):
+            model = ChanceModel(chosen)
+            for col, full in itertools.product(range(COLS), range(1 << COLS)):
+                outcomes = model._table[col][full]
+                if full >> col & 1:
+                    self.assertEqual(outcomes, ())
+                    continue
+                self.assertAlmostEqual(sum(p for _, p in outcomes), 1.0)
+                self.assertEqual([p for _, p in outcomes], sorted((p for _, p in outcomes), reverse=True))
+                self.assertTrue(all(p > 0 for _, p in outcomes))
+
+    def test_rejects_invalid_probability(self):
+        for chosen in (0, -0.1, 1.5):
+            with self.assertRaises(ValueError):
+                ChanceModel(chosen)
+
+    def test_create_shares_models(self):
+        self.assertIs(ChanceModel.create(0.7), ChanceModel.create(0.7))
+        self.assertIs(ChanceModel.create(), ChanceModel.create(ChanceModel.DEFAULT_CHOSEN))
+
+    def test_create_keeps_few_models(self):
+        for i in range(1, 200):
+            ChanceModel.create(i / 200)
+        self.assertLessEqual(_shared_model.cache_info().currsize, ChanceModel.MAX_MODELS)
+
+    def test_certain_landing_prunes_exactly(self):
+        # With no slipping every chance node has a single outcome
+        board = Board()
+        for col in (3, 3, 2):
+            board.play(col, col != 2)
+        pruned = Solver(depth=5, chance_chosen=1.0).run_expectiminimax(board)
+        full = Solver(depth=5, prune=False, chance_chosen=1.0).run_expectiminimax(board)
+        self.assertEqual(pruned[:2], full[:2])
+
+    def test_solver_values_depend_on_model(self):
+        board = Board()
+        default = Solver(depth=3, tt_size=0).run_expectiminimax(board)[1]
+        steady = Solver(depth=3, tt_size=0, chance_chosen=0.9).run_expectiminimax(board)[1]
+        self.assertNotEqual(default, steady)
+
+
+if __name__ == "__main__":
+    unittest.main()
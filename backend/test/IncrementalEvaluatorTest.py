@@ -0,0 +1,40 @@
+import random
+import unittest
+from app.Board import Board
+from app.BoardEvaluator import BoardEvaluator
+from app.IncrementalEvaluator import IncrementalEvaluator
+
+
+class IncrementalEvaluatorTest(unittest.TestCase):
+
+    def test_matches_full_evaluation_through_play_and_undo(self):
+        rng = random.Random(7)
+        for _ in range(30):
+            board = Board()
+            ai_player = rng.random() < 0.5
+            inc = IncrementalEvaluator(board, ai_player)
+            played = 0
+            for _ in range(120):
+                moves = board.legal_moves()
+                if moves and (played == 0 or rng.random() < 0.6):
+                    col, player = rng.choice(moves), rng.random() < 0.5
+                    board.play(col, player)
+                    inc.play(col, player)
+                    played += 1
+                elif played:
+                    board.undo()
+                    inc.undo()
+                    played -= 1
+                self.assertEqual(inc.evaluate(), BoardEvaluator.evaluate(board, ai_player))
+
+    def test_starts_from_existing_position(self):
+        board = Board()
+        for col, player in [(3, True), (3, False), (2, True), (4, True), (6, False)]:
+            board.play(col, player)
+        for ai_player in (True, False):
+            self.assertEqual(IncrementalEvaluator(board, ai_player).evaluate(),
+                             BoardEvaluator.evaluate(board, ai_player))
+
+
+if __name__ == "__main__":
+    unittest.main()
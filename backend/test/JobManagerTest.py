@@ -0,0 +1,86 @@
+import threading
+import time
+import unittest
+from app.Board import Board
+from app.JobManager import JobManager, QueueFull, CANCELLED, DONE, FAILED, QUEUED
+from app.Solver import Solver
+
+
+def _wait(job, timeout=10.0):
+    deadline = time.time() + timeout
+    while job.status not in (DONE, FAILED, CANCELLED):
+        if time.time() > deadline:
+            raise AssertionError(f"job still {job.status}")
+        time.sleep(0.005)
+    return job
+
+
+class JobManagerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.jobs = JobManager(workers=1, max_queued=2, keep_finished=3)
+
+    def tearDown(self):
+        self.jobs.shutdown()
+
+    def test_job_runs_and_keeps_result(self):
+        def run(job):
+            job.update(step=1)
+            return 42
+        job = _wait(self.jobs.submit(run))
+        self.assertEqual(job.status, DONE)
+        self.assertEqual(job.result, 42)
+        self.assertEqual(job.progress, {"step": 1})
+        self.assertIs(self.jobs.get(job.id), job)
+
+    def test_failed_job_reports_error(self):
+        def run(job):
+            raise RuntimeError("boom")
+        job = _wait(self.jobs.submit(run))
+        self.assertEqual(job.status, FAILED)
+        self.assertEqual(job.error, "boom")
+
+    def test_queue_is_bounded_and_queued_jobs_cancel_at_once(self):
+        release = threading.Event()
+        running = self.jobs.submit(lambda job: release.wait(10))
+        while running.status == QUEUED:
+            time.sleep(0.001)
+        queued = [self.jobs.submit(lambda job: "ran") for _ in range(2)]
+        with self.assertRaises(QueueFull):
+            self.jobs.submit(lambda job: None)
+
+        self.assertEqual(self.jobs.cancel(queued[0].id).status, CANCELLED)
+        release.set()
+        self.assertEqual(_wait(queued[1]).result, "ran")
+        self.assertIsNone(queued[0].result)
+
+    def test_cancel_stops_a_running_search(self):
+        solver = Solver(depth=20, tt_size=0, ordering="none")
+        depths = []
+
+        def run(job):
+            job.track(lambda: {"nodes": solver.stats.nodes})
+            return solver.run_iterative(Board(), "minimax", cancel=job.cancel_event,
+                                        on_iteration=lambda depth, col, val, nodes: depths.append(depth))
+
+        job = self.jobs.submit(run)
+        while len(depths) < 3:
+            time.sleep(0.001)
+        self.assertGreater(job.to_json()["progress"]["nodes"], 0)
+        self.jobs.cancel(job.id)
+        _wait(job)
+        self.assertEqual(job.status, CANCELLED)
+        best_col, _, _, _, depth_reached = job.result
+        self.assertEqual(depth_reached, depths[-1])
+        self.assertLess(depth_reached, 20)
+        self.assertIsNotNone(best_col)
+
+    def test_old_finished_jobs_are_dropped(self):
+        jobs = [_wait(self.jobs.submit(lambda job: None)) for _ in range(5)]
+        self.assertIsNone(self.jobs.get(jobs[0].id))
+        self.assertIsNone(self.jobs.get(jobs[1].id))
+        self.assertIs(self.jobs.get(jobs[4].id), jobs[4])
+
+
+if __name__ == "__main__":
+    unittest.main()
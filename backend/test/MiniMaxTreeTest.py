@@ -0,0 +1,62 @@
+import unittest
+from app.MiniMaxTree import MiniMaxTree
+from app.Solver import Solver
+from app.Board import Board
+
+
+def _rebuild(records):
+    """Rebuild the nested to_json structure from iter_flat records."""
+    nodes = {}
+    root = None
+    for record in records:
+        node = {"name": record["name"], "attributes": record["attributes"], "children": []}
+        nodes[record["id"]] = node
+        if record["parent_id"] is None:
+            root = node
+        else:
+            nodes[record["parent_id"]]["children"].append(node)
+    return root
+
+
+class MiniMaxTreeTest(unittest.TestCase):
+
+    def test_iter_flat_matches_to_json(self):
+        board = Board()
+        board.play(3, True)
+        _, _, _, root = Solver(depth=3, ai_player=False).run_expectiminimax(board)
+        self.assertEqual(_rebuild(root.iter_flat()), root.to_json())
+
+    def test_iter_flat_ids_in_depth_first_order(self):
+        root = MiniMaxTree(depth=0)
+        a = MiniMaxTree(move=0, player=True, depth=1)
+        b = MiniMaxTree(move=1, player=True, depth=1)
+        root.add_child(a)
+        root.add_child(b)
+        a.add_child(MiniMaxTree(move=2, player=False, depth=2))
+        records = [(r["id"], r["parent_id"]) for r in root.iter_flat()]
+        self.assertEqual(records, [(0, None), (1, 0), (2, 1), (3, 0)])
+
+    def test_mirrored_reflects_every_move(self):
+        root = MiniMaxTree(depth=0, value=1.0)
+        chance = MiniMaxTree(move=1, player=None, depth=1)
+        root.add_child(chance)
+        chance.add_child(MiniMaxTree(move=0, player=True, prob=0.2, depth=2))
+        chance.add_child(MiniMaxTree(move=2, player=True, prob=0.2, depth=2))
+        mirrored = root.mirrored()
+        self.assertIsNone(mirrored.move)
+        self.assertEqual(mirrored.children[0].move, 5)
+        self.assertEqual([(c.move, c.prob) for c in mirrored.children[0].children], [(6, 0.2), (4, 0.2)])
+        self.assertEqual(chance.move, 1)
+        self.assertEqual(mirrored.mirrored(), root)
+
+    def test_iter_flat_handles_deep_trees(self):
+        root = node = MiniMaxTree(depth=0)
+        for d in range(1, 5000):
+            child = MiniMaxTree(move=0, player=bool(d % 2), depth=d)
+            node.add_child(child)
+            node = child
+        self.assertEqual(sum(1 for _ in root.iter_flat()), 5000)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from app.Board import Board
+from app.MoveOrdering import MoveOrderer, CENTER_ORDER
+from app.Solver import Solver
+from tools.positions import board_from_moves
+
+
+class MoveOrderingTest(unittest.TestCase):
+
+    def test_none_keeps_left_to_right(self):
+        self.assertEqual(MoveOrderer.create("none").order(Board(), True, 0), list(range(7)))
+
+    def test_center_first(self):
+        self.assertEqual(MoveOrderer.create("center").order(Board(), True, 0), list(CENTER_ORDER))
+
+    def test_win_then_block_first(self):
+        # player1 can finish 0-1-2-3, player2 threatens column 6
+        board = board_from_moves([0, 6, 1, 6, 2, 6])
+        order = MoveOrderer.create("full").order(board, True, 0)
+        self.assertEqual(order[:2], [3, 6])
+
+    def test_tt_move_first(self):
+        board = board_from_moves([0, 6, 1, 6, 2, 6])
+        self.assertEqual(MoveOrderer.create("full").order(board, True, 0, tt_move=5)[0], 5)
+
+    def test_killer_and_history(self):
+        orderer = MoveOrderer.create("full")
+        orderer.record_cutoff(6, True, 2, 3)
+        self.assertEqual(orderer.order(Board(), True, 2)[0], 6)
+        self.assertEqual(orderer.history[True][6], 9)
+        orderer.new_search()
+        self.assertEqual(orderer.killer_moves[2], [None, None])
+        self.assertEqual(orderer.history[True][6], 4)
+
+    def test_new_search_moves_killers_up(self):
+        orderer = MoveOrderer.create("full")
+        orderer.record_cutoff(6, True, 2, 3)
+        orderer.record_cutoff(5, False, 3, 2)
+        orderer.new_search(2)
+        self.assertEqual(orderer.killer_moves[0], [6, None])
+        self.assertEqual(orderer.killer_moves[1], [5, None])
+        self.assertEqual(orderer.killer_moves[2], [None, None])
+        self.assertEqual(len(orderer.killer_moves), MoveOrderer.MAX_PLY)
+
+    def test_unknown_preset(self):
+        with self.assertRaises(ValueError):
+            MoveOrderer.create("random")
+
+    def test_ordering_keeps_value_and_saves_nodes(self):
+        board = board_from_moves([3, 2, 3, 2, 3, 4, 0, 6])
+        plain = Solver(depth=5, ordering="none").run_minimax(board)
+        ordered = Solver(depth=5, ordering="full").run_minimax(board)
+        self.assertEqual(plain[1], ordered[1])
+        self.assertLess(ordered[2], plain[2])
+
+
+if __name__ == "__main__":
+    unittest.main()
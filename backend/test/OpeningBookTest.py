@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+from app.Board import Board
+from app.OpeningBook import OpeningBook, entry_key
+from app.Solver import Solver
+from tools.build_book import build, positions_up_to
+
+
+class OpeningBookTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".bin")
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_positions_up_to_counts_both_starting_players(self):
+        self.assertEqual(len(positions_up_to(0)), 2)
+        # Mirror pairs are kept once: 4 distinct first moves, 25 two-move positions
+        self.assertEqual(len(positions_up_to(2)), 2 * (1 + 4 + 25))
+
+    def test_lookup_matches_search(self):
+        OpeningBook.write(self.path, build(1, [3], ["minimax", "expectiminimax"]))
+        book = OpeningBook(self.path)
+        self.assertEqual(len(book), 2 * (1 + 4) * 2)
+
+        board = Board()
+        board.play(2, True)
+        solver = Solver(depth=3, ai_player=False)
+        self.assertEqual(book.lookup(board, "minimax", False, 3), tuple(solver.run_minimax(board)[:2]))
+        self.assertEqual(book.lookup(board, "expectiminimax", False, 3), tuple(solver.run_expectiminimax(board)[:2]))
+
+        # The mirror image is answered from the same entry with the column reflected
+        mirrored = Board()
+        mirrored.play(4, True)
+        col, val = book.lookup(mirrored, "minimax", False, 3)
+        self.assertEqual(col, 6 - book.lookup(board, "minimax", False, 3)[0])
+        self.assertEqual(val, solver.run_minimax(mirrored)[1])
+        book.close()
+
+    def test_lookup_misses(self):
+        OpeningBook.write(self.path, build(0, [2], ["minimax"]))
+        book = OpeningBook(self.path)
+        self.assertIsNotNone(book.lookup(Board(), "minimax", True, 2))
+        self.assertIsNone(book.lookup(Board(), "minimax", True, 3))
+        self.assertIsNone(book.lookup(Board(), "expectiminimax", True, 2))
+        board = Board()
+        board.play(3, True)
+        self.assertIsNone(book.lookup(board, "minimax", False, 2))
+        book.close()
+
+    def test_records_are_sorted(self):
+        OpeningBook.write(self.path, {entry_key(5, "minimax", True, 1): (3, 1.0),
+                                      entry_key(2, "minimax", True, 1): (0, -1.5)})
+        book = OpeningBook(self.path)
+        self.assertEqual([col for _, col, _ in book.items()], [0, 3])
+        book.close()
+
+    def test_rejects_invalid_file(self):
+        with open(self.path, "wb") as f:
+            f.write(b"not a book")
+        with self.assertRaises(ValueError):
+            OpeningBook(self.path)
+
+    def test_load_missing_file(self):
+        self.assertIsNone(OpeningBook.load(self.path + ".missing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
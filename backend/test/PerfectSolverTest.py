@@ -0,0 +1,71 @@
+import random
+import threading
+import unittest
+from app.Board import Board
+from app.PerfectSolver import PerfectSolver
+from app.Solver import SearchAborted
+
+
+def _random_board(empties, seed):
+    rng = random.Random(seed)
+    board = Board()
+    player = True
+    while 42 - board.mask.bit_count() > empties:
+        board.play(rng.choice(board.legal_moves()), player)
+        player = not player
+    return board, player
+
+
+def _brute_force(board, player):
+    if board.is_terminal():
+        return PerfectSolver.score(board, player)
+    best = -100
+    for col in board.legal_moves():
+        board.play(col, player)
+        best = max(best, -_brute_force(board, not player))
+        board.undo()
+    return best
+
+
+class PerfectSolverTest(unittest.TestCase):
+
+    def test_matches_brute_force(self):
+        for seed in range(6):
+            board, player = _random_board(8, seed)
+            col, score = PerfectSolver().solve(board, player)
+            self.assertEqual(score, _brute_force(board, player))
+            board.play(col, player)
+            self.assertEqual(-_brute_force(board, not player), score)
+
+    def test_without_transposition_table(self):
+        board, player = _random_board(9, 42)
+        self.assertEqual(PerfectSolver(tt_size=0).solve(board, player)[1], PerfectSolver().solve(board, player)[1])
+
+    def test_score_is_negated_for_the_other_player(self):
+        board, player = _random_board(8, 7)
+        board.play(board.legal_moves()[0], player)
+        self.assertEqual(PerfectSolver().solve(board, not player)[1], _brute_force(board, not player))
+
+    def test_full_board(self):
+        board, player = _random_board(0, 3)
+        self.assertEqual(PerfectSolver().solve(board, player), (None, PerfectSolver.score(board, player)))
+
+    def test_does_not_mutate_board(self):
+        board, player = _random_board(10, 5)
+        before = board.key()
+        PerfectSolver().solve(board, player)
+        self.assertEqual(board.key(), before)
+
+    def test_budget_aborts(self):
+        with self.assertRaises(SearchAborted):
+            PerfectSolver().solve(Board(), True, max_nodes=500)
+
+    def test_cancel_aborts(self):
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(SearchAborted):
+            PerfectSolver().solve(Board(), True, time_ms=60_000, cancel=cancel)
+
+
+if __name__ == "__main__":
+    unittest.main()
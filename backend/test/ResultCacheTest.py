@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+from app.ResultCache import ResultCache, SQLiteCacheBackend
+from test.helpers import FakeClock
+
+
+class ResultCacheTest(unittest.TestCase):
+
+    def test_hit_and_miss(self):
+        cache = ResultCache(max_entries=4)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", (3, 1.5))
+        self.assertEqual(cache.get("a"), (3, 1.5))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evicts_least_recently_used(self):
+        cache = ResultCache(max_entries=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(len(cache), 2)
+
+    def test_entries_expire(self):
+        clock = FakeClock()
+        cache = ResultCache(ttl_seconds=10, clock=clock)
+        cache.put("a", 1)
+        clock.now = 9.9
+        self.assertEqual(cache.get("a"), 1)
+        clock.now = 10.0
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.expirations, 1)
+        self.assertEqual(len(cache), 0)
+
+    def test_stats_and_clear(self):
+        cache = ResultCache(max_entries=8)
+        cache.put("a", 1)
+        cache.get("a")
+        cache.get("b")
+        stats = cache.stats()
+        self.assertEqual((stats["entries"], stats["hits"], stats["misses"]), (1, 1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+        cache.clear()
+        self.assertEqual((len(cache), cache.hits, cache.misses), (0, 0, 0))
+
+    def test_rejects_empty_cache(self):
+        with self.assertRaises(ValueError):
+            ResultCache(max_entries=0)
+
+
+class SQLiteCacheBackendTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite")
+        os.close(fd)
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def test_caches_share_backend(self):
+        first = ResultCache(backend=SQLiteCacheBackend(self.path))
+        second = ResultCache(backend=SQLiteCacheBackend(self.path))
+        first.put("a", {"best_col": 3, "value": 2.5})
+        self.assertEqual(second.get("a"), {"best_col": 3, "value": 2.5})
+        self.assertEqual(second.backend_hits, 1)
+        # Now held locally as well
+        self.assertEqual(second.get("a"), {"best_col": 3, "value": 2.5})
+        self.assertEqual(second.backend_hits, 1)
+        first.backend.close()
+        second.backend.close()
+
+    def test_backend_entries_expire(self):
+        backend = SQLiteCacheBackend(self.path)
+        backend.put("a", 1, ttl_seconds=-1)
+        self.assertIsNone(backend.get("a"))
+        backend.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+from util.SchemaValidator import SchemaValidator
+
+EMPTY = [[0] * 7 for _ in range(6)]
+
+
+class SchemaValidatorTest(unittest.TestCase):
+
+    def test_defaults_filled(self):
+        ok, err, data = SchemaValidator.validate({"board": EMPTY, "algorithm": "minimax"})
+        self.assertTrue(ok, err)
+        self.assertEqual(data["depth"], 4)
+        self.assertTrue(data["prune"])
+
+    def test_position_encodings(self):
+        for position in ({"board": EMPTY}, {"moves": "4453"}, {"moves": ""}, {"position": 1, "mask": 1}):
+            ok, err, _ = SchemaValidator.validate({"algorithm": "minimax", **position})
+            self.assertTrue(ok, f"{position}: {err}")
+
+    def test_exactly_one_position(self):
+        for position in ({}, {"board": EMPTY, "moves": "4"}, {"position": 1}):
+            ok, err, _ = SchemaValidator.validate({"algorithm": "minimax", **position})
+            self.assertFalse(ok, position)
+            self.assertLess(len(err), 100)
+
+    def test_invalid_values(self):
+        for data in ({"moves": "48"}, {"moves": "4", "depth": 0}, {"moves": "4", "unknown": 1},
+                     {"moves": "4", "tt_size": 2 ** 40}):
+            ok, _, _ = SchemaValidator.validate({"algorithm": "minimax", **data})
+            self.assertFalse(ok, data)
+        self.assertFalse(SchemaValidator.validate(["not", "an", "object"])[0])
+
+    def test_batch_items(self):
+        boards = [EMPTY, "44", {"position": 0, "mask": 0}]
+        ok, err, _ = SchemaValidator.validate({"algorithm": "minimax", "boards": boards}, SchemaValidator.BATCH_SCHEMA)
+        self.assertTrue(ok, err)
+        ok, _, _ = SchemaValidator.validate({"algorithm": "minimax", "boards": [5]}, SchemaValidator.BATCH_SCHEMA)
+        self.assertFalse(ok)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+from app.Board import Board
+from app.SearchStats import SearchMetrics, SearchStats
+from app.Solver import Solver
+from tools.positions import board_from_moves
+
+
+class SearchStatsTest(unittest.TestCase):
+
+    def test_nodes_per_ply_cover_every_expanded_node(self):
+        board = board_from_moves([3, 3, 2, 4])
+        for kwargs in (dict(), dict(prune=False), dict(tt_size=0), dict(batch_leaves=True, in_place=False)):
+            solver = Solver(depth=4, **kwargs)
+            nodes = solver.run_minimax(board)[2]
+            stats = solver.stats
+            if kwargs.get("batch_leaves"):
+                # Batches score every child, including those a cutoff skips
+                self.assertGreaterEqual(stats.nodes, nodes + 1)
+            else:
+                # nodes_expanded doesn't count the root
+                self.assertEqual(stats.nodes, nodes + 1, kwargs)
+            self.assertEqual(stats.nodes_per_ply[0], 1)
+            self.assertEqual(stats.max_ply, 4)
+            self.assertLessEqual(stats.first_move_cutoffs, stats.cutoffs)
+            self.assertGreater(stats.leaf_evals, 0)
+
+    def test_counts_reset_between_searches(self):
+        solver = Solver(depth=3, tt_size=0)
+        solver.run_expectiminimax(Board())
+        first = solver.stats.to_json()
+        solver.run_expectiminimax(Board())
+        second = solver.stats.to_json()
+        for key in ("nodes_per_ply", "leaf_evals", "cutoffs", "tt_probes"):
+            self.assertEqual(first[key], second[key])
+        self.assertGreater(second["wall_ms"], 0)
+
+    def test_unpruned_search_has_no_cutoffs(self):
+        solver = Solver(depth=3, prune=False, tt_size=0)
+        solver.run_minimax(Board())
+        self.assertEqual(solver.stats.cutoffs, 0)
+        self.assertIsNone(solver.stats.first_move_cutoff_rate)
+        self.assertEqual(solver.stats.tt_probes, 0)
+
+    def test_parallel_search_merges_worker_stats(self):
+        board = board_from_moves([3, 3, 2, 4])
+        solver = Solver(depth=3, workers=2)
+        nodes = solver.run_minimax(board)[2]
+        self.assertEqual(solver.stats.nodes, nodes + 1)
+
+    def test_branching_factor(self):
+        stats = SearchStats()
+        stats.nodes_per_ply[:3] = [1, 2, 4]
+        self.assertAlmostEqual(stats.branching_factor, 2.0, places=2)
+        self.assertIsNone(SearchStats().branching_factor)
+
+    def test_metrics_render_totals(self):
+        metrics = SearchMetrics()
+        solver = Solver(depth=2)
+        solver.run_minimax(Board())
+        metrics.record("minimax", solver.stats)
+        metrics.record("minimax", solver.stats)
+        text = metrics.render({"cache_hits_total": 3})
+        self.assertIn('connect4_searches_total{algorithm="minimax"} 2', text)
+        self.assertIn(f"connect4_nodes_total {2 * solver.stats.nodes}", text)
+        self.assertIn("connect4_cache_hits_total 3", text)
+        self.assertTrue(text.endswith("\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+import unittest
+from app.Board import Board
+from app.MiniMaxTree import MiniMaxTree
+from app.SessionStore import Session, SessionStore
+from app.Solver import Solver
+from test.helpers import FakeClock
+
+
+def _session(tt_size=0, **solver_args):
+    solver = Solver(depth=3, tt_size=tt_size, **solver_args)
+    return Session({"algorithm": "minimax", "ai_player": True}, Board(), solver)
+
+
+class SessionTest(unittest.TestCase):
+
+    def test_play_follows_tree(self):
+        session = _session()
+        root = MiniMaxTree()
+        ai = MiniMaxTree(move=3, player=True, depth=1)
+        reply = MiniMaxTree(move=2, player=False, depth=2)
+        ai.children.append(reply)
+        root.children += [MiniMaxTree(move=1, player=True, depth=1), ai]
+        session.searched(root)
+        session.play(3, True)
+        self.assertIs(session.tree, ai)
+        session.play(2, False)
+        self.assertIs(session.tree, reply)
+        session.play(2, True)
+        self.assertIsNone(session.tree)
+        self.assertEqual(session.moves, [3, 2, 2])
+
+    def test_play_follows_chance_outcome(self):
+        session = _session()
+        root = MiniMaxTree()
+        chance = MiniMaxTree(move=3, player=None, depth=1)
+        landed = MiniMaxTree(move=3, player=True, depth=2)
+        chance.children += [MiniMaxTree(move=2, player=True, depth=2), landed]
+        root.children.append(chance)
+        session.searched(root)
+        session.play(3, True)
+        self.assertIs(session.tree, landed)
+
+    def test_ai_to_move(self):
+        session = _session()
+        self.assertTrue(session.ai_to_move())
+        session.play(3, True)
+        self.assertFalse(session.ai_to_move())
+        session.params["ai_player"] = False
+        self.assertTrue(session.ai_to_move())
+
+    def test_searches_carry_killers_over(self):
+        session = _session()
+        session.start_search()
+        session.solver.run_minimax(session.board)
+        session.solver.orderer.killer_moves[2] = [4, None]
+        session.play(3, False)
+        session.play(3, True)
+        session.start_search()
+        session.solver.run_minimax(session.board)
+        self.assertIn(4, session.solver.orderer.killer_moves[0])
+
+    def test_size_counts_table_and_tree(self):
+        small, large = _session(), _session(tt_size=1024)
+        self.assertEqual(small.estimate_bytes(), 0)
+        self.assertGreater(large.estimate_bytes(), 1024 * 100)
+        small.searched(MiniMaxTree(children=[MiniMaxTree(move=0)]))
+        self.assertEqual(small.nbytes, 2 * Session.NODE_BYTES)
+
+
+class SessionStoreTest(unittest.TestCase):
+
+    def test_lru_eviction_by_count(self):
+        store = SessionStore(max_sessions=2)
+        first, second, third = _session(), _session(), _session()
+        store.add(first)
+        store.add(second)
+        self.assertIs(store.get(first.id), first)
+        store.add(third)
+        self.assertIsNone(store.get(second.id))
+        self.assertIs(store.get(first.id), first)
+        self.assertEqual(store.evictions, 1)
+
+    def test_eviction_by_memory(self):
+        one = _session(tt_size=1024).estimate_bytes()
+        store = SessionStore(max_bytes=one * 2)
+        sessions = [_session(tt_size=1024) for _ in range(3)]
+        for session in sessions:
+            store.add(session)
+        self.assertEqual(len(store), 2)
+        self.assertIsNone(store.get(sessions[0].id))
+
+    def test_too_large_session_rejected(self):
+        store = SessionStore(max_bytes=1000)
+        with self.assertRaises(ValueError):
+            store.add(_session(tt_size=1024))
+        self.assertEqual(len(store), 0)
+
+    def test_idle_sessions_expire(self):
+        clock = FakeClock()
+        store = SessionStore(ttl_seconds=10, clock=clock)
+        idle, active = _session(), _session()
+        store.add(idle)
+        store.add(active)
+        clock.now = 6
+        store.get(active.id)
+        clock.now = 11
+        self.assertIsNone(store.get(idle.id))
+        self.assertIs(store.get(active.id), active)
+        self.assertEqual(store.expirations, 1)
+
+    def test_remove(self):
+        store = SessionStore()
+        session = _session()
+        store.add(session)
+        self.assertIs(store.remove(session.id), session)
+        self.assertIsNone(store.remove(session.id))
+
+
+if __name__ == '__main__':
+    unittest.main()
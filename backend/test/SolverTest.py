@@ -0,0 +1,258 @@
+import unittest
+from app import ParallelSearch
+from app.Solver import Solver
+from tools.positions import board_from_moves
+
+
+POSITIONS = [
+    [],
+    [3, 3, 2, 4],
+    [3, 2, 3, 2, 3, 4, 0, 6, 6],
+    [0, 1, 0, 1, 2, 2, 3, 4, 5, 6, 6, 6, 5, 4],
+]
+
+
+class SolverTest(unittest.TestCase):
+
+    def test_in_place_matches_copying_search(self):
+        for moves in POSITIONS:
+            for prune in (True, False):
+                board = board_from_moves(moves)
+                copying = Solver(depth=3, prune=prune, in_place=False)
+                in_place = Solver(depth=3, prune=prune, in_place=True)
+                self.assertEqual(copying.run_minimax(board)[:3], in_place.run_minimax(board)[:3])
+                self.assertEqual(copying.run_expectiminimax(board)[:3], in_place.run_expectiminimax(board)[:3])
+
+    def test_batch_leaves_matches_serial_leaves(self):
+        for moves in POSITIONS:
+            board = board_from_moves(moves)
+            for in_place in (True, False):
+                serial = Solver(depth=3, in_place=in_place)
+                batched = Solver(depth=3, in_place=in_place, batch_leaves=True)
+                self.assertEqual(serial.run_minimax(board)[:3], batched.run_minimax(board)[:3])
+                self.assertEqual(serial.run_expectiminimax(board)[:3], batched.run_expectiminimax(board)[:3])
+
+    def test_parallel_root_matches_serial(self):
+        for moves in POSITIONS[1:3]:
+            board = board_from_moves(moves)
+            serial = Solver(depth=4).run_minimax(board)
+            solver = Solver(depth=4, workers=2)
+            parallel = solver.run_minimax(board)
+            self.assertEqual(serial[:2], parallel[:2])
+            self.assertEqual(sum(solver.worker_nodes.values()), parallel[2])
+
+    def test_parallel_root_moves_in_flight_limit_keeps_order(self):
+        board = board_from_moves([3, 3])
+        config = Solver(depth=3).config()
+        one, many = (ParallelSearch.search_root_moves(config, board, list(range(7)), 3, True, "minimax", workers)
+                     for workers in (1, 7))
+        self.assertEqual([r[0] for r in one], [r[0] for r in many])
+
+    def test_search_does_not_mutate_board(self):
+        board = board_from_moves([3, 3, 2])
+        before = board.to_matrix()
+        Solver(depth=3).run_minimax(board)
+        Solver(depth=3).run_expectiminimax(board)
+        self.assertEqual(board.to_matrix(), before)
+        self.assertEqual(board.move_count, 3)
+
+    def test_prune_matches_full_minimax(self):
+        for moves in POSITIONS:
+            board = board_from_moves(moves)
+            full = Solver(depth=3, prune=False).run_minimax(board)
+            pruned = Solver(depth=3, prune=True).run_minimax(board)
+            self.assertEqual(full[:2], pruned[:2])
+            self.assertLessEqual(pruned[2], full[2])
+
+    def test_chance_pruning_matches_full_expectiminimax(self):
+        full_nodes = pruned_nodes = 0
+        for moves in POSITIONS:
+            board = board_from_moves(moves)
+            for depth in (3, 4, 5):
+                for tt_size in (0, 65536):
+                    full = Solver(depth=depth, prune=False, tt_size=tt_size).run_expectiminimax(board)
+                    pruned = Solver(depth=depth, prune=True, tt_size=tt_size).run_expectiminimax(board)
+                    self.assertEqual(full[:2], pruned[:2])
+                    full_nodes += full[2]
+                    pruned_nodes += pruned[2]
+        self.assertLess(pruned_nodes, full_nodes / 2)
+
+    def test_star2_probes_counted_apart(self):
+        solver = Solver(depth=5)
+        solver.run_expectiminimax(board_from_moves(POSITIONS[1]))
+        self.assertGreater(solver.stats.probe_nodes, 0)
+        self.assertEqual(solver.stats.to_json()["probe_nodes"], solver.stats.probe_nodes)
+        unprobed = Solver(depth=5, tt_size=0)
+        unprobed.run_expectiminimax(board_from_moves(POSITIONS[1]))
+        self.assertEqual(unprobed.stats.probe_nodes, 0)
+
+    def test_expectiminimax_transposition_table_keeps_result(self):
+        for moves in POSITIONS:
+            board = board_from_moves(moves)
+            plain = Solver(depth=5, tt_size=0).run_expectiminimax(board)
+            cached = Solver(depth=5).run_expectiminimax(board)
+            self.assertEqual(plain[:2], cached[:2])
+
+    def test_expectiminimax_mirrored_positions_match(self):
+        board = board_from_moves([1, 3, 2])
+        mirrored = board_from_moves([5, 3, 4])
+        for tt_size in (0, 65536):
+            val = Solver(depth=4, ai_player=False, tt_size=tt_size).run_expectiminimax(board)[1]
+            mirrored_val = Solver(depth=4, ai_player=False, tt_size=tt_size).run_expectiminimax(mirrored)[1]
+            self.assertEqual(val, mirrored_val)
+
+    def test_transposition_table_keeps_minimax_result(self):
+        for moves in POSITIONS:
+            for prune in (True, False):
+                board = board_from_moves(moves)
+                plain = Solver(depth=4, prune=prune, tt_size=0).run_minimax(board)
+                cached = Solver(depth=4, prune=prune).run_minimax(board)
+                self.assertEqual(plain[:2], cached[:2])
+                self.assertLessEqual(cached[2], plain[2])
+
+    def test_transposition_table_shares_mirrored_positions(self):
+        board = board_from_moves([1, 3])
+        mirrored = board_from_moves([5, 3])
+        solver = Solver(depth=4)
+        first = solver.run_minimax(board)
+        solver.orderer.new_search()
+        stores = solver.tt.stores
+        second = solver._choose_minimax(mirrored, 4, True, True)
+        self.assertEqual(second[0], 6 - first[0])
+        self.assertEqual(second[1], first[1])
+        # Every child is answered from the first search's entries; only the root is stored again
+        self.assertEqual(solver.tt.stores, stores + 1)
+
+    def test_chance_outcomes_are_mirror_symmetric(self):
+        for moves in ([], [0, 0, 0, 0, 0, 0], [6, 6, 6, 6, 6, 6, 5]):
+            board = board_from_moves(moves)
+            mirrored = board_from_moves([6 - col for col in moves])
+            for col in range(7):
+                outcomes = sorted((6 - c, p) for c, p in Solver.chance_outcomes_for(col, board))
+                self.assertEqual(outcomes, sorted(Solver.chance_outcomes_for(6 - col, mirrored)))
+
+    def test_transposition_table_counts(self):
+        solver = Solver(depth=4)
+        solver.run_minimax(board_from_moves([3, 3]))
+        self.assertGreater(solver.tt.hits, 0)
+        self.assertGreater(solver.tt.stores, 0)
+
+    def test_unpruned_search_skips_transposition_table(self):
+        board = board_from_moves([3, 3])
+        for run in (Solver.run_minimax, Solver.run_expectiminimax):
+            solver = Solver(depth=4, prune=False)
+            self.assertIsNone(solver.tt)
+            _, _, nodes, _ = run(solver, board)
+            self.assertEqual(nodes, run(Solver(depth=4, prune=False, tt_size=0), board)[2])
+
+    def test_use_prune_false_skips_transposition_table(self):
+        board = board_from_moves([3, 3])
+        for run in (Solver.run_minimax, Solver.run_expectiminimax):
+            solver = Solver(depth=4)
+            _, _, nodes, _ = run(solver, board, use_prune=False)
+            self.assertEqual(solver.tt.stores + solver.tt.hits + solver.tt.misses, 0)
+            self.assertEqual(nodes, run(Solver(depth=4, prune=False), board)[2])
+
+    def test_iterative_deepening_matches_fixed_depth(self):
+        for moves in POSITIONS:
+            board = board_from_moves(moves)
+            fixed = Solver(depth=4, tt_size=0).run_minimax(board)
+            best_col, best_val, _, _, depth_reached = Solver(depth=4).run_iterative(board, "minimax", max_nodes=10 ** 9)
+            self.assertEqual(depth_reached, 4)
+            self.assertEqual(best_val, fixed[1])
+
+    def test_iterative_deepening_stops_at_node_budget(self):
+        board = board_from_moves([3, 3])
+        best_col, _, nodes, _, depth_reached = Solver(depth=12).run_iterative(board, "minimax", max_nodes=2000)
+        self.assertIsNotNone(best_col)
+        self.assertLess(depth_reached, 12)
+        self.assertLessEqual(nodes, 2000)
+
+    def test_iterative_deepening_stops_at_time_budget(self):
+        board = board_from_moves([])
+        best_col, _, _, _, depth_reached = Solver(depth=42).run_iterative(board, "expectiminimax", time_ms=50)
+        self.assertIsNotNone(best_col)
+        self.assertGreaterEqual(depth_reached, 1)
+        self.assertLess(depth_reached, 42)
+
+    def test_tree_capture_does_not_change_result(self):
+        board = board_from_moves(POSITIONS[1])
+        full = Solver(depth=4).run_expectiminimax(board)
+        for tree_plies in (0, 2):
+            limited = Solver(depth=4, tree_plies=tree_plies).run_expectiminimax(board)
+            self.assertEqual(full[:3], limited[:3])
+
+    def test_tree_capture_limits_plies(self):
+        def height(node):
+            return 1 + max((height(child) for child in node.children), default=0)
+
+        board = board_from_moves(POSITIONS[1])
+        self.assertEqual(height(Solver(depth=4, tree_plies=0).run_minimax(board)[3]), 1)
+        self.assertEqual(height(Solver(depth=4, tree_plies=2).run_minimax(board)[3]), 3)
+        self.assertEqual(height(Solver(depth=4, tree_plies=2, workers=2).run_minimax(board)[3]), 3)
+        self.assertEqual(height(Solver(depth=4).run_minimax(board)[3]), 5)
+
+    def test_forced_moves_skip_branching(self):
+        board = board_from_moves([0, 6, 1, 6, 2, 5, 3, 3, 4])
+        full = Solver(depth=5, ai_player=False).run_minimax(board)
+        forced = Solver(depth=5, ai_player=False, forced_moves=True).run_minimax(board)
+        self.assertEqual(forced[0], full[0])
+        self.assertLess(forced[2], full[2])
+
+    def test_takes_immediate_four(self):
+        board = board_from_moves([0, 6, 1, 6, 2, 5])
+        best_col, _, _, _ = Solver(depth=2, ai_player=True).run_minimax(board)
+        self.assertEqual(best_col, 3)
+
+    def test_pvs_matches_alpha_beta(self):
+        for moves in POSITIONS:
+            for tt_size in (0, 4096):
+                board = board_from_moves(moves)
+                plain = Solver(depth=5, tt_size=tt_size).run_minimax(board)
+                solver = Solver(depth=5, tt_size=tt_size, pvs=True)
+                pvs = solver.run_minimax(board)
+                self.assertEqual(pvs[:2], plain[:2], moves)
+
+    def test_pvs_counts_researches(self):
+        solver = Solver(depth=5, tt_size=0, ordering="none", pvs=True)
+        solver.run_minimax(board_from_moves(POSITIONS[2]))
+        self.assertGreater(solver.stats.researches, 0)
+        self.assertEqual(solver.stats.to_json()["researches"], solver.stats.researches)
+
+    def test_pvs_keeps_one_tree_node_per_move(self):
+        solver = Solver(depth=4, tt_size=0, ordering="none", pvs=True)
+        root = solver.run_minimax(board_from_moves(POSITIONS[1]))[3]
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            moves = [child.move for child in node.children]
+            self.assertEqual(len(moves), len(set(moves)))
+            stack += node.children
+
+    def test_aspiration_matches_full_window(self):
+        for moves in POSITIONS:
+            board = board_from_moves(moves)
+            plain = Solver(depth=6).run_iterative(board)
+            solver = Solver(depth=6, aspiration=1.0)
+            aspired = solver.run_iterative(board)
+            self.assertEqual(aspired[1], plain[1], moves)
+            self.assertEqual(aspired[4], plain[4])
+            # Equal moves may be picked in another order; the one picked must reach the value
+            if aspired[0] != plain[0]:
+                value = Solver(depth=6).search_root_move(board, aspired[0], 6, True, "minimax")[0]
+                self.assertEqual(value, plain[1], moves)
+        # A window this narrow misses at least once
+        self.assertGreater(solver.stats.aspiration_researches, 0)
+
+    def test_aspiration_respects_node_budget(self):
+        solver = Solver(depth=10, aspiration=1.0)
+        nodes = solver.run_iterative(board_from_moves(POSITIONS[1]), max_nodes=3000)[2]
+        self.assertLess(nodes, 3000 + Solver.CHECK_INTERVAL)
+
+    def test_aspiration_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            Solver(aspiration=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from app.Board import cell_bit
+from app import Threats
+from tools.positions import board_from_moves
+
+
+class ThreatsTest(unittest.TestCase):
+
+    def test_split_playable_and_deferred(self):
+        # player1 on row 0, cols 0-2: the threat at (0, 3) is playable
+        b = board_from_moves([0, 0, 1, 1, 2, 6])
+        playable, deferred = Threats.split_threats(b.p1_bits, b.mask)
+        self.assertEqual(playable, cell_bit(0, 3))
+        self.assertEqual(deferred, 0)
+
+        # player1 on row 1, cols 0-2 (over player2's row 0): (1, 3) needs (0, 3) first
+        b = board_from_moves([6, 0, 0, 1, 1, 2, 2])
+        playable, deferred = Threats.split_threats(b.p1_bits, b.mask)
+        self.assertEqual(playable, 0)
+        self.assertEqual(deferred, cell_bit(1, 3))
+
+    def test_forced_moves_prefers_own_four(self):
+        b = board_from_moves([0, 0, 1, 1, 2, 2])
+        # player1 to move: both sides threaten column 3, taking it completes a four
+        self.assertEqual(Threats.forced_moves(b, True), [3])
+        b = board_from_moves([0, 6, 1, 6, 2])
+        # player2 must block at column 3
+        self.assertEqual(Threats.forced_moves(b, False), [3])
+
+    def test_no_forced_moves(self):
+        self.assertIsNone(Threats.forced_moves(board_from_moves([3, 3, 2]), False))
+
+    def test_zugzwang_rows(self):
+        b = board_from_moves([])
+        self.assertEqual(Threats.zugzwang_rows(b, True, True), Threats.ODD_ROWS)
+        self.assertEqual(Threats.zugzwang_rows(b, False, True), Threats.EVEN_ROWS)
+        b = board_from_moves([3])
+        # player2 to move after one stone: player1 still moved first
+        self.assertEqual(Threats.zugzwang_rows(b, True, False), Threats.ODD_ROWS)
+        self.assertEqual(Threats.ODD_ROWS & Threats.EVEN_ROWS, 0)
+
+    def test_analyze(self):
+        b = board_from_moves([0, 6, 1, 6, 2])
+        summary = Threats.analyze(b, False)
+        self.assertEqual(summary["player1"], {"playable": 1, "deferred": 0, "good_parity": 1})
+        self.assertEqual(summary["player2"]["playable"], 0)
+        self.assertEqual(summary["forced_moves"], [3])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+from app.TranspositionTable import TranspositionTable, EXACT, LOWER, UPPER
+
+
+class TranspositionTableTest(unittest.TestCase):
+
+    def test_store_and_probe(self):
+        tt = TranspositionTable(64)
+        self.assertIsNone(tt.probe(42))
+        tt.store(42, 1.5, 3, EXACT, 2)
+        self.assertEqual(tt.probe(42), (1.5, 3, EXACT, 2))
+        self.assertEqual(tt.stats(), {"hits": 1, "misses": 1, "stores": 1})
+
+    def test_capacity_is_bounded(self):
+        tt = TranspositionTable(16)
+        for key in range(1000):
+            tt.store(key, 0.0, key % 5, EXACT, None)
+        stored = sum(1 for key in range(1000) if tt.probe(key) is not None)
+        self.assertLessEqual(stored, tt.max_entries)
+
+    def test_deeper_entry_survives_collision(self):
+        tt = TranspositionTable(4)
+        buckets = tt.max_entries // 2
+        deep, shallow, other = 1, 1 + buckets, 1 + 2 * buckets
+        tt.store(deep, 10.0, 6, LOWER, 3)
+        tt.store(shallow, 20.0, 1, UPPER, 4)
+        tt.store(other, 30.0, 2, EXACT, 5)
+        self.assertEqual(tt.probe(deep), (10.0, 6, LOWER, 3))
+        self.assertIsNone(tt.probe(shallow))
+        self.assertEqual(tt.probe(other), (30.0, 2, EXACT, 5))
+
+    def test_replaced_entry_is_demoted(self):
+        tt = TranspositionTable(4)
+        buckets = tt.max_entries // 2
+        old, new = 1, 1 + buckets
+        tt.store(old, 10.0, 2, EXACT, 3)
+        tt.store(new, 20.0, 5, EXACT, 4)
+        self.assertEqual(tt.probe(new), (20.0, 5, EXACT, 4))
+        self.assertEqual(tt.probe(old), (10.0, 2, EXACT, 3))
+
+    def test_no_stale_copy_left_behind(self):
+        tt = TranspositionTable(4)
+        buckets = tt.max_entries // 2
+        deep, key, other = 1, 1 + buckets, 1 + 2 * buckets
+        tt.store(deep, 10.0, 6, EXACT, 3)
+        tt.store(key, 20.0, 1, UPPER, 4)       # always-replace slot
+        tt.store(key, 25.0, 7, EXACT, 5)       # now deep enough for the first slot
+        self.assertEqual(tt.probe(key), (25.0, 7, EXACT, 5))
+        self.assertEqual(tt.probe(deep), (10.0, 6, EXACT, 3))
+        self.assertEqual(tt._keys.count(key), 1)
+        tt.store(other, 30.0, 0, EXACT, 6)
+        self.assertEqual(tt.probe(key), (25.0, 7, EXACT, 5))
+        self.assertEqual(tt._keys.count(key), 1)
+
+    def test_clear(self):
+        tt = TranspositionTable(8)
+        tt.store(7, 1.0, 1, EXACT, None)
+        tt.clear()
+        self.assertIsNone(tt.probe(7))
+        self.assertEqual(tt.stores, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
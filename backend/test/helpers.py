@@ -0,0 +1,8 @@
+class FakeClock:
+    """Clock for time-to-live tests: returns `now`, which the test sets."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
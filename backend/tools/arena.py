@@ -0,0 +1,370 @@
+"""
+Play two solver configurations against each other.
+
+Every opening is played twice, each configuration taking player1 once. A
+game runs until the board is full and is won by the side with more fours.
+When either side uses expectiminimax (or with --physics on), every piece
+lands where the ChanceModel says it may, drawn at random with those
+probabilities, for both sides alike. The model's chance of landing in the
+aimed column is --chance-chosen, or else the chance_chosen the
+expectiminimax sides are configured with.
+
+A configuration is a comma-separated list of key=value pairs:
+    algorithm   minimax | expectiminimax (default minimax)
+    depth, prune, ordering, tt_size, forced_moves, pvs, aspiration,
+    chance_chosen
+                Solver settings (see app/Solver.py)
+    time_ms     search iteratively within this budget per move instead of
+                to a fixed depth
+    weights     JSON file of BoardEvaluator weights, e.g. {"OPEN_3_WEIGHT": 80}
+
+Games are written to --out as JSON lines, followed by a {"summary": ...}
+line. The summary gives A's wins/draws/losses with a 95% confidence
+interval on its score (and the matching Elo difference), plus nodes and
+time per move for each side.
+
+Usage (from backend/):
+    python -m tools.arena --a depth=4 --b depth=2 [--games 200] [--workers 4] [--out arena.jsonl]
+"""
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.Board import Board
+from app.BoardEvaluator import BoardEvaluator
+from app.ChanceModel import ChanceModel
+from app.Solver import Solver
+from tools.positions import board_from_moves
+
+DEFAULT_WEIGHTS = BoardEvaluator.weights()
+
+
+def _flag(value: str) -> bool:
+    if value.lower() in ("1", "true", "yes"):
+        return True
+    if value.lower() in ("0", "false", "no"):
+        return False
+    raise ValueError(f"Expected true or false, got {value!r}")
+
+
+# Configuration keys and how to parse their values
+SOLVER_KEYS = {
+    "depth": int,
+    "prune": _flag,
+    "ordering": str,
+    "tt_size": int,
+    "forced_moves": _flag,
+    "pvs": _flag,
+    "aspiration": float,
+    "chance_chosen": float,
+}
+ALGORITHMS = ("minimax", "expectiminimax")
+
+Z_95 = 1.96
+
+
+def parse_config(text: str) -> Dict[str, Any]:
+    """
+    Parse a configuration ("depth=4,algorithm=expectiminimax,...").
+
+    Returns:
+        Dict with algorithm, solver (Solver keyword arguments), time_ms and
+        weights (every BoardEvaluator weight).
+
+    Raises:
+        ValueError: for an unknown key or a bad value.
+    """
+    config = {"algorithm": "minimax", "solver": {}, "time_ms": None, "weights": dict(DEFAULT_WEIGHTS)}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Expected key=value, got {item!r}")
+        if key == "algorithm":
+            if value not in ALGORITHMS:
+                raise ValueError(f"Unknown algorithm: {value}")
+            config["algorithm"] = value
+        elif key == "time_ms":
+            config["time_ms"] = int(value)
+        elif key == "weights":
+            with open(value) as f:
+                weights = json.load(f)
+            unknown = set(weights) - set(BoardEvaluator.WEIGHT_NAMES)
+            if unknown:
+                raise ValueError(f"Unknown weights in {value}: {', '.join(sorted(unknown))}")
+            config["weights"].update(weights)
+        elif key in SOLVER_KEYS:
+            config["solver"][key] = SOLVER_KEYS[key](value)
+        else:
+            raise ValueError(f"Unknown configuration key: {key}")
+    return config
+
+
+# -----------------------
+# Openings
+# -----------------------
+def random_openings(count: int, plies: int, rng: random.Random) -> List[List[int]]:
+    """`count` openings of `plies` uniformly random moves."""
+    openings = []
+    for _ in range(count):
+        board, player, moves = Board(), True, []
+        for _ in range(plies):
+            col = rng.choice(board.legal_moves())
+            board.play(col, player)
+            moves.append(col)
+            player = not player
+        openings.append(moves)
+    return openings
+
+
+def book_openings(plies: int) -> List[List[int]]:
+    """Every position after exactly `plies` moves (one of each mirror pair), as move sequences."""
+    frontier = [[]]
+    for _ in range(plies):
+        seen = set()
+        next_frontier = []
+        for moves in frontier:
+            parent = board_from_moves(moves)
+            for col in parent.legal_moves():
+                board = parent.apply_action(col, len(moves) % 2 == 0)
+                key = board.canonical_key()[0]
+                if key not in seen:
+                    seen.add(key)
+                    next_frontier.append(moves + [col])
+        frontier = next_frontier
+    return frontier
+
+
+# -----------------------
+# Games
+# -----------------------
+def _search(solver: Solver, config: Dict[str, Any], board: Board) -> Tuple[Optional[int], int]:
+    """Best column and nodes expanded for one move."""
+    if config["time_ms"] is not None:
+        col, _, nodes, _, _ = solver.run_iterative(board, config["algorithm"], time_ms=config["time_ms"])
+    elif config["algorithm"] == "minimax":
+        col, _, nodes, _ = solver.run_minimax(board)
+    else:
+        col, _, nodes, _ = solver.run_expectiminimax(board)
+    return col, nodes
+
+
+def _land(col: int, board: Board, model: ChanceModel, rng: random.Random) -> int:
+    """Column a piece aimed at `col` actually lands in."""
+    outcomes = model.outcomes(col, board.mask)
+    pick = rng.random()
+    for actual_col, prob in outcomes:
+        pick -= prob
+        if pick < 0:
+            return actual_col
+    return outcomes[-1][0]
+
+
+def play_game(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Play one game to the end.
+
+    Args:
+        task (Dict[str, Any]): index, opening (0-based columns), configs
+            {"a", "b"}, a_first (A plays player1), physics (the ChanceModel's
+            chosen probability, or None to play every move as aimed) and seed.
+
+    Returns:
+        The game record written to the results file.
+    """
+    rng = random.Random(task["seed"])
+    model = ChanceModel.create(task["physics"]) if task["physics"] is not None else None
+    configs = task["configs"]
+    a_player = task["a_first"]
+    player_side = {a_player: "a", not a_player: "b"}
+    board = board_from_moves(task["opening"])
+    player = len(task["opening"]) % 2 == 0
+    solvers = {side: Solver(ai_player=p, tree_plies=0, **configs[side]["solver"]) for p, side in player_side.items()}
+    sides = {side: {"moves": 0, "nodes": 0, "seconds": 0.0} for side in ("a", "b")}
+    moves = []
+
+    try:
+        while not board.is_terminal():
+            side = player_side[player]
+            BoardEvaluator.set_weights(**configs[side]["weights"])
+            start = time.perf_counter()
+            col, nodes = _search(solvers[side], configs[side], board)
+            sides[side]["seconds"] += time.perf_counter() - start
+            sides[side]["nodes"] += nodes
+            sides[side]["moves"] += 1
+            if col is None:
+                col = board.legal_moves()[0]
+            if model is not None:
+                col = _land(col, board, model, rng)
+            board.play(col, player)
+            moves.append(col)
+            player = not player
+    finally:
+        BoardEvaluator.set_weights(**DEFAULT_WEIGHTS)
+
+    score_a, score_b = board.count_connected(a_player), board.count_connected(not a_player)
+    return {
+        "game": task["index"],
+        "opening": task["opening"],
+        "a_first": a_player,
+        "moves": moves,
+        "score_a": score_a,
+        "score_b": score_b,
+        "result": "a" if score_a > score_b else "b" if score_b > score_a else "draw",
+        "a": sides["a"],
+        "b": sides["b"],
+    }
+
+
+def make_tasks(games: int, openings: List[List[int]], configs: Dict[str, Dict[str, Any]], physics: Optional[float],
+               seed: int) -> List[Dict[str, Any]]:
+    """Game tasks: each opening twice, colours swapped, until `games` games."""
+    return [{"index": i, "opening": openings[(i // 2) % len(openings)], "configs": configs, "a_first": i % 2 == 0,
+             "physics": physics, "seed": seed * 1_000_003 + i}
+            for i in range(games)]
+
+
+def run(tasks: List[Dict[str, Any]], workers: int) -> Iterator[Dict[str, Any]]:
+    """Play the games, on a process pool when workers > 1, yielding records in task order."""
+    if workers <= 1:
+        yield from map(play_game, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(play_game, tasks, chunksize=max(1, len(tasks) // (workers * 8)))
+
+
+# -----------------------
+# Statistics
+# -----------------------
+def elo(score: float) -> Optional[float]:
+    """Elo difference matching an expected score, or None at 0 or 1."""
+    if not 0 < score < 1:
+        return None
+    return -400 * math.log10(1 / score - 1)
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Results from A's side: wins/draws/losses and the score (a win is 1, a
+    draw 1/2) with a 95% confidence interval from the normal approximation
+    of the per-game score, plus nodes and time per move for both sides.
+    """
+    n = len(records)
+    wins = sum(r["result"] == "a" for r in records)
+    draws = sum(r["result"] == "draw" for r in records)
+    losses = n - wins - draws
+    score = (wins + draws / 2) / n if n else 0.0
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / n if n else 0.0
+    half = Z_95 * math.sqrt(variance / n) if n else 0.0
+    low, high = max(0.0, score - half), min(1.0, score + half)
+
+    per_side = {}
+    for side in ("a", "b"):
+        moves = sum(r[side]["moves"] for r in records)
+        nodes = sum(r[side]["nodes"] for r in records)
+        seconds = sum(r[side]["seconds"] for r in records)
+        per_side[side] = {
+            "moves": moves,
+            "nodes_per_move": nodes / moves if moves else 0.0,
+            "ms_per_move": seconds * 1000 / moves if moves else 0.0,
+            "nodes_per_sec": nodes / seconds if seconds else 0.0,
+        }
+    return {
+        "games": n,
+        "wins": wins,
+        "draws": draws,
+        "losses": losses,
+        "score": score,
+        "score_ci95": [low, high],
+        "elo": elo(score),
+        "elo_ci95": [elo(low), elo(high)],
+        "a": per_side["a"],
+        "b": per_side["b"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--a", required=True, help="configuration A")
+    parser.add_argument("--b", required=True, help="configuration B")
+    parser.add_argument("--games", type=int, default=100, help="games to play (two per opening)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes playing games")
+    parser.add_argument("--openings", choices=("random", "book"), default="random",
+                        help="random moves, or every distinct position after --opening-plies moves")
+    parser.add_argument("--opening-plies", type=int, default=4, help="moves played before the solvers take over")
+    parser.add_argument("--physics", choices=("auto", "on", "off"), default="auto",
+                        help="random landing columns (auto: when a side uses expectiminimax)")
+    parser.add_argument("--chance-chosen", type=float,
+                        help="probability a piece lands where aimed (default: the expectiminimax sides' chance_chosen)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write game records and the summary to this JSONL file")
+    args = parser.parse_args()
+
+    try:
+        configs = {"a": parse_config(args.a), "b": parse_config(args.b)}
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if args.games < 1:
+        parser.error("--games must be positive")
+
+    rng = random.Random(args.seed)
+    pairs = (args.games + 1) // 2
+    if args.openings == "book":
+        openings = book_openings(args.opening_plies)
+        rng.shuffle(openings)
+    else:
+        openings = random_openings(pairs, args.opening_plies, rng)
+    physics = None
+    if args.physics == "on" or (args.physics == "auto" and
+                                "expectiminimax" in (configs["a"]["algorithm"], configs["b"]["algorithm"])):
+        physics = args.chance_chosen
+        if physics is None:
+            assumed = {config["solver"].get("chance_chosen", ChanceModel.DEFAULT_CHOSEN)
+                       for config in configs.values() if config["algorithm"] == "expectiminimax"}
+            if len(assumed) > 1:
+                parser.error("The sides assume different chance_chosen: give the physics with --chance-chosen")
+            physics = assumed.pop() if assumed else ChanceModel.DEFAULT_CHOSEN
+        if not 0 < physics <= 1:
+            parser.error(f"--chance-chosen must be in (0, 1]: {physics}")
+    tasks = make_tasks(args.games, openings, configs, physics, args.seed)
+
+    records = []
+    out = open(args.out, "w") if args.out else None
+    start = time.perf_counter()
+    try:
+        for record in run(tasks, args.workers):
+            records.append(record)
+            if out is not None:
+                out.write(json.dumps(record) + "\n")
+            if len(records) % max(1, args.games // 10) == 0:
+                print(f"{len(records)}/{args.games} games, {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        wall = time.perf_counter() - start
+        summary = summarize(records)
+        summary.update(a=dict(summary["a"], config=args.a), b=dict(summary["b"], config=args.b),
+                       physics=physics, wall_seconds=wall, games_per_sec=len(records) / wall)
+        if out is not None:
+            out.write(json.dumps({"summary": summary}) + "\n")
+    finally:
+        if out is not None:
+            out.close()
+
+    low, high = summary["score_ci95"]
+    print(f"A ({args.a}) vs B ({args.b}), {summary['games']} games, "
+          + (f"physics on (chance_chosen {physics})" if physics is not None else "physics off"))
+    print(f"  A: +{summary['wins']} ={summary['draws']} -{summary['losses']}  "
+          f"score {summary['score']:.3f} (95% CI {low:.3f}-{high:.3f})"
+          + (f", Elo {summary['elo']:+.0f}" if summary["elo"] is not None else ""))
+    for side in ("a", "b"):
+        stats = summary[side]
+        print(f"  {side.upper()}: {stats['nodes_per_move']:.0f} nodes/move, {stats['ms_per_move']:.1f} ms/move, "
+              f"{stats['nodes_per_sec']:.0f} nodes/s")
+    print(f"  {summary['games_per_sec']:.2f} games/s over {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Benchmark the board, the evaluator and the searches on a fixed corpus.
+
+Measures the time per call of Board.apply_action, Board.count_connected and
+BoardEvaluator.evaluate on every position of tools/positions.py, and the wall
+time and nodes/second of run_minimax and run_expectiminimax at each depth,
+with and without pruning. Every timing is the best of --repeat runs.
+
+Results are written as JSON. Given a baseline written by an earlier run, the
+benchmark exits with status 1 when any timing is more than --threshold slower
+(node count changes are listed but are not failures).
+
+Usage (from backend/):
+    python -m tools.benchmark [--depths 2 4] [--out bench.json] [--baseline baseline.json]
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+import timeit
+from typing import Any, Dict, List, Tuple
+
+from app.Board import Board
+from app.BoardEvaluator import BoardEvaluator
+from app.Solver import Solver
+from tools.positions import POSITIONS, board_from_moves, player_to_move
+
+FORMAT_VERSION = 1
+
+
+def time_op(fn, number: int, repeat: int) -> float:
+    """Best time of one call of `fn`, in seconds."""
+    return min(timeit.repeat(fn, number=number, repeat=repeat)) / number
+
+
+def bench_ops(number: int, repeat: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for name, moves in POSITIONS.items():
+        board = board_from_moves(moves)
+        player = player_to_move(moves)
+        col = board.legal_moves()[0]
+        ops = {
+            "board.apply_action": lambda: board.apply_action(col, player),
+            "board.count_connected": lambda: board.count_connected(player),
+            "evaluator.evaluate": lambda: BoardEvaluator.evaluate(board, player),
+        }
+        for op, fn in ops.items():
+            results[f"{op}/{name}"] = {"seconds": time_op(fn, number, repeat)}
+    return results
+
+
+def time_search(board: Board, player: bool, algorithm: str, depth: int, prune: bool) -> Tuple[float, int]:
+    """Wall time and node count of one search (solver construction is not timed)."""
+    # A fresh solver each time: a warm transposition table would skip the work
+    solver = Solver(depth=depth, prune=prune, ai_player=player)
+    run = solver.run_minimax if algorithm == "minimax" else solver.run_expectiminimax
+    start = time.perf_counter()
+    nodes = run(board)[2]
+    return time.perf_counter() - start, nodes
+
+
+def bench_searches(depths: List[int], repeat: int) -> Dict[str, Dict[str, Any]]:
+    results = {}
+    for algorithm in ("minimax", "expectiminimax"):
+        for depth in depths:
+            for prune in (True, False):
+                for name, moves in POSITIONS.items():
+                    board = board_from_moves(moves)
+                    player = player_to_move(moves)
+                    runs = [time_search(board, player, algorithm, depth, prune) for _ in range(repeat)]
+                    best, nodes = min(runs)
+                    key = f"{algorithm}/depth{depth}/{'prune' if prune else 'full'}/{name}"
+                    results[key] = {"seconds": best, "nodes": nodes, "nodes_per_sec": nodes / best}
+    return results
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]],
+            threshold: float) -> List[str]:
+    """
+    Differences from a baseline run.
+
+    Returns:
+        A line per benchmark that got slower than the baseline by more than
+        `threshold` (as a fraction); node count changes are printed, not returned.
+    """
+    regressions = []
+    for key, result in results.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        ratio = result["seconds"] / old["seconds"]
+        if ratio > 1 + threshold:
+            regressions.append(f"{key}: {old['seconds'] * 1e6:.1f}us -> {result['seconds'] * 1e6:.1f}us "
+                               f"({ratio - 1:+.0%})")
+        if "nodes" in old and result.get("nodes") != old["nodes"]:
+            print(f"{key}: nodes {old['nodes']} -> {result['nodes']}", file=sys.stderr)
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--depths", type=int, nargs="+", default=[2, 4], help="search depths to time")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per timing (the best one counts)")
+    parser.add_argument("--number", type=int, default=2000, help="calls per run of the board/evaluator timings")
+    parser.add_argument("--out", help="write the results to this JSON file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, as a fraction")
+    args = parser.parse_args()
+
+    results = bench_ops(args.number, args.repeat)
+    results.update(bench_searches(args.depths, args.repeat))
+
+    for key, result in results.items():
+        line = f"{key:<48} {result['seconds'] * 1e6:>12.1f}us"
+        if "nodes" in result:
+            line += f" {result['nodes']:>8} nodes {result['nodes_per_sec']:>10.0f} nodes/s"
+        print(line)
+
+    if args.out:
+        report = {
+            "version": FORMAT_VERSION,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "depths": args.depths,
+            "results": results,
+        }
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("version") != FORMAT_VERSION:
+            sys.exit(f"Baseline {args.baseline} has an unknown format")
+        regressions = compare(results, baseline["results"], args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmarks regressed by more than {args.threshold:.0%}:", file=sys.stderr)
+            for line in regressions:
+                print(f"  {line}", file=sys.stderr)
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
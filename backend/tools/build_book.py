@@ -0,0 +1,89 @@
+"""
+Precompute an opening book of search results for the server.
+
+Searches every position reachable in at most --plies moves (either player
+starting, one of each mirror pair) for the player to move, with each
+algorithm and depth, and writes them to a memory-mappable book file (see
+app/OpeningBook.py).
+
+Usage (from backend/):
+    python -m tools.build_book [--plies 4] [--depths 4] [--out opening_book.bin]
+"""
+import argparse
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from app.Board import Board, mirror_col
+from app.OpeningBook import ALGORITHMS, MAX_DEPTH, OpeningBook, entry_key
+from app.Solver import Solver
+
+
+def positions_up_to(plies: int) -> List[Tuple[Board, bool]]:
+    """
+    All (board, player to move) pairs reachable in at most `plies` moves.
+
+    Mirror images share a book entry, so only one of each pair is kept.
+    """
+    seen = set()
+    result = []
+    frontier = [(Board(), True), (Board(), False)]
+    for ply in range(plies + 1):
+        next_frontier = []
+        for board, player in frontier:
+            key = (board.canonical_key()[0], player)
+            if key in seen:
+                continue
+            seen.add(key)
+            result.append((board, player))
+            if ply < plies:
+                next_frontier.extend((child, not player) for child in board.neighbours(player))
+        frontier = next_frontier
+    return result
+
+
+def search(board: Board, player: bool, algorithm: str, depth: int) -> Tuple[int, float]:
+    solver = Solver(depth=depth, prune=True, ai_player=player, tree_plies=0)
+    if algorithm == "minimax":
+        best_col, best_val, _, _ = solver.run_minimax(board)
+    else:
+        best_col, best_val, _, _ = solver.run_expectiminimax(board)
+    return best_col, best_val
+
+
+def build(plies: int, depths: List[int], algorithms: List[str]) -> Dict[int, Tuple[int, float]]:
+    positions = positions_up_to(plies)
+    total = len(positions) * len(depths) * len(algorithms)
+    entries: Dict[int, Tuple[int, float]] = {}
+    start = time.perf_counter()
+    for board, player in positions:
+        for algorithm in algorithms:
+            for depth in depths:
+                best_col, best_val = search(board, player, algorithm, depth)
+                key, mirrored = board.canonical_key()
+                if mirrored:
+                    best_col = mirror_col(best_col)
+                entries[entry_key(key, algorithm, player, depth)] = (best_col, best_val)
+                if len(entries) % 1000 == 0:
+                    print(f"{len(entries)}/{total} searches, {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--plies", type=int, default=4, help="deepest opening position to include")
+    parser.add_argument("--depths", type=int, nargs="+", default=[4], help="search depths to store")
+    parser.add_argument("--algorithms", choices=ALGORITHMS, nargs="+", default=list(ALGORITHMS))
+    parser.add_argument("--out", default="opening_book.bin")
+    args = parser.parse_args()
+
+    if any(not 0 < depth <= MAX_DEPTH for depth in args.depths):
+        parser.error(f"depths must be between 1 and {MAX_DEPTH}")
+
+    entries = build(args.plies, args.depths, args.algorithms)
+    OpeningBook.write(args.out, entries)
+    print(f"Wrote {len(entries)} entries to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Report how many nodes each move-ordering preset saves per search depth.
+
+Usage (from backend/):
+    python -m tools.ordering_report [--max-depth 6] [--algorithm minimax]
+"""
+import argparse
+
+from app.Board import Board
+from app.MoveOrdering import MoveOrderer
+from app.Solver import Solver
+from tools.positions import POSITIONS, board_from_moves, player_to_move
+
+
+def count_nodes(board: Board, ai_player: bool, algorithm: str, depth: int, ordering: str) -> int:
+    solver = Solver(depth=depth, prune=True, ai_player=ai_player, ordering=ordering)
+    if algorithm == "minimax":
+        return solver.run_minimax(board)[2]
+    return solver.run_expectiminimax(board)[2]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-depth", type=int, default=6)
+    parser.add_argument("--algorithm", choices=["minimax", "expectiminimax"], default="minimax")
+    args = parser.parse_args()
+
+    presets = list(MoveOrderer.PRESETS)
+    print(f"{'depth':>5} " + " ".join(f"{name:>10}" for name in presets) + f" {'saved':>8}")
+    for depth in range(1, args.max_depth + 1):
+        totals = {name: 0 for name in presets}
+        for moves in POSITIONS.values():
+            board = board_from_moves(moves)
+            player = player_to_move(moves)
+            for name in presets:
+                totals[name] += count_nodes(board, player, args.algorithm, depth, name)
+        saved = 1.0 - totals["full"] / totals["none"] if totals["none"] else 0.0
+        print(f"{depth:>5} " + " ".join(f"{totals[name]:>10}" for name in presets) + f" {saved:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
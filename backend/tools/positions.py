@@ -0,0 +1,29 @@
+"""
+Fixed positions shared by the reporting and benchmark tools.
+"""
+from typing import Dict, List
+
+from app.Board import Board
+
+# Positions as move sequences (0-based columns, player1 moves first)
+POSITIONS: Dict[str, List[int]] = {
+    "empty": [],
+    "opening": [3, 3, 2, 4],
+    "midgame": [3, 2, 3, 2, 3, 4, 0, 6, 6, 5, 1, 4],
+    "tactical": [0, 6, 1, 6, 2, 5, 3, 3, 4],
+    "near-full": [3, 3, 3, 3, 2, 4, 2, 4, 4, 2, 2, 4, 1, 5, 1, 5, 5, 1, 0, 6, 6, 0, 0, 6,
+                  3, 3, 1, 5, 2, 4, 6, 0, 5, 1],
+}
+
+
+def board_from_moves(moves: List[int]) -> Board:
+    board = Board()
+    player = True
+    for col in moves:
+        board.play(col, player)
+        player = not player
+    return board
+
+
+def player_to_move(moves: List[int]) -> bool:
+    return len(moves) % 2 == 0
@@ -1,47 +1,121 @@
-from jsonschema import validate, ValidationError, Draft7Validator
+from jsonschema import Draft7Validator
+from jsonschema.exceptions import best_match
+
+
+# Positions can be sent as a 6x7 matrix, a move sequence, or a (position, mask)
+# pair (see Board.from_moves and Board.from_position). Cell values are checked
+# while the matrix is decoded, so the schema only checks its shape.
+BOARD_SCHEMA = {
+    "type": "array",
+    "items": {"type": "array", "minItems": 7, "maxItems": 7},
+    "minItems": 6,
+    "maxItems": 6
+}
+MOVES_SCHEMA = {"type": "string", "pattern": "^[1-7]{0,42}$"}
+BITBOARD_SCHEMA = {"type": "integer", "minimum": 0}
+
 
 class SchemaValidator:
     SOLVER_SCHEMA = {
         "type": "object",
         "properties": {
-            "board": {
-                "type": "array",
-                "items": {
-                    "type": "array",
-                    "items": {"type": "integer", "enum": [0, 1, 2]},
-                    "minItems": 7,
-                    "maxItems": 7
-                },
-                "minItems": 6,
-                "maxItems": 6
-            },
+            "board": BOARD_SCHEMA,
+            "moves": MOVES_SCHEMA,
+            "position": BITBOARD_SCHEMA,
+            "mask": BITBOARD_SCHEMA,
             "algorithm": {
                 "type": "string",
-                "enum": ["minimax", "expectiminimax"]
+                "enum": ["minimax", "expectiminimax", "perfect"]
             },
-            "depth": {"type": "integer", "minimum": 1, "default": 4},
+            "depth": {"type": "integer", "minimum": 1, "maximum": 42, "default": 4},
             "prune": {"type": "boolean", "default": True},
-            "ai_player": {"type": "boolean", "default": True}
+            "ai_player": {"type": "boolean", "default": True},
+            # At most ~160 MB once full (TranspositionTable.ENTRY_BYTES per entry)
+            "tt_size": {"type": "integer", "minimum": 0, "maximum": 1 << 20, "default": 65536},
+            "ordering": {"type": "string", "enum": ["none", "center", "full"], "default": "full"},
+            "workers": {"type": "integer", "minimum": 1, "maximum": 64, "default": 1},
+            "time_ms": {"type": "integer", "minimum": 1},
+            "max_nodes": {"type": "integer", "minimum": 1},
+            "tree": {"type": "string", "enum": ["none", "top-k", "full"], "default": "full"},
+            "tree_plies": {"type": "integer", "minimum": 1, "default": 2},
+            "forced_moves": {"type": "boolean", "default": False},
+            "chance_chosen": {"type": "number", "exclusiveMinimum": 0, "maximum": 1, "default": 0.6},
+            "pvs": {"type": "boolean", "default": False},
+            "aspiration": {"type": "number", "exclusiveMinimum": 0}
         },
-        "required": ["board", "algorithm"],
+        "required": ["algorithm"],
+        "oneOf": [{"required": ["board"]}, {"required": ["moves"]}, {"required": ["position", "mask"]}],
+        "dependencies": {"position": ["mask"], "mask": ["position"]},
         "additionalProperties": False
     }
 
+    # /solve/batch: the /solve parameters with a list of boards
+    MAX_BATCH = 256
+    BATCH_SCHEMA = {
+        "type": "object",
+        "properties": dict(
+            {key: value for key, value in SOLVER_SCHEMA["properties"].items()
+             if key not in ("board", "moves", "position", "mask")},
+            boards={"type": "array",
+                    "items": {"anyOf": [
+                        BOARD_SCHEMA,
+                        MOVES_SCHEMA,
+                        {"type": "object", "properties": {"position": BITBOARD_SCHEMA, "mask": BITBOARD_SCHEMA},
+                         "required": ["position", "mask"], "additionalProperties": False},
+                    ]},
+                    "minItems": 1, "maxItems": MAX_BATCH},
+            stream={"type": "boolean", "default": False}
+        ),
+        "required": ["boards", "algorithm"],
+        "additionalProperties": False
+    }
+
+    # Compiled validators and defaults by id() of the schema. jsonschema.validate
+    # checks the schema itself and builds a validator on every call, which
+    # costs milliseconds per request.
+    _compiled: dict = {}
+
     @staticmethod
-    def validate(data: dict) -> tuple[bool, str | None, dict]:
+    def _compile(schema: dict) -> tuple[Draft7Validator, dict]:
+        compiled = SchemaValidator._compiled.get(id(schema))
+        if compiled is None or compiled[0] is not schema:
+            Draft7Validator.check_schema(schema)
+            defaults = {prop: subschema["default"] for prop, subschema in schema.get("properties", {}).items()
+                        if "default" in subschema}
+            compiled = (schema, Draft7Validator(schema), defaults)
+            SchemaValidator._compiled[id(schema)] = compiled
+        return compiled[1], compiled[2]
+
+    # POST /sessions: the /solve parameters; the game starts from the empty board
+    # unless a position is given
+    SESSION_SCHEMA = dict(
+        SOLVER_SCHEMA,
+        oneOf=SOLVER_SCHEMA["oneOf"] + [{"not": {"anyOf": SOLVER_SCHEMA["oneOf"]}}]
+    )
+
+    # POST /sessions/<id>/move: the opponent's column (0-based), or none to let the AI move
+    MOVE_SCHEMA = {
+        "type": "object",
+        "properties": {"col": {"type": ["integer", "null"], "minimum": 0, "maximum": 6}},
+        "additionalProperties": False
+    }
+
+    @staticmethod
+    def validate(data: dict, schema: dict | None = None) -> tuple[bool, str | None, dict]:
         """
-        Validate the input and fill defaults if missing.
+        Validate the input (against SOLVER_SCHEMA by default) and fill defaults if missing.
         Returns: (is_valid, error_message, validated_data_with_defaults)
         """
-        properties = SchemaValidator.SOLVER_SCHEMA.get("properties", {})
-        validated_data = data.copy()
-        for prop, subschema in properties.items():
-            if "default" in subschema and prop not in validated_data:
-                validated_data[prop] = subschema["default"]
-
-        try:
-            validate(instance=validated_data, schema=SchemaValidator.SOLVER_SCHEMA)
-        except ValidationError as e:
-            return False, e.message, validated_data
+        validator, defaults = SchemaValidator._compile(schema or SchemaValidator.SOLVER_SCHEMA)
+        if not isinstance(data, dict):
+            return False, "Request body must be a JSON object", data
+        validated_data = {**defaults, **data}
+
+        error = best_match(validator.iter_errors(validated_data))
+        if error is not None:
+            if error.validator == "oneOf" and not error.path:
+                # jsonschema would quote the whole request
+                return False, "Give the position as one of board, moves, or position and mask", validated_data
+            return False, error.message, validated_data
 
         return True, None, validated_data